@@ -26,6 +26,15 @@ let isAutoDetectEnabled = true;          // 자동 감지 기본값: 활성화
 let detectedLanguage = null;             // 감지된 언어 코드
 let languageConfidence = 0;              // 언어 감지 신뢰도
 
+// 서버 디버그 로그 스트림 ('logger' 이벤트) - URL에 ?debug 가 있을 때만 요청
+const isServerDebugLogEnabled = new URLSearchParams(window.location.search).has('debug');
+
+// 지연/정확도 프로파일 (realtime, balanced, accurate) - URL의 ?profile= 값 사용
+const requestedProfile = new URLSearchParams(window.location.search).get('profile');
+
+// 단계별 타임라인 추적 - URL에 ?trace 가 있으면 요청 (/trace/<소켓 ID> 에서 다운로드)
+const isTraceEnabled = new URLSearchParams(window.location.search).has('trace');
+
 // 내보내기 버튼 및 옵션 엘리먼트
 let exportTextBtn, exportWordBtn, exportPDFBtn, exportHTMLBtn, copyToClipboardBtn;
 let exportOriginalCheck, exportTranslationCheck, exportTimestampCheck, exportLanguageInfoCheck;
@@ -460,8 +469,16 @@ function updateLanguageConfig() {
     const languageConfig = {
         sourceLanguage: isAutoDetectEnabled ? 'auto' : currentSourceLanguage,
         targetLanguage: currentTargetLanguage,
-        autoDetect: isAutoDetectEnabled
+        autoDetect: isAutoDetectEnabled,
+        debugLog: isServerDebugLogEnabled
     };
+    if (requestedProfile) {
+        languageConfig.profile = requestedProfile;
+    }
+    if (isTraceEnabled) {
+        languageConfig.trace = true;
+        console.log('Trace enabled:', `/trace/${socket.id}`);
+    }
     
     socket.emit('update_language_config', languageConfig);
     console.log('Language config updated:', languageConfig);
@@ -873,6 +890,24 @@ socket.on('detected_language', (data) => {
     }
 });
 
+// 자막 피드 방 이름 (시청자는 /captions/<방 이름>/events 등으로 접속)
+socket.on('caption_room', (data) => {
+    if (data && data.room) {
+        console.log('Caption feed:', `/captions/${data.room}/events`);
+    }
+});
+
+// 모델 단계 변경 이벤트 처리 (서버 부하에 따라 작은/큰 모델로 전환)
+socket.on('model_tier', (data) => {
+    console.log("모델 단계 변경:", data);
+    if (!data) return;
+    
+    const message = data.reason === 'recovered'
+        ? `서버 부하 감소: 모델 복귀 (${data.name})`
+        : `서버 부하로 작은 모델 사용 중 (${data.name})`;
+    updateStatus(message);
+});
+
 socket.on('error', (errorMessage) => {
     updateStatus(`서버 오류: ${errorMessage}`, true);
 });
@@ -1,119 +1,263 @@
 # app.py - 다국어 지원 추가
 
 import os
+import json
 import time
 import numpy as np
 import torch
 import logging
-from flask import Flask, request, send_from_directory
-from flask_socketio import SocketIO, emit
-from faster_whisper import WhisperModel
+from flask import Flask, Response, abort, request, send_from_directory, stream_with_context
+from flask_socketio import SocketIO
 from transformers import pipeline
 from dotenv import load_dotenv
 import re
 import threading
 import difflib
-from dataclasses import dataclass, field
+import gc
+import signal
+import secrets
+import hmac
+from dataclasses import dataclass, field, replace
 from typing import List
 from collections import deque
 
+from asr_engine import TranscribeOptions, create_asr_engine
+from segmenter import SentenceSegmenter, count_tokens
+from log_config import setup_logging
+from language_id import LanguageIdentifier, whisper_language_for
+from profiles import ProfileStore
+from final_pass import SentenceAudioBuffer, align_segments
+from caption_feed import VTT_TRACKS, CaptionFeed
+from tracing import TraceRegistry
+import cpu_planner
+from model_cascade import CascadePolicy, ModelCascade, ModelHandle
+from hot_swap import ModelSwapper, ProbationPolicy
+from pipeline import BACKGROUND, FINAL, PARTIAL, PRIORITY_NAMES, SessionStage
+from mel_features import MelFeatureCache
+from cluster import ClusterNode, create_registry, default_node_id
+
 
 load_dotenv()
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    filename='server.log',
-                    filemode='w',
-                    encoding='utf-8',
-                    force=True)
+# 로깅 설정 - 큐 기반 비동기 JSON 로깅, 파일 크기 기준 회전
+setup_logging(filename=os.getenv('LOG_FILE', 'server.log'),
+              level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO))
 
 # root logger 가져오기
 logger = logging.getLogger()
-handler = logger.handlers[0]
+
+# 클라이언트 'logger' 이벤트(디버그 로그 스트림) 기본값 - 세션별로 debugLog 설정으로 변경 가능
+SOCKET_DEBUG_LOG = os.getenv('SOCKET_DEBUG_LOG', 'false').lower() in ('1', 'true', 'yes')
 
 app = Flask(__name__, static_folder='../client/public', static_url_path='/')
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'sk-test1234567890123456789012345678901234')
 
 # 큰 바이너리 데이터 처리를 위한 설정
 app.config['MAX_CONTENT_LENGTH'] = 32 * 1024 * 1024  # 32MB 제한
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', max_http_buffer_size=16*1024*1024)
+# 클러스터 모드에서는 메시지 큐로 다른 노드에 연결된 클라이언트에도 이벤트 전송 (예: redis://localhost:6379/0)
+SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading', max_http_buffer_size=16*1024*1024,
+                    message_queue=SOCKETIO_MESSAGE_QUEUE)
 
 # 언어 모델 초기화
-print("Initializing Whisper Model...")
-model_size = "large-v3-turbo"  # 고품질 모델 사용
-model = WhisperModel(model_size, device="cuda", compute_type="float16", num_workers=8)
-print("Whisper Model initialized!")
+# ASR_ENGINE=fake 로 설정하면 모델 가중치 없이 대본 기반 가짜 엔진 사용 (부하/지연 테스트용)
+asr_engine_name = os.getenv('ASR_ENGINE', 'faster-whisper')
+model_size = os.getenv('WHISPER_MODEL_SIZE', "large-v3-turbo")  # 고품질 모델 사용
+whisper_device = os.getenv('WHISPER_DEVICE', "cuda")
+mt_engine_name = os.getenv('MT_ENGINE', 'nllb')
+mt_device = os.getenv('MT_DEVICE', "cuda")
+
+# CPU 실행 계획 - CPU에서 실행하는 모델이 있으면 코어를 ASR/MT로 나누어 서로 경쟁하지 않게 함
+# (python server/cpu_planner.py autotune 으로 측정한 cpu_plan.json이 있으면 사용, 없으면 절반씩)
+asr_on_cpu = whisper_device == 'cpu' and not asr_engine_name.startswith('fake')
+mt_on_cpu = mt_device == 'cpu' and mt_engine_name != 'echo'
+cpu_plan = None
+if asr_on_cpu or mt_on_cpu:
+    cpu_plan = cpu_planner.load_plan(os.getenv('CPU_PLAN_FILE'))
+    if cpu_plan is None:
+        cpu_plan = cpu_planner.make_plan(asr_fraction=float(os.getenv('CPU_ASR_FRACTION', '0.5')))
+    if os.getenv('CPU_AFFINITY', 'true').lower() not in ('1', 'true', 'yes'):
+        cpu_plan = replace(cpu_plan, affinity=False)
+    if not (asr_on_cpu and mt_on_cpu):
+        # 한 단계만 CPU에서 실행하면 모든 코어를 그 단계에 배정
+        cores = tuple(sorted(set(cpu_plan.asr_cores) | set(cpu_plan.mt_cores)))
+        physical = len(cpu_planner.core_groups(cores))
+        cpu_plan = replace(cpu_plan, asr_cores=cores, mt_cores=cores,
+                           asr_threads=max(1, physical // cpu_plan.asr_workers), mt_threads=physical)
+    print(f"CPU plan: {cpu_plan.describe()}")
+    logger.info("CPU plan applied", extra={'cpu_plan': cpu_plan.to_dict()})
+
+def cpu_stage(stage):
+    """단계('asr'/'mt') 코어에 현재 스레드 고정 - CPU 계획이 없으면 아무 일도 하지 않음"""
+    return cpu_planner.pinned(cpu_plan.cores_for(stage) if cpu_plan else ())
+
+if asr_engine_name.startswith('fake'):
+    asr_engine_kwargs = {
+        'script_path': os.getenv('ASR_FAKE_SCRIPT'),
+        'rtf': float(os.getenv('ASR_FAKE_RTF', '0'))
+    }
+else:
+    asr_engine_kwargs = {
+        'model_size': model_size,
+        'device': whisper_device,
+        'compute_type': os.getenv('WHISPER_COMPUTE_TYPE', "float16"),
+        'num_workers': 8
+    }
+    if asr_on_cpu:
+        asr_engine_kwargs.update(num_workers=cpu_plan.asr_workers, cpu_threads=cpu_plan.asr_threads)
+
+def make_asr_engine(size):
+    """모델 크기로 ASR 엔진 생성 - CTranslate2 워커 스레드는 ASR 코어 고정을 물려받음"""
+    print(f"Initializing Whisper Model ({size})...")
+    kwargs = asr_engine_kwargs if asr_engine_name.startswith('fake') else dict(asr_engine_kwargs, model_size=size)
+    with cpu_stage('asr'):
+        engine = create_asr_engine(asr_engine_name, **kwargs)
+    print(f"Whisper Model initialized! (engine: {engine.name}, capabilities: {engine.capabilities})")
+    return engine
 
 # 번역 모델 초기화
-print("Initializing Translation Pipeline...")
-translator = pipeline("translation", model="facebook/nllb-200-distilled-1.3B", device=torch.device("cuda"), torch_dtype=torch.bfloat16)
-print("Translation Pipeline initialized!")
+# MT_ENGINE=echo 로 설정하면 모델 없이 원문에 대상 언어 표시만 붙여 반환 (부하/지연 테스트용)
+def echo_translator(text, src_lang, tgt_lang, **generate_kwargs):
+    return [{'translation_text': f"[{tgt_lang}] {text}"}]
 
-# 기존 FastText 모델 초기화 코드 대체
-print("Initializing Language Detection...")
-# langdetect 설정
-try:
-    from langdetect import DetectorFactory
-    from langdetect import detect_langs
-    from langdetect.lang_detect_exception import LangDetectException
-    
-    # 언어 감지 결과의 일관성을 위해 시드 설정
-    DetectorFactory.seed = 0
-    LANGDETECT_AVAILABLE = True
-    print("langdetect 라이브러리가 초기화되었습니다.")
-except ImportError:
-    LANGDETECT_AVAILABLE = False
-    print("langdetect 라이브러리를 찾을 수 없습니다. pip install langdetect로 설치해주세요.")
-
-# 지원 언어 매핑 정의
-LANGUAGE_MAPPING = {
-    # 파이썬 코드 내에서 사용하는 언어 매핑
-    # langdetect  코드 -> NLLB 코드 매핑
-    "en": "eng_Latn",  # 영어
-    "ko": "kor_Hang",  # 한국어
-    "ja": "jpn_Jpan",  # 일본어
-    "zh": "cmn_Hans",  # 중국어 간체
-    "de": "deu_Latn",  # 독일어
-    "fr": "fra_Latn",  # 프랑스어
-    "es": "spa_Latn",  # 스페인어
-    "ru": "rus_Cyrl",  # 러시아어
-    "pt": "por_Latn",  # 포르투갈어
-    "it": "ita_Latn",  # 이탈리아어
-    "vi": "vie_Latn",  # 베트남어
-    "th": "tha_Thai",  # 태국어
-    "id": "ind_Latn",  # 인도네시아어
-    "nl": "nld_Latn",  # 네덜란드어
-    "tr": "tur_Latn",  # 터키어
-    "ar": "ara_Arab",  # 아랍어
-    "hi": "hin_Deva",  # 힌디어
-}
+# 번역 단계 워커 수 - 워커마다 번역을 동시에 실행
+MT_STAGE_WORKERS = int(os.getenv('MT_STAGE_WORKERS', '2'))
 
-# ISO 언어 코드 -> whisper 코드 매핑
-WHISPER_LANGUAGE_MAPPING = {
-    "en": "en",  # 영어
-    "ko": "ko",  # 한국어
-    "ja": "ja",  # 일본어
-    "zh": "zh",  # 중국어
-    "de": "de",  # 독일어
-    "fr": "fr",  # 프랑스어
-    "es": "es",  # 스페인어
-    "ru": "ru",  # 러시아어
-    "pt": "pt",  # 포르투갈어
-    "it": "it",  # 이탈리아어
-    "vi": "vi",  # 베트남어
-    "th": "th",  # 태국어
-    "id": "id",  # 인도네시아어
-    "nl": "nl",  # 네덜란드어
-    "tr": "tr",  # 터키어
-    "ar": "ar",  # 아랍어
-    "hi": "hi",  # 힌디어
-}
+if mt_on_cpu:
+    # torch 기본값(전체 코어)은 ASR 스레드와 경쟁하므로 MT 코어 수를 번역 단계 워커끼리 나눠 씀
+    cpu_planner.configure_torch(cpu_plan, workers=MT_STAGE_WORKERS)
+    print(f"MT threads: {cpu_planner.mt_threads_per_worker(cpu_plan, MT_STAGE_WORKERS)} per worker "
+          f"x {MT_STAGE_WORKERS} worker(s)")
+
+def make_translator(model_name):
+    """모델 이름으로 번역 파이프라인 생성"""
+    if mt_engine_name == 'echo':
+        return echo_translator
+    print(f"Initializing Translation Pipeline ({model_name})...")
+    mt_pipeline = pipeline("translation", model=model_name, device=torch.device(mt_device),
+                           torch_dtype=torch.bfloat16 if mt_device != 'cpu' else torch.float32)
+    print("Translation Pipeline initialized!")
+    return mt_pipeline
+
+# 부하에 따른 모델 캐스케이드 - 단계 0이 기본 모델, 부하가 높으면 세션을 다음 단계(작은 모델)로 옮김
+# ASR_CASCADE="large-v3-turbo,small,base", MT_CASCADE="facebook/nllb-200-distilled-1.3B,facebook/nllb-200-distilled-600M"
+def _model_list(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+def release_model_memory(handle):
+    """교체된 모델 해제 후 남은 메모리 정리"""
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+model_cascade = ModelCascade(
+    asr_models=_model_list(os.getenv('ASR_CASCADE', model_size)),
+    mt_models=_model_list(os.getenv('MT_CASCADE', os.getenv('MT_MODEL', "facebook/nllb-200-distilled-1.3B"))),
+    make_asr=make_asr_engine,
+    make_mt=make_translator,
+    on_close=release_model_memory,
+    policy=CascadePolicy(
+        downgrade_rtf=float(os.getenv('CASCADE_DOWNGRADE_RTF', '0.8')),
+        downgrade_lag=float(os.getenv('CASCADE_DOWNGRADE_LAG', '3.0')),
+        upgrade_rtf=float(os.getenv('CASCADE_UPGRADE_RTF', '0.35')),
+        upgrade_after=float(os.getenv('CASCADE_UPGRADE_AFTER', '30'))
+    )
+)
+if model_cascade.enabled:
+    print(f"Model cascade: {' > '.join(tier.name for tier in model_cascade.tiers)}")
+
+# 2단계 디코딩용 부분 인식 모델 (지정하지 않으면 같은 모델을 greedy로 사용)
+partial_model_size = os.getenv('WHISPER_PARTIAL_MODEL_SIZE')
+if partial_model_size and not asr_engine_name.startswith('fake'):
+    print(f"Initializing partial Whisper Model ({partial_model_size})...")
+    with cpu_stage('asr'):
+        partial_asr_engine = create_asr_engine(asr_engine_name, **dict(asr_engine_kwargs, model_size=partial_model_size))
+    partial_asr_handle = ModelHandle(partial_model_size, partial_asr_engine, release_model_memory)
+else:
+    partial_asr_handle = None
+
+# 무중단 모델 교체 - 새 모델을 백그라운드에서 로드/워밍업한 뒤 윈도우 사이에 교체
+# (POST /admin/models 또는 SIGHUP으로 .env의 ASR_CASCADE/MT_CASCADE 변경 반영)
+def warmup_asr_engine(engine):
+    """2초 잡음으로 한 번 인식 - 로드 실패나 CUDA 커널 초기화 지연을 교체 전에 드러냄"""
+    noise = (np.random.default_rng(0).standard_normal(32000) * 0.01).astype(np.float32)
+    with cpu_stage('asr'):
+        segments, _ = engine.transcribe(noise, TranscribeOptions(beam_size=1, vad_filter=False, language='en'))
+        list(segments)
+
+def warmup_translator(mt_pipeline):
+    """짧은 문장 하나 번역 - 결과가 비어 있으면 실패"""
+    with cpu_stage('mt'):
+        result = mt_pipeline("Hello, how are you?", src_lang='eng_Latn', tgt_lang='kor_Hang', max_length=64)
+    if not result or not result[0].get('translation_text', '').strip():
+        raise RuntimeError("Warm-up translation returned no text")
+
+model_swapper = ModelSwapper(
+    model_cascade,
+    loaders={'asr': make_asr_engine, 'mt': make_translator},
+    warmups={'asr': warmup_asr_engine, 'mt': warmup_translator},
+    policy=ProbationPolicy(
+        probation_uses=int(os.getenv('SWAP_PROBATION_USES', '20')),
+        probation_seconds=float(os.getenv('SWAP_PROBATION_SECONDS', '60'))
+    )
+)
+
+def reload_models_from_env(signum=None, frame=None):
+    """.env를 다시 읽어 바뀐 캐스케이드 단계 모델 교체 요청"""
+    load_dotenv(override=True)
+    targets = {
+        'asr': _model_list(os.getenv('ASR_CASCADE', os.getenv('WHISPER_MODEL_SIZE', model_size))),
+        'mt': _model_list(os.getenv('MT_CASCADE', os.getenv('MT_MODEL', "facebook/nllb-200-distilled-1.3B"))),
+    }
+    # 단계별 목표 모델 계산 후, 같은 새 모델로 바꿀 단계를 묶어 한 번에 교체 (모델은 한 번만 로드)
+    changes = {}
+    for tier in model_cascade.tiers:
+        for kind, names in targets.items():
+            if not names:
+                continue
+            name = names[min(tier.index, len(names) - 1)]
+            current = tier.asr_model if kind == 'asr' else tier.mt_model
+            if name != current:
+                changes.setdefault((kind, name), []).append(tier.index)
+    for (kind, name), tiers in changes.items():
+        model_swapper.request(kind, tiers, name)
+    logger.info("Model reload requested", extra={'swaps': len(changes)})
+
+if hasattr(signal, 'SIGHUP'):
+    signal.signal(signal.SIGHUP, reload_models_from_env)
 
-# 언어 감지 함수 - langdetect 사용
+# 겹치는 윈도우의 log-mel 특징을 세션별로 한 번만 계산 (faster-whisper 엔진)
+ASR_FEATURE_CACHE = os.getenv('ASR_FEATURE_CACHE', 'true').lower() in ('1', 'true', 'yes')
+
+# 세션별 지연/정확도 프로파일 (profiles.json, 수정 시 자동으로 다시 읽음)
+profile_store = ProfileStore(os.getenv('PROFILES_FILE'), default_name=os.getenv('DEFAULT_PROFILE', 'balanced'))
+
+def get_session_profile(session):
+    """세션에 선택된 프로파일 (설정 파일이 바뀌면 새 값 반영)"""
+    return profile_store.get(session.get('profile'))
+
+def acquire_window_engine(session, profile):
+    """
+    세션 모델 단계의 윈도우 인식 엔진 빌리기 - 사용 후 반드시 release() 호출
+    
+    Returns:
+        ModelHandle: 빌린 엔진 핸들 (handle.model이 엔진)
+    """
+    tier = session.get('model_tier', 0)
+    # 부분 인식 전용 모델은 기본 단계에서만 사용 (작은 단계는 그 단계 모델로 두 번 모두 인식)
+    if profile.asr.two_pass and tier == 0 and partial_asr_handle is not None:
+        return partial_asr_handle.acquire()
+    return model_cascade.acquire('asr', tier)
+
+# 언어 감지 초기화 - fastText LID 모델 (없으면 langdetect로 대체)
+print("Initializing Language Detection...")
+language_identifier = LanguageIdentifier(model_path=os.getenv('FASTTEXT_LID_MODEL'))
+print(f"Language Detection initialized! (backend: {language_identifier.backend})")
+
+# 언어 감지 함수
 def detect_language(text: str) -> tuple:
     """
-    텍스트에서 언어를 감지하는 함수 (langdetect 사용)
+    텍스트에서 언어를 감지하는 함수 (LanguageIdentifier 사용)
     
     Args:
         text: 언어를 감지할 텍스트
@@ -121,39 +265,17 @@ def detect_language(text: str) -> tuple:
     Returns:
         tuple: (감지된 언어 코드, 신뢰도)
     """
-    if not text or len(text.strip()) < 10:  # 최소 10자 이상 필요
+    nllb_lang, confidence = language_identifier.detect(text)
+    if nllb_lang is None:  # 최소 10자 이상 필요
         return None, 0.0
     
-    try:
-        if not LANGDETECT_AVAILABLE:
-            logger.warning("langdetect 라이브러리를 찾을 수 없습니다.")
-            return "eng_Latn", 0.0
-            
-        # 언어 감지 수행 (최대 3개 언어 후보)
-        detection = detect_langs(text)
-        
-        if not detection:
-            logger.warning("언어 감지 결과가 없습니다.")
-            return "eng_Latn", 0.0
-            
-        # 최상위 언어와 신뢰도
-        top_lang = detection[0].lang
-        top_confidence = float(detection[0].prob)
-        
-        logger.info(f"감지된 언어: {top_lang} (신뢰도: {top_confidence:.4f})")
-        
-        # NLLB 언어 코드로 변환
-        nllb_lang = LANGUAGE_MAPPING.get(top_lang, "eng_Latn")  # 기본값은 영어
-        
-        # 신뢰도 임계값 적용 (0.5 미만은 신뢰할 수 없음)
-        if top_confidence < 0.3:  # 임계값 낮춤 (0.5 → 0.3)
-            logger.warning(f"언어 감지 신뢰도가 낮음: {top_confidence}")    # 신뢰도가 낮더라도 감지된 언어 사용
-        
-        return nllb_lang, top_confidence
-        
-    except LangDetectException as e:
-        logger.exception(f"언어 감지 오류: {e}")
-        return "eng_Latn", 0.0  # 오류 시 영어로 가정
+    logger.debug("감지된 언어: %s (신뢰도: %.4f)", nllb_lang, confidence)
+    
+    # 신뢰도 임계값 적용 (0.5 미만은 신뢰할 수 없음)
+    if confidence < 0.3:  # 임계값 낮춤 (0.5 → 0.3)
+        logger.warning("언어 감지 신뢰도가 낮음: %s", confidence)    # 신뢰도가 낮더라도 감지된 언어 사용
+    
+    return nllb_lang, confidence
 
 @dataclass
 class SentenceManager:
@@ -167,10 +289,12 @@ class SentenceManager:
     auto_send_threshold: int = 8  # 수정: 임계값 낮춤 (10->8)
     stability_counter: int = 0  # 텍스트 안정성 카운터
     last_stable_text: str = ""  # 안정적인 마지막 텍스트 저장
+    segmenter: SentenceSegmenter = field(default_factory=SentenceSegmenter)  # 증분식 문장 분리기
     
     def reset(self):
         self.sentences = []
         self.current_sentence = ""
+        self.segmenter.reset()
         self.pending_text = ""
         self.stability_counter = 0
         self.last_stable_text = ""
@@ -248,18 +372,31 @@ class SessionManager:
                 'current_sentence': "",
                 'is_recording': False,
                 'audio_buffer': [],
+                'buffer_lock': threading.Lock(),  # 오디오 수신 스레드와 ASR 단계 사이의 버퍼 보호
+                'samples_received': 0,          # 녹음 시작 후 받은 샘플 수 (audio_buffer 끝의 절대 위치)
+                'mel_cache': MelFeatureCache() if ASR_FEATURE_CACHE else None,  # 겹치는 윈도우의 log-mel 특징 재사용
                 'last_processing_time': 0,
                 'current_chunk': 0,
+                'chunk_marks': deque(),         # 수신한 청크별 (끝 샘플 절대 위치, 청크 번호)
+                'window_chunk': 0,              # 마지막으로 처리한 윈도우의 끝 청크 번호 (지연 측정용)
+                'window_end_sample': 0,         # 마지막으로 처리한 윈도우 끝의 절대 위치
                 'sent_texts': set(),
                 'sent_translations': set(),
                 'last_partial_update': 0,
-                'partial_update_throttle': 0.2,
+                'profile': profile_store.default_name,  # 지연/정확도 프로파일 이름
                 'translation_history': [],
                 'transcript_history': [],
                 'buffer_reset_time': time.time(),
                 'sentence_manager': SentenceManager(),
+                'sentence_audio': SentenceAudioBuffer(),  # 마지막 확정 문장 이후 오디오 (2단계 디코딩용)
                 'recent_audio_energy': deque(maxlen=10),
                 'last_forced_process_time': 0,
+                'debug_log': SOCKET_DEBUG_LOG,  # 클라이언트로 디버그 로그 전송 여부
+                'caption_room': secrets.token_urlsafe(16),  # 자막 피드 방 이름 (기본값: 추측할 수 없는 임의 ID)
+                'model_tier': model_cascade.register(session_id).index,  # 모델 캐스케이드 단계 (0 = 기본 모델)
+                'tracer': trace_registry.tracer_for_new_session(session_id),  # 단계별 타임라인 추적기
+                'window_seq': 0,                # 처리한 오디오 윈도우 번호 (추적용)
+                'sentence_seq': 0,              # 확정 처리한 문장 번호 (추적용)
                 
                 # 언어 관련 필드
                 'source_language': 'eng_Latn',  # 기본 소스 언어: 영어
@@ -272,7 +409,6 @@ class SessionManager:
                 # 음성 활동 감지 관련 필드
                 'last_voice_activity_time': time.time(),
                 'silence_duration': 0.0,
-                'min_silence_for_processing': 2.5,  # 2.5초 이상 무음이면 문장 처리
                 'speech_in_progress': False,
                 'continuous_chunks_count': 0,  # 연속된 청크 수 카운터
                 'last_chunk_had_content': False  # 마지막 청크에 내용이 있었는지
@@ -284,58 +420,28 @@ class SessionManager:
             return self.sessions[session_id]
     
     def start_session_timer(self, session_id):
-        """세션 타이머 시작 (2초마다 확인)"""
+        """세션 타이머 시작 (프로파일의 timer_interval마다 확인, 기본 2초)"""
         def check_session():
-            """세션 타이머 함수 - 현재 문장 처리 확인"""
+            """세션 타이머 함수 - 문장 상태는 ASR 단계에서만 바꾸므로 확인 작업을 ASR 단계에 추가"""
             try:
-                if session_id not in self.sessions:
-                    return
-                    
-                session = self.sessions[session_id]
-                if not session['is_recording']:
-                    return
-                
-                # 현재 시간
-                current_time = time.time()
-                
-                # 문장 관리자
-                sentence_mgr = session['sentence_manager']
-                
-                # 발화가 진행 중이면 처리하지 않음
-                if session['speech_in_progress']:
-                    return
-                
-                # 마지막 음성 활동 후 충분한 시간이 지났는지 확인 (최소 4초)
-                silence_duration = current_time - session['last_voice_activity_time']
-                if silence_duration < 4.0:
-                    return
-                
-                # 문장이 일정 시간 동안 업데이트되지 않았고, 충분히 길면 처리
-                if sentence_mgr.current_sentence and current_time - sentence_mgr.last_update_time > 5.0:  # 5초 대기
-                    logger.info(f"Auto processing text after timeout: {sentence_mgr.current_sentence}")
-                    
-                    # 문장 길이가 기준 이상이면 처리
-                    word_count = len(sentence_mgr.current_sentence.split())
-                    
-                    # 최소 2단어 이상일 때 처리
-                    if word_count >= 2:
-                        translate_and_send(session_id, sentence_mgr.current_sentence, force_process=True)
-                        # 처리 후 초기화
-                        sentence_mgr.current_sentence = ""
-                        sentence_mgr.last_update_time = current_time
-                        sentence_mgr.stability_counter = 0
+                session = self.sessions.get(session_id)
+                if session and session['is_recording']:
+                    submit_job(asr_stage, session_id, flush_idle_sentence, session_id, key='timer', priority=BACKGROUND,
+                               block=False)
             except Exception as e:
-                logger.exception(f"Error in timer function: {e}")
+                logger.exception("Error in timer function: %s", e, extra={'session_id': session_id})
             finally:
                 # 세션이 아직 존재하면 타이머 재설정
                 with self.lock:
                     if session_id in self.sessions and self.sessions[session_id]['is_recording']:
-                        self.timers[session_id] = threading.Timer(2.0, check_session)
+                        interval = get_session_profile(self.sessions[session_id]).segmentation.timer_interval
+                        self.timers[session_id] = threading.Timer(interval, check_session)
                         self.timers[session_id].daemon = True
                         self.timers[session_id].start()
         
         # 최초 타이머 설정
-        self.timers[session_id] = threading.Timer(2.0, check_session)
+        interval = get_session_profile(self.sessions[session_id]).segmentation.timer_interval
+        self.timers[session_id] = threading.Timer(interval, check_session)
         self.timers[session_id].daemon = True
         self.timers[session_id].start()
     
@@ -367,53 +473,75 @@ class SessionManager:
             if session_id in self.sessions:
                 self.sessions[session_id][key] = value
 
+# 단계별 타임라인 추적 (TRACE_ENABLED=true 이면 모든 세션, 아니면 trace 설정한 세션만)
+trace_registry = TraceRegistry(default_enabled=os.getenv('TRACE_ENABLED', 'false').lower() in ('1', 'true', 'yes'))
+
 # 세션 관리자 생성
 session_manager = SessionManager()
 
-# 오디오 처리 상태 관리
-audio_processing_lock = threading.Lock()
-min_processing_interval = 2.0  # 최소 처리 간격 (초)
-
-# 오디오 버퍼 크기 설정
-MAX_BUFFER_SIZE = 16000 * 5  # 2초 분량의 오디오 (16kHz)
-MAX_BUFFER_AGE = 10  # 최대 버퍼 유지 시간 (초)
+# 처리 단계 - ASR(윈도우 인식, 문장 확정)과 번역을 별도 워커로 동시에 실행
+# 같은 세션의 작업은 단계마다 순서대로 하나씩 실행되므로 이벤트 순서가 유지됨
+# 세션 사이에서는 확정 작업 우선, 같은 우선순위끼리는 처리 시간 기준으로 공평하게 실행
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '64'))
+scheduler_options = {
+    'max_pending': PIPELINE_QUEUE_SIZE,
+    'quantum': float(os.getenv('SCHEDULER_QUANTUM', '0.1')),
+    'aging': float(os.getenv('SCHEDULER_AGING', '2.0'))
+}
+# ASR 단계의 FINAL 작업(강제 처리, 녹음 종료)은 윈도우로 가득 찬 대기열에서도 예비 자리에 바로 추가
+# (번역 단계는 모든 작업이 FINAL이고 가득 차면 ASR 단계가 기다려야 하므로 예비 자리 없음)
+asr_stage = SessionStage('asr', workers=int(os.getenv('ASR_STAGE_WORKERS', '4')),
+                         final_reserve=int(os.getenv('PIPELINE_FINAL_RESERVE', str(PIPELINE_QUEUE_SIZE))),
+                         **scheduler_options)
+mt_stage = SessionStage('mt', workers=MT_STAGE_WORKERS, **scheduler_options)
 
-def is_sentence_end(text):
-    """문장의 끝인지 판단하는 함수"""
-    if not text:
-        return False
+def submit_job(stage, session_id, fn, *args, priority=PARTIAL, **options):
+    """
+    단계에 세션 작업 추가 - 추적 중인 세션이면 대기열에서 기다린 시간을 queue_wait span으로 기록
     
-    # 1. 명확한 문장 부호로 끝나는지 확인 (더 신중하게 체크)
-    if re.search(r'[.!?][\s"\']*$', text):
-        # 추가: 최소 단어 수 체크 (너무 짧은 문장은 끝으로 간주하지 않음)
-        if len(text.split()) >= 5:
-            return True
-        return False  # 짧은 문장은 더 내용이 이어질 수 있음
-    
-    # 2. 쉼표나 콜론으로 끝나면 특별한 조건에서만 문장으로 간주
-    if re.search(r'[,:][\s"\']*$', text):
-        # 단어 수가 충분히 많아야 문장으로 간주
-        if len(text.split()) > 12:  # 단어 수 임계값 증가
-            return True
-    
-    # 3. 단어 수만으로 문장 끝 판단 (매우 긴 문장인 경우)
-    if len(text.split()) > 20:  # 단어 수 임계값 크게 증가
-        # 접속사로 끝나지 않는지 체크 (한국어, 영어 모두 고려)
-        last_word = text.split()[-1].lower()
-        korean_conjunctions = {'그리고', '또한', '하지만', '그러나', '또는', '혹은', '왜냐하면', '때문에', '만약', '비록'}
-        english_conjunctions = {'and', 'or', 'but', 'because', 'while', 'if', 'unless', 'although', 'since', 'when', 'as', 'while'}
-        
-        # 접속사로 끝나면 문장이 더 이어질 가능성이 높음
-        if last_word not in korean_conjunctions and last_word not in english_conjunctions:
-            return True
+    Args:
+        stage: asr_stage 또는 mt_stage
+        priority: 작업 우선순위
+        **options: SessionStage.submit() 옵션 (key, deadline, block, timeout)
     
-    # 기본적으로 문장 경계가 아님
-    return False
+    Returns:
+        bool: 추가했으면 True
+    """
+    session = session_manager.sessions.get(session_id)
+    tracer = session['tracer'] if session is not None else None
+    if tracer is None or not tracer.enabled:
+        return stage.submit(session_id, fn, *args, priority=priority, **options)
+    
+    enqueued = tracer.now()
+    
+    def traced(*job_args):
+        tracer.complete('queue_wait', enqueued, stage=stage.name, job=fn.__name__, priority=PRIORITY_NAMES[priority])
+        return fn(*job_args)
+    return stage.submit(session_id, traced, *args, priority=priority, **options)
+
+# 읽기 전용 자막 피드 (세션/방별 최근 확정 문장 링 버퍼, 모든 시청자가 공유)
+caption_feed = CaptionFeed(maxlen=int(os.getenv('CAPTION_FEED_SIZE', '200')))
+SSE_KEEPALIVE_SECONDS = 15.0
+
+# 오디오 처리 상태 관리
+audio_processing_lock = threading.Lock()
 
 def clean_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
+def is_reliable_segment(segment):
+    """신뢰할 수 있는 세그먼트인지 확인"""
+    # 세그먼트 신뢰도 확인
+    if hasattr(segment, 'avg_logprob') and segment.avg_logprob < -1.0:
+        return False  # 신뢰도가 낮은 세그먼트 무시
+    
+    # 너무 짧은 세그먼트 무시 (노이즈일 가능성)
+    if len(segment.text.strip()) < 2:
+        return False
+    
+    return True
+
 def segments_to_text(segments, source_lang=None, min_confidence=0.6):
     """
     음성 인식 결과 후처리 함수
@@ -430,17 +558,7 @@ def segments_to_text(segments, source_lang=None, min_confidence=0.6):
         return ""
     
     # 세그먼트 신뢰도 필터링
-    reliable_segments = []
-    for segment in segments:
-        # 세그먼트 신뢰도 확인
-        if hasattr(segment, 'avg_logprob') and segment.avg_logprob < -1.0:
-            continue  # 신뢰도가 낮은 세그먼트 무시
-        
-        # 너무 짧은 세그먼트 무시 (노이즈일 가능성)
-        if len(segment.text.strip()) < 2:
-            continue
-            
-        reliable_segments.append(segment)
+    reliable_segments = [segment for segment in segments if is_reliable_segment(segment)]
     
     # 신뢰할 수 있는 세그먼트가 없으면 빈 문자열 반환
     if not reliable_segments:
@@ -483,28 +601,195 @@ def remove_stuttering(text):
     
     return " ".join(result)
 
+def send_debug_log(session_id, message, *args):
+    """
+    클라이언트 디버그 로그 전송 (세션의 debug_log가 켜진 경우에만)
+
+    메시지 포매팅은 전송할 때만 수행 (logger와 같은 % 형식)
+    """
+    session = session_manager.sessions.get(session_id)
+    if not session or not session.get('debug_log'):
+        return
+    socketio.emit("logger", "server: " + (message % args if args else message), room=session_id)
+
+# 클러스터 모드 - 세션마다 소유 노드(오디오 버퍼와 모델 실행)를 정하고, 클라이언트가 연결된 노드는
+# 그 세션의 이벤트를 소유 노드로 전달 (CLUSTER_REGISTRY=redis://... 또는 file:///...)
+cluster = None
+
+# 소유 노드 장애 시 다른 노드에서 복원할 세션 상태
+JOURNAL_FIELDS = ('source_language', 'target_language', 'auto_detect', 'detected_language', 'language_confidence',
+                  'whisper_language', 'profile', 'caption_room', 'debug_log')
+JOURNAL_HISTORY = 5  # 중복 확인에 쓰는 최근 인식/번역 결과 수
+
+# 자막 피드 복제 - 시청자 HTTP 요청은 어느 노드로든 갈 수 있으므로 모든 노드가 같은 방을 유지
+CAPTION_OPEN_EVENT = 'caption_open'
+CAPTION_PUBLISH_EVENT = 'caption_publish'
+
+# 이벤트 이름 -> 핸들러(session_id, *args)
+session_events = {}
+
+def session_event(event):
+    """
+    세션 이벤트 핸들러 등록 - 핸들러는 handler(session_id, *args) 형태
+    
+    클러스터 모드에서 다른 노드가 소유한 세션의 이벤트는 그 노드로 전달하여 처리
+    (소유 노드에서 결과는 메시지 큐를 거쳐 이 노드에 연결된 클라이언트로 전송됨)
+    """
+    def decorator(handler):
+        session_events[event] = handler
+        
+        def receive(*args):
+            session_id = request.sid
+            if cluster is not None:
+                owner = cluster.owner_of(session_id)
+                if owner != cluster.node_id:
+                    cluster.forward(owner, session_id, event, args)
+                    return
+            handler(session_id, *args)
+        
+        socketio.on(event)(receive)
+        return handler
+    return decorator
+
 @socketio.on('connect')
 def handle_connect():
     session_id = request.sid
-    session_manager.create_session(session_id)
-    logger.info(f'Client connected: {session_id}')
-    emit("logger", "server: Client connected")
+    if cluster is not None:
+        owner = cluster.place(session_id)
+        if owner != cluster.node_id:
+            cluster.forward(owner, session_id, 'connect')
+            logger.info("Client connected, session placed on %s", owner, extra={'session_id': session_id})
+            return
+    open_session(session_id)
 
 @socketio.on('disconnect')
 def handle_disconnect():
     session_id = request.sid
+    if cluster is not None:
+        owner = cluster.owner_of(session_id)
+        cluster.forget(session_id)
+        if owner != cluster.node_id:
+            cluster.forward(owner, session_id, 'disconnect')
+            logger.info("Client disconnected", extra={'session_id': session_id})
+            return
+    close_session(session_id)
+
+def open_session(session_id):
+    session = session_manager.create_session(session_id)
+    # 시청자가 첫 문장 전에 연결할 수 있도록 자막 방을 미리 만들고 화자에게 이름을 알림
+    open_caption_room(session['caption_room'])
+    socketio.emit('caption_room', {'room': session['caption_room']}, room=session_id)
+    logger.info("Client connected", extra={'session_id': session_id})
+    send_debug_log(session_id, "Client connected")
+
+def close_session(session_id):
     session_manager.delete_session(session_id)
-    logger.info(f'Client disconnected: {session_id}')
-    emit("logger", "server: Client disconnected")
+    asr_stage.drop_session(session_id)
+    mt_stage.drop_session(session_id)
+    trace_registry.finish(session_id)
+    model_cascade.unregister(session_id)
+    if cluster is not None:
+        cluster.release(session_id)
+    logger.info("Client disconnected", extra={'session_id': session_id})
+
+def open_caption_room(room):
+    """자막 방 생성 (클러스터 모드면 다른 노드에도 생성)"""
+    caption_feed.get_or_create(room)
+    if cluster is not None:
+        cluster.broadcast(CAPTION_OPEN_EVENT, [room])
+
+def publish_caption(room, text, translation, source_language, target_language):
+    """자막 피드에 확정 문장 추가 (클러스터 모드면 다른 노드의 같은 방에도 추가)"""
+    caption_feed.publish(room, text, translation, source_language, target_language)
+    if cluster is not None:
+        cluster.broadcast(CAPTION_PUBLISH_EVENT, [room, text, translation, source_language, target_language])
+
+def journal_session(session_id):
+    """세션 설정과 최근 결과를 클러스터 저널에 기록 (클러스터 모드가 아니면 아무 일도 하지 않음)"""
+    session = session_manager.sessions.get(session_id)
+    if cluster is None or session is None:
+        return
+    state = {key: session[key] for key in JOURNAL_FIELDS}
+    state.update(
+        is_recording=session['is_recording'],
+        current_chunk=session['current_chunk'],
+        current_sentence=session['sentence_manager'].current_sentence,
+        transcript_history=session['transcript_history'][-JOURNAL_HISTORY:],
+        translation_history=session['translation_history'][-JOURNAL_HISTORY:]
+    )
+    cluster.save_journal(session_id, state)
+
+def restore_session(session_id, journal):
+    """장애 노드에서 넘겨받은 세션을 저널 상태로 다시 생성 (버퍼에 있던 오디오는 복원하지 않음)"""
+    session_manager.create_session(session_id)
+    session = session_manager.sessions[session_id]
+    for key in JOURNAL_FIELDS:
+        if key in journal:
+            session[key] = journal[key]
+    if not profile_store.exists(session['profile']):
+        session['profile'] = profile_store.default_name
+    if journal.get('is_recording'):
+        handle_start_recording(session_id)
+        session['current_chunk'] = session['window_chunk'] = journal.get('current_chunk', 0)
+        session['sentence_manager'].current_sentence = journal.get('current_sentence', "")
+        session['sentence_manager'].last_update_time = time.time()
+        session['transcript_history'] = list(journal.get('transcript_history', []))
+        session['translation_history'] = list(journal.get('translation_history', []))
+    journal_session(session_id)
+    logger.info("Session restored from journal", extra={
+        'session_id': session_id, 'failed_node': journal.get('node_id'), 'recording': bool(journal.get('is_recording'))
+    })
+
+def drop_lost_session(session_id):
+    """
+    다른 노드로 넘어갔거나 장애 처리로 정리된 세션을 이 노드에서 정리
+    
+    소유 노드였으면 상태를 지우고, 클라이언트가 이 노드에 연결되어 있으면 연결을 끊어
+    다시 접속하도록 한다 (새 연결은 다시 배정됨).
+    """
+    if session_id in session_manager.sessions:
+        close_session(session_id)
+    if cluster.connected(session_id):
+        cluster.forget(session_id)
+        socketio.server.disconnect(session_id, namespace='/', ignore_queue=True)
+
+def dispatch_cluster_event(session_id, event, args):
+    """다른 노드에서 전달된 세션 이벤트 처리 (클러스터 수신함 스레드, 도착 순서대로 실행)"""
+    if event == 'connect':
+        open_session(session_id)
+        return
+    if event == 'disconnect':
+        close_session(session_id)
+        return
+    if event == ClusterNode.LOST_EVENT:
+        drop_lost_session(session_id)
+        return
+    if event == CAPTION_OPEN_EVENT:
+        caption_feed.get_or_create(*args)
+        return
+    if event == CAPTION_PUBLISH_EVENT:
+        caption_feed.publish(*args)
+        return
+    
+    if session_id not in session_manager.sessions:
+        # 이미 종료된 세션의 늦게 도착한 이벤트는 버림
+        if cluster.registry.owner(session_id) != cluster.node_id:
+            return
+        # 장애 노드에서 넘겨받은 세션 - 저널로 상태 복원
+        journal = args[0] if event == ClusterNode.RESTORE_EVENT else cluster.registry.load_journal(session_id)
+        restore_session(session_id, journal or {})
+    
+    handler = session_events.get(event)
+    if handler is not None:
+        handler(session_id, *args)
 
 # 언어 설정 업데이트 이벤트 핸들러
-@socketio.on('update_language_config')
-def handle_language_config(config):
+@session_event('update_language_config')
+def handle_language_config(session_id, config):
     """언어 설정 업데이트 처리"""
-    session_id = request.sid
     session = session_manager.get_session(session_id)
     
-    logger.info(f"언어 설정 업데이트 요청: {config}")
+    logger.info("언어 설정 업데이트 요청: %s", config, extra={'session_id': session_id})
     
     # 소스 언어 설정
     if 'sourceLanguage' in config:
@@ -520,8 +805,7 @@ def handle_language_config(config):
             session['auto_detect'] = False  # 수동 선택 시 자동 감지 비활성화
             
             # Whisper 언어 코드 업데이트
-            lang_code = next((k for k, v in LANGUAGE_MAPPING.items() if v == src_lang), 'en')
-            session['whisper_language'] = WHISPER_LANGUAGE_MAPPING.get(lang_code, 'en')
+            session['whisper_language'] = whisper_language_for(src_lang)
     
     # 타겟 언어 설정
     if 'targetLanguage' in config:
@@ -535,26 +819,61 @@ def handle_language_config(config):
             session['source_language'] = config['sourceLanguage']
             
             # Whisper 언어 코드 업데이트
-            lang_code = next((k for k, v in LANGUAGE_MAPPING.items() if v == config['sourceLanguage']), 'en')
-            session['whisper_language'] = WHISPER_LANGUAGE_MAPPING.get(lang_code, 'en')
+            session['whisper_language'] = whisper_language_for(config['sourceLanguage'])
     
-    logger.info(f"언어 설정 업데이트 완료: source={session['source_language']}, " +
-               f"target={session['target_language']}, auto_detect={session['auto_detect']}, " + 
-               f"whisper_language={session['whisper_language']}")
-    
-    emit("logger", f"server: 언어 설정 업데이트됨 (소스: {session['source_language']}, 타겟: {session['target_language']}, 자동감지: {session['auto_detect']})", room=session_id)
+    # 지연/정확도 프로파일 설정
+    if 'profile' in config:
+        if profile_store.exists(config['profile']):
+            session['profile'] = config['profile']
+        else:
+            logger.warning("Unknown profile requested: %s", config['profile'], extra={'session_id': session_id})
+            socketio.emit('error', f"Unknown profile: {config['profile']} (available: {', '.join(profile_store.names())})", room=session_id)
+    
+    # 자막 피드 방 이름 설정 (여러 화자가 같은 방으로 보낼 수 있음)
+    if config.get('captionRoom'):
+        session['caption_room'] = str(config['captionRoom'])
+        open_caption_room(session['caption_room'])
+        socketio.emit('caption_room', {'room': session['caption_room']}, room=session_id)
+    
+    # 단계별 타임라인 추적 설정
+    if 'trace' in config:
+        session['tracer'] = trace_registry.enable(session_id) if config['trace'] else trace_registry.disable(session_id)
+    
+    # 디버그 로그 스트림 설정
+    if 'debugLog' in config:
+        session['debug_log'] = bool(config['debugLog'])
+    
+    logger.info("언어 설정 업데이트 완료", extra={
+        'session_id': session_id,
+        'source_language': session['source_language'],
+        'target_language': session['target_language'],
+        'auto_detect': session['auto_detect'],
+        'whisper_language': session['whisper_language'],
+        'profile': session['profile']
+    })
+    
+    send_debug_log(session_id, "언어 설정 업데이트됨 (소스: %s, 타겟: %s, 자동감지: %s, 프로파일: %s)",
+                   session['source_language'], session['target_language'], session['auto_detect'], session['profile'])
+    journal_session(session_id)
 
-@socketio.on('start_recording')
-def handle_start_recording():
-    session_id = request.sid
+@session_event('start_recording')
+def handle_start_recording(session_id):
     session = session_manager.get_session(session_id)
     
     # 세션 초기화
     session['complete_text'] = ""
     session['current_sentence'] = ""
-    session['audio_buffer'] = []
+    with session['buffer_lock']:
+        session['audio_buffer'] = []
+        session['samples_received'] = 0
+        session['chunk_marks'].clear()
+        session['sentence_audio'].clear()
+    if session['mel_cache'] is not None:
+        session['mel_cache'].reset()
     session['is_recording'] = True
     session['current_chunk'] = 0
+    session['window_chunk'] = 0
+    session['window_end_sample'] = 0
     session['sent_texts'] = set()
     session['sent_translations'] = set()
     session['translation_history'] = []
@@ -574,20 +893,19 @@ def handle_start_recording():
     session['detected_language'] = None
     session['language_confidence'] = 0.0
     
-    logger.info(f"Start recording: {session_id}")
-    emit("logger", "server: Start recording")
+    logger.info("Start recording", extra={'session_id': session_id})
+    send_debug_log(session_id, "Start recording")
+    journal_session(session_id)
 
-@socketio.on('chunk_number')
-def handle_chunk_number(chunk_number):
+@session_event('chunk_number')
+def handle_chunk_number(session_id, chunk_number):
     """청크 번호 수신 이벤트"""
-    session_id = request.sid
     session = session_manager.get_session(session_id)
     session['current_chunk'] = chunk_number
 
-@socketio.on('force_process')
-def handle_force_process(data):
+@session_event('force_process')
+def handle_force_process(session_id, data):
     """강제 처리 요청 처리"""
-    session_id = request.sid
     session = session_manager.get_session(session_id)
     
     if not session['is_recording']:
@@ -601,28 +919,76 @@ def handle_force_process(data):
     # 강제 처리 시간 업데이트
     session['last_forced_process_time'] = current_time
     
+    # 이미 대기 중인 윈도우 처리 뒤에 실행되도록 ASR 단계에 추가
+    # (기다리지 않음 - 클러스터 모드에서는 수신함 스레드 하나가 모든 세션의 이벤트를 처리.
+    #  FINAL 예비 자리까지 가득 차 추가하지 못해도 다음 타이머 확인에서 문장이 처리됨)
+    submit_job(asr_stage, session_id, force_flush_sentence, session_id, current_time, key='force', priority=FINAL,
+               block=False)
+
+def force_flush_sentence(session_id, current_time):
+    """강제 처리 (ASR 단계 작업) - 현재 문장을 바로 확정"""
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return
+    
     # 발화 진행 중 플래그 초기화 (사용자가 강제로 처리 요청했으므로)
     session['speech_in_progress'] = False
     session['last_chunk_had_content'] = False
-    session['silence_duration'] = session['min_silence_for_processing'] + 0.5  # 무음 기간 충분히 설정
+    session['silence_duration'] = get_session_profile(session).segmentation.min_silence_for_processing + 0.5  # 무음 기간 충분히 설정
     
     # 현재 문장이 있으면 번역 처리 (길이 제한 완화)
     sentence_mgr = session['sentence_manager']
     if sentence_mgr.current_sentence and len(sentence_mgr.current_sentence) >= 5:
-        logger.info(f"Forced processing text: {sentence_mgr.current_sentence}")
-        translate_and_send(session_id, sentence_mgr.current_sentence)
+        logger.debug("Forced processing text: %s", sentence_mgr.current_sentence)
+        commit_sentence(session_id, sentence_mgr.current_sentence)
         sentence_mgr.current_sentence = ""
         sentence_mgr.last_update_time = current_time
     
-    logger.info("Force processing completed")
+    logger.debug("Force processing completed")
 
-@socketio.on('audio_chunk')
-def handle_audio(audio_data):
-    session_id = request.sid
+def flush_idle_sentence(session_id):
+    """세션 타이머 확인 (ASR 단계 작업) - 오래 갱신되지 않은 문장 처리"""
+    session = session_manager.sessions.get(session_id)
+    if session is None or not session['is_recording']:
+        return
+    
+    # 현재 시간
+    current_time = time.time()
+    
+    # 문장 관리자
+    sentence_mgr = session['sentence_manager']
+    segmentation = get_session_profile(session).segmentation
+    
+    # 발화가 진행 중이면 처리하지 않음
+    if session['speech_in_progress']:
+        return
+    
+    # 마지막 음성 활동 후 충분한 시간이 지났는지 확인 (기본 4초)
+    silence_duration = current_time - session['last_voice_activity_time']
+    if silence_duration < segmentation.timer_min_silence:
+        return
+    
+    # 문장이 일정 시간 동안 업데이트되지 않았고, 충분히 길면 처리
+    if sentence_mgr.current_sentence and current_time - sentence_mgr.last_update_time > segmentation.timer_idle_timeout:  # 기본 5초 대기
+        logger.info("Auto processing text after timeout", extra={'session_id': session_id})
+        
+        # 문장 길이가 기준 이상이면 처리
+        word_count = count_tokens(sentence_mgr.current_sentence)
+        
+        # 최소 2단어 이상일 때 처리
+        if word_count >= 2:
+            commit_sentence(session_id, sentence_mgr.current_sentence)
+            # 처리 후 초기화
+            sentence_mgr.current_sentence = ""
+            sentence_mgr.last_update_time = current_time
+            sentence_mgr.stability_counter = 0
+
+@session_event('audio_chunk')
+def handle_audio(session_id, audio_data):
     session = session_manager.get_session(session_id)
     
     if not session['is_recording']:
-        logger.info("Received audio but not recording")
+        logger.debug("Received audio but not recording")
         return
     
     try:
@@ -630,61 +996,106 @@ def handle_audio(audio_data):
         float_data = np.frombuffer(audio_data, dtype=np.float32)
         
         # 오디오 버퍼에 추가
-        session['audio_buffer'].extend(float_data)
+        with session['buffer_lock']:
+            session['audio_buffer'].extend(float_data)
+            session['samples_received'] += len(float_data)
+            session['chunk_marks'].append((session['samples_received'], session['current_chunk']))
+            session['sentence_audio'].append(float_data)
+            buffered = len(session['audio_buffer'])
+        session['tracer'].instant('receive', samples=len(float_data), chunk=session['current_chunk'], buffered=buffered)
         
-        # 버퍼 유지 시간 체크 - 너무 오래된 버퍼는 리셋하되 발화 중이면 대기
-        current_time = time.time()
-        if current_time - session['buffer_reset_time'] > MAX_BUFFER_AGE:
-            # 발화가 진행 중이거나 최근 청크에 내용이 있으면 처리하지 않음
-            if not session['speech_in_progress'] and not session['last_chunk_had_content']:
-                # 현재 처리 중인 문장이 있으면 강제 처리
-                if session['sentence_manager'].current_sentence:
-                    logger.info(f"Buffer reset: Processing current sentence before reset: {session['sentence_manager'].current_sentence}")
-                    translate_and_send(session_id, session['sentence_manager'].current_sentence)
-                    session['sentence_manager'].current_sentence = ""
+        # 버퍼가 충분히 찼거나 오래되었으면 ASR 단계에 처리 요청
+        # (세션 버퍼를 읽어 처리하는 작업이므로 세션당 하나만 대기)
+        window = get_session_profile(session).window
+        if buffered >= window.window_samples or time.time() - session['buffer_reset_time'] > window.max_buffer_age:
+            # 부분 인식은 기한 안에 시작하지 못하면 버림 (남은 오디오는 다음 윈도우 작업이 처리)
+            submit_job(asr_stage, session_id, run_audio_window, session_id, key='window', priority=PARTIAL,
+                       deadline=time.monotonic() + window.partial_deadline, block=False)
             
+    except Exception as e:
+        logger.exception("Error processing audio chunk: %s", e, extra={'session_id': session_id})
+        socketio.emit('error', f'Error processing audio chunk: {str(e)}', room=session_id)
+
+def run_audio_window(session_id):
+    """ASR 단계 작업 - 오래된 버퍼 정리 후 윈도우 처리"""
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return
+    
+    # 버퍼 유지 시간 체크 - 너무 오래된 버퍼는 리셋하되 발화 중이면 대기
+    window = get_session_profile(session).window
+    current_time = time.time()
+    if current_time - session['buffer_reset_time'] > window.max_buffer_age:
+        # 발화가 진행 중이거나 최근 청크에 내용이 있으면 처리하지 않음
+        if not session['speech_in_progress'] and not session['last_chunk_had_content']:
+            # 현재 처리 중인 문장이 있으면 강제 처리
+            if session['sentence_manager'].current_sentence:
+                logger.debug("Buffer reset: Processing current sentence before reset: %s", session['sentence_manager'].current_sentence)
+                commit_sentence(session_id, session['sentence_manager'].current_sentence)
+                session['sentence_manager'].current_sentence = ""
+            
+            with session['buffer_lock']:
                 session['audio_buffer'] = []
-                session['buffer_reset_time'] = current_time
-                logger.info(f"Buffer age exceeds {MAX_BUFFER_AGE}s, resetting buffer")
-        
-        # 버퍼가 충분히 차면 처리
-        if len(session['audio_buffer']) >= MAX_BUFFER_SIZE:
+                # 버린 버퍼와 함께 재인식용 문장 오디오도 비움
+                session['sentence_audio'].discard_until(session['samples_received'])
+            session['buffer_reset_time'] = current_time
+            logger.info("Buffer age exceeds %ss, resetting buffer", window.max_buffer_age, extra={'session_id': session_id})
+    
+    # 버퍼가 충분히 차면 처리
+    if len(session['audio_buffer']) >= window.window_samples:
+        with session['tracer'].span('window', chunk=session['current_chunk']):
             process_audio_buffer(session_id)
-            
-    except Exception as e:
-        logger.exception(f"Error processing audio chunk: {e}")
-        emit('error', f'Error processing audio chunk: {str(e)}')
 
 def process_audio_buffer(session_id):
-    """오디오 버퍼 처리"""
-    session = session_manager.get_session(session_id)
+    """오디오 버퍼 처리 (ASR 단계에서 실행)"""
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return
+    profile = get_session_profile(session)
+    window = profile.window
+    tracer = session['tracer']
     
     # 너무 빈번한 처리 방지 (스로틀링)
     current_time = time.time()
     with audio_processing_lock:
-        # 마지막 처리 후 최소 2초 경과 체크
-        if current_time - session['last_processing_time'] < min_processing_interval:
-            logger.debug(f"Throttling audio processing: {current_time - session['last_processing_time']:.2f}s elapsed")
+        # 마지막 처리 후 최소 처리 간격(기본 2초) 경과 체크
+        if current_time - session['last_processing_time'] < window.min_interval:
+            logger.debug("Throttling audio processing: %.2fs elapsed", current_time - session['last_processing_time'])
+            tracer.instant('throttled', elapsed=round(current_time - session['last_processing_time'], 3))
             return
         session['last_processing_time'] = current_time
     
     buffer_length = len(session['audio_buffer'])
     chunk_num = session['current_chunk']
 
-    # 버퍼가 너무 작으면 처리하지 않음 (최소 2초 분량)
-    if buffer_length < 16000 * 2:
-        logger.info(f"Buffer too small: {buffer_length} samples, waiting for more data")
+    # 버퍼가 너무 작으면 처리하지 않음 (기본 최소 2초 분량)
+    if buffer_length < window.min_buffer_samples:
+        logger.debug("Buffer too small: %d samples, waiting for more data", buffer_length)
+        tracer.instant('buffer_too_small', samples=buffer_length)
         return
         
-    logger.info(f"Processing audio buffer: {buffer_length} samples (chunk: {chunk_num})")
-    emit("logger", f"server: Processing audio buffer: {buffer_length} samples", room=session_id)
+    logger.debug("Processing audio buffer: %d samples (chunk: %s)", buffer_length, chunk_num)
+    send_debug_log(session_id, "Processing audio buffer: %d samples", buffer_length)
     
     # 처리할 오디오 데이터 준비
-    process_buffer = np.array(session['audio_buffer'][:MAX_BUFFER_SIZE])
-    
-    # 버퍼 소비 비율 변경: 2/3만 소비 (더 많은 오버랩)
-    consume_size = int(MAX_BUFFER_SIZE * 2 / 3)
-    session['audio_buffer'] = session['audio_buffer'][consume_size:]
+    session['window_seq'] += 1
+    window_id = session['window_seq']
+    with session['buffer_lock']:
+        # 윈도우 시작의 절대 위치 (특징 캐시 격자 기준)
+        window_start_sample = session['samples_received'] - len(session['audio_buffer'])
+        process_buffer = np.array(session['audio_buffer'][:window.window_samples], dtype=np.float32)
+        
+        # 버퍼 소비 비율: 기본 2/3만 소비 (더 많은 오버랩)
+        session['audio_buffer'] = session['audio_buffer'][window.consume_samples:]
+        
+        # 윈도우 끝 샘플이 들어 있던 청크 - 이 윈도우에서 나온 결과는 이 청크 번호로 전송
+        # (다음 윈도우는 더 뒤에서 끝나므로 그 앞에서 끝난 청크 기록은 버림)
+        window_end_sample = window_start_sample + len(process_buffer)
+        session['window_end_sample'] = window_end_sample
+        chunk_marks = session['chunk_marks']
+        while chunk_marks and chunk_marks[0][0] < window_end_sample:
+            chunk_marks.popleft()
+        session['window_chunk'] = chunk_marks[0][1] if chunk_marks else session['current_chunk']
     
     # 오디오 에너지 확인
     energy_level = np.sqrt(np.mean(np.square(process_buffer)))
@@ -712,12 +1123,12 @@ def process_audio_buffer(session_id):
         session['silence_duration'] = silence_duration
         
         # 일정 시간 이상 무음이면 발화 종료로 간주
-        if silence_duration > session['min_silence_for_processing'] and session['speech_in_progress']:
+        if silence_duration > profile.segmentation.min_silence_for_processing and session['speech_in_progress']:
             session['speech_in_progress'] = False
             # 발화 종료 처리 - 현재 문장이 있으면 처리
             if session['sentence_manager'].current_sentence:
-                logger.info(f"Speech ended, processing current sentence: {session['sentence_manager'].current_sentence}")
-                translate_and_send(session_id, session['sentence_manager'].current_sentence)
+                logger.debug("Speech ended, processing current sentence: %s", session['sentence_manager'].current_sentence)
+                commit_sentence(session_id, session['sentence_manager'].current_sentence)
                 session['sentence_manager'].current_sentence = ""
             
             # 연속 청크 카운터 리셋
@@ -725,9 +1136,20 @@ def process_audio_buffer(session_id):
         
         # 에너지가 너무 낮으면 처리 중단
         if not has_energy and energy_level < energy_threshold * 0.5:
-            logger.info(f"Insufficient audio energy: {energy_level:.5f} < {energy_threshold:.5f}")
+            logger.debug("Insufficient audio energy: %.5f < %.5f", energy_level, energy_threshold)
+            # 확정 대기 중인 문장이 없으면 무음 윈도우까지의 오디오는 재인식할 필요 없음
+            if not session['sentence_manager'].current_sentence:
+                discard_sentence_audio(session)
+            tracer.instant('low_energy', window=window_id, energy=float(energy_level))
             return
     
+    # 모델 캐스케이드 부하 측정 - 처리 시작 시 밀려 있던 오디오와 윈도우 디코딩 시간
+    # (문장 처리, 2단계 디코딩, 번역 단계 대기는 모델 크기와 관계없으므로 RTF에서 제외)
+    backlog_seconds = max(0, buffer_length - window.window_samples) / 16000
+    decode_seconds = 0.0
+    window_handle = None
+    failed = False
+    
     try:
         # 언어 설정 처리
         use_auto_detect = session['auto_detect']
@@ -743,90 +1165,165 @@ def process_audio_buffer(session_id):
                 whisper_language = None
         else:
             # 수동 언어 선택 - 명시적으로 언어 지정
-            lang_code = next((k for k, v in LANGUAGE_MAPPING.items() if v == session['source_language']), 'en')
-            whisper_language = WHISPER_LANGUAGE_MAPPING.get(lang_code, 'en')
+            whisper_language = whisper_language_for(session['source_language'])
         
-        logger.info(f"Using Whisper language: {whisper_language}, auto_detect: {use_auto_detect}")
+        logger.debug("Using Whisper language: %s, auto_detect: %s", whisper_language, use_auto_detect)
         
         # Whisper로 텍스트 변환 - 중요 수정 부분
-        segments, info = model.transcribe(
-            process_buffer,
-            beam_size=5,  # 수정: 빔 사이즈 축소하여 처리 속도 개선
-            no_speech_threshold=0.6,  # 수정: 임계값 낮춤
-            compression_ratio_threshold=2.4,
-            # 수정: 이전 텍스트 의존성 제거
-            condition_on_previous_text=False,  # 이전 텍스트 참조하지 않음
-            initial_prompt=None,  # 초기 프롬프트 없음
-            language=whisper_language,
-            task="transcribe",
-            vad_filter=True,
-            vad_parameters={
-                "min_silence_duration_ms": 500,
-                "speech_pad_ms": 300,
-                "threshold": 0.5
-            }
-        )
+        # 2단계 디코딩이면 부분 인식은 greedy(또는 작은 모델)로 빠르게 처리
+        # 처리 중에 모델이 교체되어도 이 윈도우는 빌린 모델로 끝까지 처리
+        window_handle = acquire_window_engine(session, profile)
+        window_engine = window_handle.model
+        decode_options = profile.asr.transcribe_options(language=whisper_language, partial=True)
+        decode_step = time.perf_counter()
+        features = window_features(session, window_engine, process_buffer, window_start_sample, window_id)
+        decode_start = tracer.now()
+        segments, info = window_engine.transcribe(process_buffer, decode_options, features=features)
+        decode_seconds += time.perf_counter() - decode_step
         
-        # 세그먼트에서 텍스트 추출
+        # 언어가 정해져 있으면 세그먼트를 디코딩되는 대로 문장 처리에 전달
+        # (언어 감지 전에는 전체 텍스트로 감지 후 다시 인식해야 하므로 한 번에 처리)
+        if profile.asr.stream_segments and not (use_auto_detect and session['detected_language'] is None):
+            new_text, segment_seconds = stream_segments(session_id, segments, window_id, decode_start,
+                                                        samples=len(process_buffer), beam_size=decode_options.beam_size,
+                                                        engine=window_engine.name, language=whisper_language)
+            decode_seconds += segment_seconds
+            if not new_text:
+                logger.debug("No text detected in audio")
+                return
+            session['sentence_manager'].last_update_time = current_time
+            return
+        
+        # 세그먼트에서 텍스트 추출 (세그먼트는 지연 생성되므로 디코딩 시간에 포함)
+        decode_step = time.perf_counter()
         new_text = segments_to_text(segments, source_lang=session['source_language'], min_confidence=0.6)
+        decode_seconds += time.perf_counter() - decode_step
+        tracer.complete('asr_decode', decode_start, window=window_id, samples=len(process_buffer),
+                        beam_size=decode_options.beam_size, engine=window_engine.name,
+                        language=whisper_language, chars=len(new_text))
         
         if not new_text:
-            logger.info("No text detected in audio")
+            logger.debug("No text detected in audio")
             return
         
         # 첫 텍스트 감지 후 언어 감지 수행 (아직 감지된 언어가 없을 때)
-        if use_auto_detect and session['detected_language'] is None and len(new_text.split()) >= 3:
+        if use_auto_detect and session['detected_language'] is None and count_tokens(new_text) >= 3:
             # 감지 수행
-            detected_nllb_lang, confidence = detect_language(new_text)
+            with tracer.span('language_detection', window=window_id, chars=len(new_text)) as span:
+                detected_nllb_lang, confidence = detect_language(new_text)
+                span.set(language=detected_nllb_lang, confidence=confidence)
             
             if detected_nllb_lang and confidence > 0.3:  # 낮은 임계값 적용
                 session['detected_language'] = detected_nllb_lang
                 session['language_confidence'] = confidence
                 
                 # Whisper 언어 코드 업데이트
-                lang_code = next((k for k, v in LANGUAGE_MAPPING.items() if v == detected_nllb_lang), 'en')
-                session['whisper_language'] = WHISPER_LANGUAGE_MAPPING.get(lang_code, 'en')
+                session['whisper_language'] = whisper_language_for(detected_nllb_lang)
                 
                 # 클라이언트에 감지된 언어 정보 전송
-                emit('detected_language', {
+                socketio.emit('detected_language', {
                     'language_code': detected_nllb_lang,
                     'confidence': confidence
                 }, room=session_id)
                 
-                logger.info(f"Initially detected language: {detected_nllb_lang} (confidence: {confidence:.4f})")
-                emit("logger", f"server: 감지된 언어: {detected_nllb_lang} (신뢰도: {confidence:.2f})", room=session_id)
+                logger.info("Initially detected language", extra={
+                    'session_id': session_id, 'language': detected_nllb_lang, 'confidence': round(confidence, 4)
+                })
+                send_debug_log(session_id, "감지된 언어: %s (신뢰도: %.2f)", detected_nllb_lang, confidence)
                 
                 # 음성 텍스트 변환 다시 수행 (이번에는 감지된 언어 사용)
-                logger.info(f"Re-transcribing with detected language: {session['whisper_language']}")
-                segments, info = model.transcribe(
+                logger.debug("Re-transcribing with detected language: %s", session['whisper_language'])
+                decode_start = tracer.now()
+                decode_step = time.perf_counter()
+                segments, info = window_engine.transcribe(
                     process_buffer,
-                    beam_size=5,
-                    condition_on_previous_text=False,  # 수정: 이전 텍스트 참조하지 않음
-                    initial_prompt=None,  # 초기 프롬프트 없음
-                    language=session['whisper_language'],
-                    task="transcribe"  # 항상 transcribe 사용
+                    profile.asr.transcribe_options(language=session['whisper_language'], vad_filter=False, partial=True),
+                    features=features
                 )
                 
                 # 텍스트 다시 추출
                 new_text = segments_to_text(segments)
+                decode_seconds += time.perf_counter() - decode_step
+                tracer.complete('asr_redecode', decode_start, window=window_id, samples=len(process_buffer),
+                                language=session['whisper_language'], chars=len(new_text))
                 
                 if not new_text:
-                    logger.info("No text detected after re-transcription")
+                    logger.debug("No text detected after re-transcription")
                     return
         
         # 텍스트 분리 처리
-        handle_text_segmentation(session_id, new_text)
+        with tracer.span('segmentation', window=window_id, chars=len(new_text)):
+            handle_text_segmentation(session_id, new_text)
         
         # 문장 관리자 시간 업데이트
         session['sentence_manager'].last_update_time = current_time
         
     except Exception as e:
-        logger.exception(f"Error during audio processing: {e}")
-        emit('error', f'Error during audio processing: {str(e)}', room=session_id)
+        failed = True
+        logger.exception("Error during audio processing: %s", e, extra={'session_id': session_id})
+        socketio.emit('error', f'Error during audio processing: {str(e)}', room=session_id)
+    finally:
+        if window_handle is not None:
+            window_handle.release(failed)
+        observe_window_load(session_id, session, decode_seconds, len(process_buffer) / 16000, backlog_seconds)
 
-def handle_text_segmentation(session_id, new_text):
-    """텍스트 세그먼트 처리 및 문장 경계 감지"""
-    session = session_manager.get_session(session_id)
+def window_features(session, engine, audio, start, window_id):
+    """
+    윈도우의 log-mel 특징 - 앞 윈도우와 겹치는 구간은 세션 캐시에서 재사용
+    
+    Returns:
+        np.ndarray: 특징 (캐시를 쓰지 않거나 엔진이 지원하지 않으면 None - 엔진이 직접 계산)
+    """
+    cache = session['mel_cache']
+    if cache is None or not engine.capabilities.precomputed_features:
+        return None
+    with session['tracer'].span('features', window=window_id, samples=len(audio)) as span:
+        computed = cache.frames_computed
+        features = cache.features_for(audio, start, engine.mel_filters)
+        span.set(frames=features.shape[-1], computed=cache.frames_computed - computed)
+    return features
+
+def observe_window_load(session_id, session, decode_seconds, audio_seconds, backlog_seconds):
+    """
+    윈도우 디코딩 부하를 모델 캐스케이드에 기록하고 단계가 바뀌면 클라이언트에 알림
+    
+    Args:
+        decode_seconds: 윈도우 ASR 디코딩 시간 (디코딩 전에 실패했으면 0 - 기록하지 않음)
+        audio_seconds: 윈도우 오디오 길이
+        backlog_seconds: 처리 시작 시 밀려 있던 오디오 길이
+    """
+    if not model_cascade.enabled or audio_seconds <= 0 or decode_seconds <= 0:
+        return
+    
+    change = model_cascade.observe(session_id, rtf=decode_seconds / audio_seconds, lag=backlog_seconds)
+    if change is None:
+        return
+    
+    session['model_tier'] = change.new.index
+    logger.info("Model tier changed", extra={
+        'session_id': session_id, 'direction': change.direction, 'reason': change.reason,
+        'from_tier': change.old.index, 'to_tier': change.new.index, 'rtf': change.rtf, 'lag': change.lag
+    })
+    session['tracer'].instant('model_tier', tier=change.new.index, reason=change.reason, rtf=change.rtf, lag=change.lag)
+    send_debug_log(session_id, "모델 단계 변경: %s -> %s (%s)", change.old.name, change.new.name, change.reason)
+    socketio.emit('model_tier', dict(change.new.to_dict(), previous=change.old.index, reason=change.reason), room=session_id)
+
+def handle_text_segmentation(session_id, new_text, final=True):
+    """
+    텍스트 세그먼트 처리 및 문장 경계 감지
+    
+    Args:
+        session_id: 세션 ID
+        new_text: 윈도우 인식 텍스트 (이전 윈도우와 겹치는 부분 포함)
+        final: 윈도우 디코딩이 끝났는지 여부 - False이면 스트리밍 중 첫 세그먼트까지의
+               텍스트이며, 윈도우 종료 처리는 finish_window_segmentation()에서 수행
+    
+    Returns:
+        bool: 문장에 반영했으면 True (중복이거나 너무 짧아 무시하면 False)
+    """
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return False
     current_time = time.time()
     
     # 텍스트 정리
@@ -839,27 +1336,36 @@ def handle_text_segmentation(session_id, new_text):
         
         # 유사도가 매우 높은 경우 (중복 텍스트)
         if similarity > 0.95:
-            logger.info(f"Duplicate text detected (similarity: {similarity:.2f}), ignoring: {new_text}")
-            return
+            logger.debug("Duplicate text detected (similarity: %.2f), ignoring: %s", similarity, new_text)
+            session['tracer'].instant('duplicate_window_text', similarity=round(similarity, 3))
+            return False
     
-    # 최근 처리 텍스트 기록
-    session['last_processed_text'] = new_text
+    # 너무 짧은 텍스트는 무시 (스트리밍 중이면 다음 세그먼트와 합쳐서 다시 시도)
+    if count_tokens(new_text) < 3:
+        logger.debug("Text too short, ignoring: %s", new_text)
+        if final:
+            session['last_processed_text'] = new_text
+            session['last_chunk_had_content'] = False
+        return False
     
-    # 너무 짧은 텍스트는 무시
-    if len(new_text.split()) < 3:
-        logger.info(f"Text too short, ignoring: {new_text}")
-        session['last_chunk_had_content'] = False
-        return
+    # 최근 처리 텍스트 기록 (스트리밍이면 윈도우 전체 텍스트를 윈도우 종료 시 기록)
+    if final:
+        session['last_processed_text'] = new_text
     
     # 문장 관리자
     sentence_mgr = session['sentence_manager']
+    segmentation = get_session_profile(session).segmentation
+    segmenter = sentence_mgr.segmenter
+    segmenter.min_sentence_tokens = segmentation.min_sentence_tokens
+    segmenter.clause_tokens = segmentation.clause_tokens
+    segmenter.max_tokens = segmentation.max_tokens
     prev_sentence = sentence_mgr.current_sentence
     
     # 이전 텍스트 유지를 위한 핵심 로직 개선
     if not prev_sentence:
         # 첫 번째 청크면 그대로 설정
         sentence_mgr.current_sentence = new_text
-        logger.info(f"First chunk set: {new_text}")
+        logger.debug("First chunk set: %s", new_text)
         session['last_chunk_had_content'] = True
     else:
         # 유사도 확인
@@ -870,12 +1376,12 @@ def handle_text_segmentation(session_id, new_text):
         if new_text.startswith(prev_sentence):
             # 자연스러운 문장 확장 - 항상 업데이트
             sentence_mgr.current_sentence = new_text
-            logger.info(f"Natural extension: '{prev_sentence}' -> '{new_text}'")
+            logger.debug("Natural extension: '%s' -> '%s'", prev_sentence, new_text)
             
         # 2. 역확장 케이스: 새 문장이 이전 문장에 포함된 경우
         elif prev_sentence.startswith(new_text):
             # 이전 문장이 더 길고 완전하다면 그대로 유지
-            logger.info(f"Keeping longer previous text: '{prev_sentence}'")
+            logger.debug("Keeping longer previous text: '%s'", prev_sentence)
             # 그대로 유지 (아무 작업 없음)
             
         # 3. 유사도 높은 경우: 문맥이 유지되는 경우 
@@ -898,35 +1404,36 @@ def handle_text_segmentation(session_id, new_text):
                         suffix = new_text[b_idx+largest_match.size:]
                         merged_text = prefix + common_text + suffix
                         
-                        logger.info(f"Text merged: '{prev_sentence}' + '{new_text}' -> '{merged_text}'")
+                        logger.debug("Text merged: '%s' + '%s' -> '%s'", prev_sentence, new_text, merged_text)
                         sentence_mgr.current_sentence = merged_text
                     else:
                         # 병합 실패시 더 긴 텍스트 선택
                         sentence_mgr.current_sentence = longer_text
-                        logger.info(f"Using longer text after failed merge: '{longer_text}'")
+                        logger.debug("Using longer text after failed merge: '%s'", longer_text)
                 else:
                     # 공통 부분이 작을 경우 더 긴 텍스트 유지
                     sentence_mgr.current_sentence = longer_text
-                    logger.info(f"Using longer text (small common part): '{longer_text}'")
+                    logger.debug("Using longer text (small common part): '%s'", longer_text)
         
         # 4. 완전히 다른 문장 - 문장 경계로 간주하고 새 문장 시작
         else:
             # 이전 문장이 충분히 의미 있으면 번역 처리 후 새 문장 시작
-            if len(prev_sentence.split()) >= 5:  # 최소 단어 수 요구 (3 → 5)
-                logger.info(f"New sentence detected. Processing previous: '{prev_sentence}'")
+            segmenter.feed(prev_sentence)
+            if count_tokens(prev_sentence) >= 5:  # 최소 단어 수 요구 (3 → 5)
+                logger.debug("New sentence detected. Processing previous: '%s'", prev_sentence)
                 # 이전 문장 처리
-                if is_sentence_end(prev_sentence):  # 명확한 문장일 때만 번역
-                    translate_and_send(session_id, prev_sentence)
+                if segmenter.is_sentence_end():  # 명확한 문장일 때만 번역
+                    commit_sentence(session_id, prev_sentence)
                     # 새 문장 시작
                     sentence_mgr.current_sentence = new_text
                 else:
                     # 완전한 문장이 아니라면 병합 시도
                     sentence_mgr.current_sentence = f"{prev_sentence} {new_text}"
-                    logger.info(f"Joining incomplete sentences: '{prev_sentence} {new_text}'")
+                    logger.debug("Joining incomplete sentences: '%s %s'", prev_sentence, new_text)
             else:
                 # 이전 문장이 너무 짧으면 그냥 새 문장으로 대체
                 sentence_mgr.current_sentence = new_text
-                logger.info(f"Replacing short previous text: '{prev_sentence}' -> '{new_text}'")
+                logger.debug("Replacing short previous text: '%s' -> '%s'", prev_sentence, new_text)
 
         # 내용이 변경됐는지 여부 확인
         if prev_sentence == sentence_mgr.current_sentence:
@@ -938,106 +1445,425 @@ def handle_text_segmentation(session_id, new_text):
             # 음성 활동 시간 업데이트 (내용이 바뀌었으므로 활동 중)
             session['last_voice_activity_time'] = current_time
     
+    # 확정된 문장 처리 - 종결 부호 뒤에 텍스트가 이어진 문장은 바로 번역
+    commit_closed_sentences(session_id, session)
+    
     # 실시간 부분 업데이트 전송 (스로틀링 적용)
-    if current_time - session.get('last_partial_update', 0) >= session['partial_update_throttle']:
-        logger.info(f"Current sentence: {sentence_mgr.current_sentence}")
-        emit("logger", f"server: 인식 중: {sentence_mgr.current_sentence}", room=session_id)
-        
-        # 클라이언트에 현재 문장 전송
-        emit('partial_transcription', {
-            'text': sentence_mgr.current_sentence,
-            'continuous': True
-        }, room=session_id)
-        
-        session['last_partial_update'] = current_time
+    send_partial_transcription(session_id, session, current_time)
+    
+    if final:
+        check_sentence_complete(session_id, session)
+    return True
+
+def merge_segment_overlap(current, text):
+    """
+    현재 문장 끝부분과 겹치는 세그먼트 병합
+    
+    윈도우가 이전 윈도우와 겹치므로 첫 세그먼트 이후에도 이미 반영된 내용이 다시
+    나올 수 있다. 윈도우 병합과 같은 기준(유사도 0.95 이상이면 중복, 8자 넘게
+    공통이면 겹침)을 세그먼트 길이만큼의 현재 문장 끝부분에 적용한다.
+    
+    Returns:
+        str: 병합한 문장 (중복이면 current 그대로)
+    """
+    if not current:
+        return text
+    
+    # 세그먼트와 겹칠 수 있는 현재 문장 끝부분
+    tail_start = max(0, len(current) - 2 * len(text))
+    tail = current[tail_start:]
+    
+    # 1. 중복: 이미 끝부분에 있는 세그먼트
+    if text in tail or difflib.SequenceMatcher(None, current[-len(text):], text).ratio() > 0.95:
+        return current
+    
+    # 2. 겹침: 끝부분의 마지막 구간이 세그먼트 맨 앞과 같으면 그 뒤만 이어 붙임
+    match = difflib.SequenceMatcher(None, tail, text).find_longest_match(0, len(tail), 0, len(text))
+    if match.size > 8 and match.a + match.size >= len(tail) - 3 and match.b <= 3:
+        return clean_text(current[:tail_start + match.a] + text[match.b:])
+    
+    # 3. 겹치지 않는 새 내용
+    return clean_text(f"{current} {text}")
+
+def append_segment_text(session_id, text):
+    """
+    스트리밍 중 두 번째 이후 세그먼트 처리
+    
+    같은 윈도우의 세그먼트는 시간 순서대로 이어지므로 현재 문장 끝부분과의
+    겹침만 확인하여 붙인다.
+    
+    Returns:
+        bool: 새 내용이 있으면 True (중복 세그먼트면 False)
+    """
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return False
+    current_time = time.time()
+    sentence_mgr = session['sentence_manager']
+    
+    merged = merge_segment_overlap(sentence_mgr.current_sentence, text)
+    if merged == sentence_mgr.current_sentence:
+        logger.debug("Duplicate segment text, ignoring: %s", text)
+        session['tracer'].instant('duplicate_segment_text', chars=len(text))
+        return False
+    
+    sentence_mgr.current_sentence = merged
+    session['last_chunk_had_content'] = True
+    session['last_voice_activity_time'] = current_time
+    
+    commit_closed_sentences(session_id, session)
+    send_partial_transcription(session_id, session, current_time)
+    return True
+
+def finish_window_segmentation(session_id, window_text):
+    """스트리밍 윈도우 종료 처리 - 중복 확인 기록, 마지막 부분 결과 전송, 문장 완성 체크"""
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return
+    session['last_processed_text'] = clean_text(window_text)
+    # 스로틀링으로 전송되지 않은 마지막 세그먼트까지 반영
+    send_partial_transcription(session_id, session, time.time(), force=True)
+    check_sentence_complete(session_id, session)
+
+def commit_closed_sentences(session_id, session):
+    """종결 부호 뒤에 텍스트가 이어져 끝난 것이 확실한 문장을 번역"""
+    sentence_mgr = session['sentence_manager']
+    segmenter = sentence_mgr.segmenter
+    closed_spans = segmenter.feed(sentence_mgr.current_sentence)
+    if closed_spans:
+        for start, end in closed_spans:
+            commit_sentence(session_id, sentence_mgr.current_sentence[start:end])
+        sentence_mgr.current_sentence = segmenter.consume(closed_spans[-1][1])
+
+def send_partial_transcription(session_id, session, current_time, force=False):
+    """
+    현재 문장을 클라이언트에 전송 (partial_update_throttle 간격 제한)
+    
+    Args:
+        force: 간격과 관계없이 전송 (마지막으로 보낸 내용과 같으면 생략)
+    """
+    sentence_mgr = session['sentence_manager']
+    throttle = get_session_profile(session).segmentation.partial_update_throttle
+    if force:
+        if sentence_mgr.current_sentence == session.get('last_partial_text'):
+            return
+    elif current_time - session.get('last_partial_update', 0) < throttle:
+        return
     
-    # 문장 완성 체크 - 중요: 발화가 진행 중이거나 최근 청크에 내용이 있었다면 처리하지 않음!
-    if is_sentence_end(sentence_mgr.current_sentence) and not session['speech_in_progress'] and not session['last_chunk_had_content']:
-        translate_and_send(session_id, sentence_mgr.current_sentence)
+    logger.debug("Current sentence: %s", sentence_mgr.current_sentence)
+    send_debug_log(session_id, "인식 중: %s", sentence_mgr.current_sentence)
+    
+    # 클라이언트에 현재 문장 전송
+    session['tracer'].instant('emit_partial', chars=len(sentence_mgr.current_sentence))
+    socketio.emit('partial_transcription', {
+        'text': sentence_mgr.current_sentence,
+        'continuous': True,
+        'chunk': session['window_chunk']  # 이 결과에 반영된 마지막 청크 번호 (지연 측정용)
+    }, room=session_id)
+    
+    session['last_partial_update'] = current_time
+    session['last_partial_text'] = sentence_mgr.current_sentence
+
+def check_sentence_complete(session_id, session):
+    """문장 완성 체크 - 중요: 발화가 진행 중이거나 최근 청크에 내용이 있었다면 처리하지 않음!"""
+    sentence_mgr = session['sentence_manager']
+    if sentence_mgr.segmenter.is_sentence_end() and not session['speech_in_progress'] and not session['last_chunk_had_content']:
+        commit_sentence(session_id, sentence_mgr.current_sentence)
         sentence_mgr.current_sentence = ""
 
-def translate_and_send(session_id, text):
-    """텍스트 번역 및 결과 전송"""
-    session = session_manager.get_session(session_id)
+def stream_segments(session_id, segments, window_id, decode_start, **decode_args):
+    """
+    세그먼트를 디코딩되는 대로 하나씩 문장 처리에 전달
+    
+    segments_to_text()와 같은 필터(신뢰도, 길이)와 반복 단어 제거를 세그먼트마다
+    적용한다. 윈도우 앞부분(이전 윈도우와 겹치는 부분)은 기존 병합 로직으로 처리하고,
+    그 이후 세그먼트는 현재 문장 끝부분과의 겹침을 확인하여 붙이고 부분 결과를 전송한다.
+    
+    세그먼트는 지연 생성되므로 디코딩(asr_decode)과 문장 처리(segmentation, 확정 문장
+    번역 요청 포함) span을 세그먼트마다 따로 기록하고, 디코딩 시간만 따로 합산한다.
+    
+    Args:
+        decode_start: transcribe() 호출 직전 시각 (tracer.now())
+        **decode_args: asr_decode span 인자
+    
+    Returns:
+        tuple: (윈도우 전체 텍스트 - 세그먼트가 없으면 빈 문자열, 세그먼트 디코딩 시간(초))
+    """
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return "", 0.0
+    tracer = session['tracer']
+    texts = []
+    merged = False
+    segments = iter(segments)
+    step_start = decode_start
+    decode_seconds = 0.0
+    
+    while True:
+        decode_step = time.perf_counter()
+        segment = next(segments, None)
+        decode_seconds += time.perf_counter() - decode_step
+        tracer.complete('asr_decode', step_start, window=window_id, segment=len(texts), streaming=True,
+                        done=segment is None, **decode_args)
+        if segment is None:
+            break
+        step_start = tracer.now()
+        if not is_reliable_segment(segment):
+            continue
+        text = remove_stuttering(segment.text.strip())
+        if not text:
+            continue
+        
+        texts.append(text)
+        tracer.instant('asr_segment', window=window_id, index=len(texts),
+                       since_decode_ms=round((tracer.now() - decode_start) / 1e6, 1), chars=len(text))
+        with tracer.span('segmentation', window=window_id, segment=len(texts), chars=len(text)):
+            if merged:
+                append_segment_text(session_id, text)
+            else:
+                # 병합에 충분한 길이가 될 때까지 앞 세그먼트와 합쳐서 처리
+                merged = handle_text_segmentation(session_id, " ".join(texts), final=False)
+        step_start = tracer.now()
+    
+    window_text = clean_text(" ".join(texts))
+    if merged:
+        finish_window_segmentation(session_id, window_text)
+    elif window_text:
+        # 중복이거나 너무 짧아 반영하지 않은 윈도우
+        session['last_processed_text'] = window_text
+        if count_tokens(window_text) < 3:
+            session['last_chunk_had_content'] = False
+    return window_text, decode_seconds
+
+def discard_sentence_audio(session):
+    """마지막으로 처리한 윈도우 끝까지의 재인식용 오디오 제거 (문장을 확정하거나 버릴 때)"""
+    with session['buffer_lock']:
+        session['sentence_audio'].discard_until(session['window_end_sample'])
+
+def refine_with_final_pass(session_id, session, text):
+    """
+    2단계 디코딩 - 확정할 문장의 오디오만 빔 서치로 한 번 다시 인식
+    
+    재인식 결과가 문장과 정렬되면 그 끝까지, 아니면 마지막 윈도우 끝까지의
+    오디오를 제거하여 다음 문장은 그 이후 오디오만 재인식한다.
+    
+    Args:
+        session_id: 세션 ID
+        session: 세션 데이터
+        text: 부분 인식으로 얻은 확정 문장
+    
+    Returns:
+        str: 재인식한 문장 (정렬에 실패하면 원래 문장)
+    """
+    asr_settings = get_session_profile(session).asr
+    sentence_audio = session['sentence_audio']
+    if not asr_settings.two_pass or sentence_audio.seconds < 0.5:
+        discard_sentence_audio(session)
+        return text
+    
+    # 언어가 정해진 경우에만 지정 (자동 감지 중이면 Whisper가 판단)
+    if session['auto_detect'] and session['detected_language'] is None:
+        whisper_language = None
+    else:
+        whisper_language = session['whisper_language']
+    
+    with session['buffer_lock']:
+        audio = sentence_audio.audio()
+    try:
+        # 세그먼트는 지연 생성되므로 모두 읽을 때까지 모델을 빌려 둠
+        with model_cascade.lease('asr', session.get('model_tier', 0)) as final_engine:
+            segments, _ = final_engine.transcribe(
+                audio,
+                asr_settings.transcribe_options(language=whisper_language)
+            )
+            texts, ends = [], []
+            for segment in segments:
+                if not is_reliable_segment(segment):
+                    continue
+                segment_text = remove_stuttering(segment.text.strip())
+                if segment_text:
+                    texts.append(segment_text)
+                    ends.append(segment.end)
+    except Exception as e:
+        logger.exception("Final pass decoding error: %s", e, extra={'session_id': session_id})
+        discard_sentence_audio(session)
+        return text
+    
+    aligned = align_segments(texts, ends, text)
+    if aligned is None:
+        logger.debug("Final pass did not match partial text, keeping: %s", text)
+        discard_sentence_audio(session)
+        return text
+    
+    final_text, end_time, similarity = aligned
+    # 확정된 문장까지의 오디오 제거 - 다음 문장은 그 이후 오디오만 재인식
+    with session['buffer_lock']:
+        sentence_audio.consume(int(end_time * 16000))
+    logger.debug("Final pass (similarity %.2f): '%s' -> '%s'", similarity, text, final_text)
+    return clean_text(final_text)
+
+def commit_sentence(session_id, text):
+    """
+    확정 문장 처리 (ASR 단계) - 중복 확인과 2단계 디코딩 후 번역 단계에 전달
+    
+    번역은 번역 단계 워커에서 실행되므로 ASR 단계는 바로 다음 윈도우를 처리할 수 있다.
+    번역 단계 대기열이 가득 차면 자리가 날 때까지 기다린다 (ASR 처리 속도를 번역에 맞춤).
+    """
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return
+    tracer = session['tracer']
     
     # 텍스트 정리
     text = clean_text(text)
     
-    # 너무 짧은 텍스트는 무시
-    if len(text.split()) < 3:
+    # 너무 짧은 텍스트는 무시 (재인식할 일이 없으므로 오디오도 제거)
+    if count_tokens(text) < 3:
+        discard_sentence_audio(session)
         return
     
+    session['sentence_seq'] += 1
+    sentence_id = f"{session_id}:{session['sentence_seq']}"
+    tracer.async_begin('sentence', sentence_id, chars=len(text))
+    
     # 중복 확인 강화 - 더 엄격한 중복 체크
     if text in session['transcript_history']:
-        logger.info(f"Exact duplicate text, skipping translation: {text}")
+        logger.debug("Exact duplicate text, skipping translation: %s", text)
+        discard_sentence_audio(session)
+        tracer.async_end('sentence', sentence_id, result='duplicate')
         return
     
     # 유사 텍스트 중복 확인 (95% 이상 유사하면 중복으로 간주)
+    dedupe_start = tracer.now()
     for prev_text in session['transcript_history'][-5:]:  # 최근 5개 항목만 확인
         similarity = difflib.SequenceMatcher(None, text, prev_text).ratio()
         if similarity > 0.95:
-            logger.info(f"Similar text detected (similarity: {similarity:.2f}), skipping: {text}")
+            logger.debug("Similar text detected (similarity: %.2f), skipping: %s", similarity, text)
+            tracer.complete('dedupe', dedupe_start, sentence=sentence_id, duplicate=True)
+            discard_sentence_audio(session)
+            tracer.async_end('sentence', sentence_id, result='duplicate')
             return
+    tracer.complete('dedupe', dedupe_start, sentence=sentence_id, duplicate=False)
+    
+    # 2단계 디코딩: 확정 직전에 빔 서치로 다시 인식
+    with tracer.span('final_pass', sentence=sentence_id, chars_in=len(text)) as span:
+        text = refine_with_final_pass(session_id, session, text)
+        span.set(chars_out=len(text))
     
     # 히스토리에 추가
     session['transcript_history'].append(text)
     
+    # 타겟 언어 가져오기
+    target_language = session['target_language']
+    
+    # 소스 언어 결정 (확정 시점의 언어 설정으로 번역)
+    if session['auto_detect'] and session['detected_language'] is not None:
+        source_language = session['detected_language']
+    else:
+        source_language = session['source_language']
+    
+    # 번역 전송 시점이 아니라 문장이 확정된 시점의 윈도우 청크 번호로 지연 측정
+    chunk = session['window_chunk']
+    
+    wait_start = tracer.now()
+    queued = submit_job(mt_stage, session_id, translate_and_send, session_id, text, source_language, target_language,
+                        sentence_id, chunk, priority=FINAL)
+    tracer.complete('mt_enqueue', wait_start, sentence=sentence_id, queued=queued)
+    if not queued:
+        # 번역 단계가 종료되었거나 요청을 받지 않음 - 문장이 조용히 사라지지 않도록 알림
+        logger.error("Translation stage rejected sentence", extra={'session_id': session_id, 'sentence': sentence_id})
+        tracer.async_end('sentence', sentence_id, result='dropped')
+        socketio.emit('error', 'Translation is unavailable, sentence was not translated', room=session_id)
+
+def translate_and_send(session_id, text, source_language, target_language, sentence_id, chunk):
+    """텍스트 번역 및 결과 전송 (번역 단계에서 실행, chunk는 문장에 반영된 마지막 청크 번호)"""
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return
+    tracer = session['tracer']
+    
     try:
-        # 타겟 언어 가져오기
-        target_language = session['target_language']
-        
-        # 소스 언어 결정
-        if session['auto_detect'] and session['detected_language'] is not None:
-            source_language = session['detected_language']
-        else:
-            source_language = session['source_language']
-        
         # 같은 언어면 번역하지 않고 그대로 반환
         if source_language == target_language:
             translation_result = text
-            logger.info(f"Same language (source and target): {source_language}, skipping translation")
+            logger.debug("Same language (source and target): %s, skipping translation", source_language)
         else:
-            # 번역 수행
-            translation_result = translator(
-                text, 
-                src_lang=source_language, 
-                tgt_lang=target_language
-            )[0]['translation_text']
+            # 번역 수행 (세션 모델 단계의 번역기)
+            profile = get_session_profile(session)
+            tier = session['model_tier']
+            with tracer.span('translate', sentence=sentence_id, src=source_language, tgt=target_language,
+                             chars_in=len(text), tier=tier) as span, cpu_stage('mt'), \
+                    model_cascade.lease('mt', tier) as session_translator:
+                # torch OpenMP 스레드는 호출 스레드의 코어 고정을 물려받음
+                translation_result = session_translator(
+                    text, 
+                    src_lang=source_language, 
+                    tgt_lang=target_language,
+                    **profile.mt.generate_kwargs()
+                )[0]['translation_text']
+                span.set(chars_out=len(translation_result))
         
         # 번역 결과 중복 확인
         if translation_result in session['translation_history']:
-            logger.info(f"Duplicate translation, skipping: {translation_result}")
+            logger.debug("Duplicate translation, skipping: %s", translation_result)
+            tracer.async_end('sentence', sentence_id, result='duplicate_translation')
             return
         
         # 유사 번역 결과 중복 확인
         for prev_translation in session['translation_history'][-5:]:
             similarity = difflib.SequenceMatcher(None, translation_result, prev_translation).ratio()
             if similarity > 0.95:
-                logger.info(f"Similar translation detected (similarity: {similarity:.2f}), skipping: {translation_result}")
+                logger.debug("Similar translation detected (similarity: %.2f), skipping: %s", similarity, translation_result)
+                tracer.async_end('sentence', sentence_id, result='duplicate_translation')
                 return
         
         # 히스토리에 추가
         session['translation_history'].append(translation_result)
         
         # 결과 전송
-        emit('translation', {
+        emit_start = tracer.now()
+        socketio.emit('translation', {
             'text': text,
-            'translation': translation_result
+            'translation': translation_result,
+            'chunk': chunk  # 문장에 반영된 마지막 청크 번호 (지연 측정용)
         }, room=session_id)
+        tracer.complete('emit', emit_start, sentence=sentence_id, chars=len(translation_result))
+        
+        logger.info("Sentence translated", extra={
+            'session_id': session_id, 'source_language': source_language, 'target_language': target_language,
+            'text_chars': len(text), 'translation_chars': len(translation_result)
+        })
+        send_debug_log(session_id, "번역: %s", translation_result)
         
-        emit("logger", f"server: 번역: {translation_result}", room=session_id)
+        # 자막 피드에 추가 - 직렬화는 여기서 한 번만 수행되고 모든 시청자가 공유
+        publish_caption(session['caption_room'], text, translation_result, source_language, target_language)
+        journal_session(session_id)
+        tracer.async_end('sentence', sentence_id, result='translated')
         
     except Exception as e:
-        logger.exception(f"Translation error: {e}")
+        logger.exception("Translation error: %s", e, extra={'session_id': session_id})
+        tracer.async_end('sentence', sentence_id, result='error', error=type(e).__name__)
 
-@socketio.on('stop_recording')
-def handle_stop():
-    session_id = request.sid
+@session_event('stop_recording')
+def handle_stop(session_id):
     session = session_manager.get_session(session_id)
     session['is_recording'] = False
     
-    logger.info("Stop recording")
-    emit("logger", "server: Stop recording")
+    logger.info("Stop recording", extra={'session_id': session_id})
+    send_debug_log(session_id, "Stop recording")
+    journal_session(session_id)
+    
+    # 대기 중인 윈도우 처리 뒤에 남은 버퍼와 마지막 문장 처리
+    # (기다리지 않음 - FINAL 작업은 대기열이 가득 차도 예비 자리에 추가됨)
+    if not submit_job(asr_stage, session_id, finish_recording, session_id, priority=FINAL, block=False):
+        logger.error("ASR stage rejected stop_recording", extra={'session_id': session_id})
+        socketio.emit('error', 'Server is overloaded, the last sentence was not processed', room=session_id)
+
+def finish_recording(session_id):
+    """녹음 종료 처리 (ASR 단계 작업)"""
+    session = session_manager.sessions.get(session_id)
+    if session is None:
+        return
     
     # 남은 버퍼 처리
     if session['audio_buffer'] and len(session['audio_buffer']) > 4000:
@@ -1046,12 +1872,170 @@ def handle_stop():
     # 마지막 문장 처리
     sentence_mgr = session['sentence_manager']
     if sentence_mgr.current_sentence:
-        translate_and_send(session_id, sentence_mgr.current_sentence)
+        commit_sentence(session_id, sentence_mgr.current_sentence)
         sentence_mgr.current_sentence = ""
 
 @app.route('/')
 def index():
     return send_from_directory('../client/public', 'index.html')
 
+def _caption_ring(room):
+    """자막 방 조회 - 화자가 만들지 않은 방은 404"""
+    ring = caption_feed.get(room)
+    if ring is None:
+        abort(404)
+    return ring
+
+def _caption_document(ring, kind, body, mimetype):
+    """ETag 기반 조건부 응답"""
+    etag = ring.etag(kind)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Access-Control-Allow-Origin': '*'}
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype=mimetype, headers=headers)
+
+@app.route('/captions/<room>.json')
+def caption_json(room):
+    """최근 확정 자막 JSON (?since=<id> 이면 그 이후 항목만)"""
+    ring = _caption_ring(room)
+    since = request.args.get('since', type=int)
+    if since is None:
+        return _caption_document(ring, 'json', ring.render_json(), 'application/json')
+    
+    # 현재 버전보다 큰 id는 다시 만들어지기 전 방의 id - 링 전체를 보냄
+    if since > ring.version:
+        since = 0
+    body = ",".join(entry.json for entry in ring.since(since))
+    return _caption_document(ring, f'json-{since}',
+                             f'{{"epoch": "{ring.epoch}", "version": {ring.version}, "captions": [{body}]}}',
+                             'application/json')
+
+@app.route('/captions/<room>.vtt')
+def caption_vtt(room):
+    """최근 확정 자막 WebVTT (?track=translation|original|both)"""
+    track = request.args.get('track', 'translation')
+    if track not in VTT_TRACKS:
+        return Response(f"Unknown track: {track}", status=400)
+    ring = _caption_ring(room)
+    return _caption_document(ring, f'vtt-{track}', ring.render_vtt(track), 'text/vtt')
+
+@app.route('/captions/<room>/events')
+def caption_events(room):
+    """Server-Sent Events 자막 스트림 (Last-Event-ID 이후 항목부터 전송)"""
+    ring = _caption_ring(room)
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    last_id = ring.resume_from(last_event_id) if last_event_id else None
+    if last_id is None:
+        # 새 시청자는 최근 몇 문장부터 시작
+        last_id = max(0, ring.version - request.args.get('backlog', 10, type=int))
+    
+    def stream(last_id):
+        # 연결 중에는 시청자 수에 포함되어 오래된 방 정리 대상에서 빠짐
+        ring.subscribe()
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                entries = ring.wait_since(last_id, SSE_KEEPALIVE_SECONDS)
+                if not entries:
+                    yield b": keep-alive\n\n"
+                    continue
+                for entry in entries:
+                    yield entry.sse
+                    last_id = entry.id
+        finally:
+            ring.unsubscribe()
+    
+    return Response(stream_with_context(stream(last_id)), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'Access-Control-Allow-Origin': '*'
+    })
+
+@app.route('/metrics/pipeline')
+def pipeline_metrics():
+    """ASR/번역 단계별 대기 작업 수, 대기/처리 시간"""
+    return Response(json.dumps({'stages': [asr_stage.stats(), mt_stage.stats()]}), mimetype='application/json')
+
+@app.route('/metrics/cluster')
+def cluster_metrics():
+    """클러스터 노드별 세션 수/용량과 노드 간 전달 통계"""
+    if cluster is None:
+        return Response(json.dumps({'enabled': False}), mimetype='application/json')
+    return Response(json.dumps(dict(cluster.status(), enabled=True)), mimetype='application/json')
+
+@app.route('/metrics/cascade')
+def cascade_metrics():
+    """모델 캐스케이드 단계별 세션 수, RTF, 단계 변경 횟수"""
+    return Response(json.dumps(model_cascade.metrics()), mimetype='application/json')
+
+def admin_allowed():
+    """ADMIN_TOKEN이 있으면 Bearer 토큰 확인, 없으면 로컬 접속만 허용"""
+    token = os.getenv('ADMIN_TOKEN')
+    if token:
+        # 응답 시간으로 토큰을 추측할 수 없도록 일정 시간 비교
+        return hmac.compare_digest(request.headers.get('Authorization', '').encode(), f"Bearer {token}".encode())
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/admin/models', methods=['GET', 'POST'])
+def admin_models():
+    """
+    모델 교체 상태 조회(GET) 또는 교체 요청(POST)
+    
+    POST 본문: {"kind": "asr" | "mt", "tier": 0, "model": "large-v3"}
+               (여러 단계를 같은 모델로 바꾸려면 "tiers": [1, 2])
+    """
+    if not admin_allowed():
+        return Response("Forbidden", status=403)
+    if request.method == 'GET':
+        return Response(json.dumps(dict(model_swapper.status(), tiers=[tier.to_dict() for tier in model_cascade.tiers])),
+                        mimetype='application/json')
+    
+    body = request.get_json(silent=True) or {}
+    try:
+        tiers = [int(tier) for tier in body['tiers']] if 'tiers' in body else [int(body.get('tier', 0))]
+        job = model_swapper.request(body.get('kind'), tiers, body.get('model'))
+    except (TypeError, ValueError) as e:
+        return Response(json.dumps({'error': str(e)}), status=400, mimetype='application/json')
+    return Response(json.dumps(job.to_dict()), status=202, mimetype='application/json')
+
+@app.route('/trace')
+def trace_sessions():
+    """추적 중이거나 추적이 보관된 세션 목록 (세션 ID가 노출되므로 관리자만)"""
+    if not admin_allowed():
+        return Response("Forbidden", status=403)
+    return Response(json.dumps(trace_registry.session_ids()), mimetype='application/json')
+
+@app.route('/trace/<session_id>')
+def trace_export(session_id):
+    """세션 타임라인 Chrome trace JSON (chrome://tracing 또는 ui.perfetto.dev에서 열기)"""
+    if not admin_allowed():
+        return Response("Forbidden", status=403)
+    trace = trace_registry.export(session_id)
+    if trace is None:
+        # 클러스터 모드에서 추적 기록은 세션을 소유한 노드에만 있음
+        owner = cluster.registry.owner(session_id) if cluster is not None else None
+        if owner is not None and owner != cluster.node_id:
+            return Response(f"No trace for session: {session_id} (kept on node {owner})", status=404)
+        return Response(f"No trace for session: {session_id}", status=404)
+    return Response(json.dumps(trace), mimetype='application/json', headers={
+        'Content-Disposition': f'attachment; filename=trace-{session_id}.json'
+    })
+
+# 클러스터 참여 - 핸들러 등록 후 시작 (수신함 스레드가 바로 전달된 이벤트를 처리하므로)
+CLUSTER_REGISTRY = os.getenv('CLUSTER_REGISTRY')
+if CLUSTER_REGISTRY:
+    if not SOCKETIO_MESSAGE_QUEUE:
+        raise ValueError("CLUSTER_REGISTRY requires SOCKETIO_MESSAGE_QUEUE (emits must reach clients connected to other nodes)")
+    cluster = ClusterNode(
+        create_registry(CLUSTER_REGISTRY),
+        node_id=os.getenv('NODE_ID') or default_node_id(),
+        capacity=int(os.getenv('NODE_CAPACITY', '32')),
+        dispatch=dispatch_cluster_event,
+        load=lambda: len(session_manager.sessions),
+        owned=lambda: list(session_manager.sessions),
+        node_ttl=float(os.getenv('CLUSTER_NODE_TTL', '10'))
+    )
+    print(f"Cluster node {cluster.node_id} joined ({len(cluster.live_nodes)} node(s) live)")
+
 if __name__ == '__main__':
     socketio.run(app, debug=False, port=7880)
\ No newline at end of file
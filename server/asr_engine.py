@@ -0,0 +1,396 @@
+# asr_engine.py - 음성 인식(ASR) 엔진 추상화
+
+import contextlib
+import logging
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+@dataclass(frozen=True)
+class EngineCapabilities:
+    """엔진이 지원하는 기능 플래그"""
+    batching: bool = False                # 여러 오디오를 한 번에 디코딩 가능
+    word_timestamps: bool = False         # 단어 단위 타임스탬프 제공
+    language_probabilities: bool = False  # 언어별 확률 분포 제공
+    streaming: bool = True                # 세그먼트를 생성되는 즉시 반환
+    precomputed_features: bool = False    # 미리 계산한 log-mel 특징 사용 가능 (mel_filters 제공)
+
+
+@dataclass
+class TranscribeOptions:
+    """디코딩 옵션 (기존 app.py 하드코딩 값이 기본값)"""
+    beam_size: int = 5
+    no_speech_threshold: float = 0.6
+    compression_ratio_threshold: float = 2.4
+    condition_on_previous_text: bool = False
+    initial_prompt: Optional[str] = None
+    language: Optional[str] = None
+    task: str = "transcribe"
+    vad_filter: bool = True
+    vad_parameters: Optional[Dict] = field(default_factory=lambda: {
+        "min_silence_duration_ms": 500,
+        "speech_pad_ms": 300,
+        "threshold": 0.5
+    })
+    word_timestamps: bool = False
+
+    def with_overrides(self, **overrides) -> "TranscribeOptions":
+        """일부 값만 바꾼 사본 반환"""
+        return replace(self, **overrides)
+
+
+@dataclass
+class ASRSegment:
+    """엔진 공통 세그먼트 형식 (faster-whisper Segment와 필드명 호환)"""
+    text: str
+    start: float
+    end: float
+    avg_logprob: float = 0.0
+    no_speech_prob: float = 0.0
+    words: Optional[List[Tuple[float, float, str]]] = None
+
+
+@dataclass
+class ASRInfo:
+    """디코딩 결과 메타데이터"""
+    language: Optional[str]
+    language_probability: float
+    duration: float
+    all_language_probs: Optional[List[Tuple[str, float]]] = None
+
+
+class ASREngine:
+    """
+    음성 인식 엔진 인터페이스
+
+    transcribe()는 (세그먼트 이터레이터, 정보)를 반환하며, 세그먼트는
+    디코딩되는 대로 하나씩 소비할 수 있어야 한다.
+    """
+    name = "base"
+    capabilities = EngineCapabilities()
+    mel_filters: Optional[np.ndarray] = None
+
+    def transcribe(self, audio: np.ndarray, options: TranscribeOptions,
+                   features: Optional[np.ndarray] = None) -> Tuple[Iterator[ASRSegment], ASRInfo]:
+        """
+        Args:
+            audio: 16kHz float32 오디오
+            options: 디코딩 옵션
+            features: audio의 log-mel 특징 (mel_features.MelFeatureCache) - 지원하지 않는 엔진은 무시
+        """
+        raise NotImplementedError
+
+    def iter_segments(self, audio: np.ndarray, options: TranscribeOptions) -> Iterator[ASRSegment]:
+        """세그먼트 스트리밍 반복 (정보가 필요 없을 때)"""
+        segments, _ = self.transcribe(audio, options)
+        return iter(segments)
+
+    def detect_language(self, audio: np.ndarray) -> Tuple[Optional[str], float, List[Tuple[str, float]]]:
+        """
+        오디오에서 언어 추정
+
+        Returns:
+            tuple: (Whisper 언어 코드, 확률, [(언어, 확률), ...])
+        """
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios: Sequence[np.ndarray], options: TranscribeOptions) -> List[Tuple[List[ASRSegment], ASRInfo]]:
+        """여러 오디오 디코딩 - 배치를 지원하지 않는 엔진은 순차 처리"""
+        results = []
+        for audio in audios:
+            segments, info = self.transcribe(audio, options)
+            results.append((list(segments), info))
+        return results
+
+    def close(self):
+        """엔진 자원 해제"""
+
+
+class _PrecomputedFeatureExtractor:
+    """
+    faster-whisper FeatureExtractor 대체 - 미리 계산한 특징이 있으면 그대로 반환
+
+    transcribe()는 호출한 스레드에서 바로 특징을 계산하므로 스레드별로 특징을 넘긴다.
+    VAD가 오디오 일부를 잘라 내용이 달라졌거나 구버전 패딩 방식이면 원래 계산을 사용한다.
+    """
+
+    def __init__(self, extractor):
+        self._extractor = extractor
+        self._pending = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        return getattr(self._extractor, name)
+
+    @contextlib.contextmanager
+    def provide(self, audio, features):
+        self._pending.value = (audio, features)
+        try:
+            yield
+        finally:
+            self._pending.value = None
+
+    def __call__(self, waveform, padding=160, chunk_length=None, **kwargs):
+        pending = getattr(self._pending, 'value', None)
+        self._pending.value = None
+        if pending is not None:
+            audio, features = pending
+            if (not isinstance(padding, bool) and padding == 160 and len(waveform) == len(audio)
+                    and (waveform is audio or np.array_equal(waveform, audio))):
+                if chunk_length is not None:
+                    # 원래 __call__과 같이 청크 길이 설정 반영
+                    self._extractor.n_samples = chunk_length * self._extractor.sampling_rate
+                    self._extractor.nb_max_frames = self._extractor.n_samples // self._extractor.hop_length
+                self.hits += 1
+                return features
+            self.misses += 1
+        return self._extractor(waveform, padding=padding, chunk_length=chunk_length, **kwargs)
+
+
+class FasterWhisperEngine(ASREngine):
+    """faster-whisper(CTranslate2) 기반 엔진"""
+    name = "faster-whisper"
+
+    def __init__(self, model_size="large-v3-turbo", device="cuda", compute_type="float16",
+                 num_workers=8, cpu_threads=0, batch_size=8):
+        from faster_whisper import WhisperModel
+
+        self.model_size = model_size
+        self.batch_size = batch_size
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                                  num_workers=num_workers, cpu_threads=cpu_threads)
+
+        try:
+            from faster_whisper import BatchedInferencePipeline
+            self.batched_model = BatchedInferencePipeline(model=self.model)
+        except ImportError:
+            self.batched_model = None
+
+        # 세션별 캐시에서 계산한 특징을 받을 수 있도록 특징 추출기 교체
+        self.mel_filters = getattr(self.model.feature_extractor, 'mel_filters', None)
+        self.feature_extractor = None
+        if self.mel_filters is not None:
+            self.feature_extractor = _PrecomputedFeatureExtractor(self.model.feature_extractor)
+            self.model.feature_extractor = self.feature_extractor
+
+        self.capabilities = EngineCapabilities(
+            batching=self.batched_model is not None,
+            word_timestamps=True,
+            language_probabilities=True,
+            streaming=True,
+            precomputed_features=self.feature_extractor is not None
+        )
+
+    def _kwargs(self, options: TranscribeOptions) -> dict:
+        kwargs = {
+            "beam_size": options.beam_size,
+            "no_speech_threshold": options.no_speech_threshold,
+            "compression_ratio_threshold": options.compression_ratio_threshold,
+            "condition_on_previous_text": options.condition_on_previous_text,
+            "initial_prompt": options.initial_prompt,
+            "language": options.language,
+            "task": options.task,
+            "vad_filter": options.vad_filter,
+            "word_timestamps": options.word_timestamps,
+        }
+        if options.vad_filter and options.vad_parameters:
+            kwargs["vad_parameters"] = dict(options.vad_parameters)
+        return kwargs
+
+    def _convert_segments(self, segments) -> Iterator[ASRSegment]:
+        # faster-whisper 제너레이터를 그대로 따라가며 변환 (지연 평가 유지)
+        for segment in segments:
+            words = None
+            if getattr(segment, 'words', None):
+                words = [(w.start, w.end, w.word) for w in segment.words]
+            yield ASRSegment(
+                text=segment.text,
+                start=segment.start,
+                end=segment.end,
+                avg_logprob=segment.avg_logprob,
+                no_speech_prob=segment.no_speech_prob,
+                words=words
+            )
+
+    def _convert_info(self, info) -> ASRInfo:
+        return ASRInfo(
+            language=info.language,
+            language_probability=info.language_probability,
+            duration=info.duration,
+            all_language_probs=getattr(info, 'all_language_probs', None)
+        )
+
+    def transcribe(self, audio, options, features=None):
+        if features is None or self.feature_extractor is None:
+            segments, info = self.model.transcribe(audio, **self._kwargs(options))
+        else:
+            # 특징은 model.transcribe() 안에서 바로 계산되므로 호출 동안만 넘김
+            with self.feature_extractor.provide(audio, features):
+                segments, info = self.model.transcribe(audio, **self._kwargs(options))
+        return self._convert_segments(segments), self._convert_info(info)
+
+    def detect_language(self, audio):
+        if hasattr(self.model, 'detect_language'):
+            language, probability, all_probs = self.model.detect_language(audio)
+            return language, probability, list(all_probs or [])
+
+        # 구버전 faster-whisper: 첫 30초만 디코딩하고 정보만 사용
+        _, info = self.model.transcribe(audio[:SAMPLE_RATE * 30], beam_size=1, vad_filter=False)
+        return info.language, info.language_probability, list(info.all_language_probs or [])
+
+    def transcribe_batch(self, audios, options):
+        if self.batched_model is None:
+            return super().transcribe_batch(audios, options)
+
+        results = []
+        for audio in audios:
+            segments, info = self.batched_model.transcribe(audio, batch_size=self.batch_size,
+                                                           **self._kwargs(options))
+            results.append((list(self._convert_segments(segments)), self._convert_info(info)))
+        return results
+
+    def close(self):
+        self.batched_model = None
+        self.model = None
+
+
+# 가짜 엔진 기본 대본
+DEFAULT_FAKE_SCRIPT = [
+    "Hello everyone and welcome to today's session.",
+    "We are going to talk about real time speech translation.",
+    "The system listens to the microphone and sends audio to the server.",
+    "Each window of audio is transcribed and then translated.",
+    "Thank you for listening, and please ask any questions.",
+]
+
+
+class ScriptedASREngine(ASREngine):
+    """
+    결정적(deterministic) 대본 기반 가짜 엔진
+
+    모델 가중치 없이 서버 전체의 부하/지연 테스트를 하기 위한 엔진.
+    호출마다 대본의 다음 줄을 순서대로 반환하며, 무음 오디오에는
+    세그먼트를 반환하지 않는다. rtf를 지정하면 오디오 길이 * rtf 만큼
+    대기하여 디코딩 비용을 흉내 낸다.
+    """
+    name = "fake"
+
+    def __init__(self, script: Optional[Sequence[str]] = None, language="en",
+                 rtf=0.0, silence_threshold=0.002, **_ignored):
+        self.script = list(script) if script else list(DEFAULT_FAKE_SCRIPT)
+        self.language = language
+        self.rtf = rtf
+        self.silence_threshold = silence_threshold
+        self.call_count = 0
+        self._count_lock = threading.Lock()  # 파이프라인 작업자 여러 개가 동시에 호출
+        self.capabilities = EngineCapabilities(
+            batching=True,
+            word_timestamps=True,
+            language_probabilities=True,
+            streaming=True
+        )
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """한 줄에 발화 하나씩 적힌 대본 파일로 생성"""
+        with open(path, encoding='utf-8') as f:
+            script = [line.strip() for line in f if line.strip()]
+        return cls(script=script, **kwargs)
+
+    def _next_line(self, audio) -> str:
+        """이번 호출에 반환할 대본 줄 (하위 클래스에서 선택 방식 변경)"""
+        with self._count_lock:
+            index = self.call_count
+            self.call_count += 1
+        return self.script[index % len(self.script)]
+
+    def _segments_for(self, text: str, duration: float, options: TranscribeOptions) -> List[ASRSegment]:
+        words = text.split()
+        if not words:
+            return []
+
+        step = duration / len(words)
+        word_times = [(i * step, (i + 1) * step, w) for i, w in enumerate(words)]
+
+        # 두 세그먼트로 나누어 스트리밍 경로도 실제와 비슷하게 동작하도록 함
+        half = max(1, len(words) // 2)
+        segments = []
+        for chunk in (word_times[:half], word_times[half:]):
+            if not chunk:
+                continue
+            segments.append(ASRSegment(
+                text=" " + " ".join(w for _, _, w in chunk),
+                start=chunk[0][0],
+                end=chunk[-1][1],
+                avg_logprob=-0.2,
+                no_speech_prob=0.01,
+                words=chunk if options.word_timestamps else None
+            ))
+        return segments
+
+    def transcribe(self, audio, options, features=None):
+        duration = len(audio) / SAMPLE_RATE
+        if self.rtf > 0:
+            time.sleep(duration * self.rtf)
+
+        language = options.language or self.language
+        info = ASRInfo(language=language, language_probability=1.0, duration=duration,
+                       all_language_probs=[(language, 1.0)])
+
+        energy = float(np.sqrt(np.mean(np.square(audio)))) if len(audio) else 0.0
+        if energy < self.silence_threshold:
+            return iter([]), info
+
+        return iter(self._segments_for(self._next_line(audio), duration, options)), info
+
+    def detect_language(self, audio):
+        return self.language, 1.0, [(self.language, 1.0)]
+
+
+class EchoChecksumEngine(ScriptedASREngine):
+    """오디오 내용의 체크섬으로 대본 줄을 고르는 변형 - 같은 오디오는 항상 같은 결과"""
+    name = "fake-checksum"
+
+    def _next_line(self, audio) -> str:
+        with self._count_lock:
+            self.call_count += 1
+        checksum = zlib.crc32(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+        return self.script[checksum % len(self.script)]
+
+
+ASR_ENGINES = {
+    FasterWhisperEngine.name: FasterWhisperEngine,
+    ScriptedASREngine.name: ScriptedASREngine,
+    EchoChecksumEngine.name: EchoChecksumEngine,
+}
+
+
+def create_asr_engine(name: str, **kwargs) -> ASREngine:
+    """
+    이름으로 ASR 엔진 생성
+
+    Args:
+        name: 'faster-whisper', 'fake', 'fake-checksum'
+        **kwargs: 엔진 생성자 인자
+
+    Returns:
+        ASREngine: 생성된 엔진
+    """
+    if name not in ASR_ENGINES:
+        raise ValueError(f"Unknown ASR engine: {name} (available: {', '.join(ASR_ENGINES)})")
+
+    engine_cls = ASR_ENGINES[name]
+    script_path = kwargs.pop('script_path', None)
+    if script_path and issubclass(engine_cls, ScriptedASREngine):
+        return engine_cls.from_file(script_path, **kwargs)
+    return engine_cls(**kwargs)
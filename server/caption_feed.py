@@ -0,0 +1,213 @@
+# caption_feed.py - 읽기 전용 자막 피드 (SSE / WebVTT / JSON 공용 링 버퍼)
+
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# 큐(cue) 표시 시간 계산 - 글자 수 기준, 최소/최대 제한
+CUE_SECONDS_PER_CHAR = 0.06
+CUE_MIN_SECONDS = 2.0
+CUE_MAX_SECONDS = 7.0
+
+VTT_TRACKS = ('translation', 'original', 'both')
+
+
+def _vtt_timestamp(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    hours, millis = divmod(millis, 3600 * 1000)
+    minutes, millis = divmod(millis, 60 * 1000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}.{millis:03d}"
+
+
+def _vtt_escape(text: str) -> str:
+    # WebVTT 큐 텍스트에서 특수 의미를 갖는 문자 처리 ('>'를 바꾸므로 "-->"도 들어가지 않음)
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+@dataclass(frozen=True)
+class CaptionEntry:
+    """확정된 자막 한 줄 - 생성 시 모든 출력 형식으로 한 번만 직렬화"""
+    id: int
+    start: float  # 피드 시작 기준 초
+    end: float
+    text: str
+    translation: str
+    json: str     # 항목 JSON
+    sse: bytes    # SSE 이벤트 (id/event/data)
+    vtt: Dict[str, str]  # 트랙별 WebVTT 큐
+
+
+class CaptionRing:
+    """
+    자막 피드 하나(세션 또는 방)의 최근 확정 문장 링 버퍼
+
+    모든 시청자가 같은 링을 공유하며, 문장이 추가될 때만 직렬화한다.
+    전체 문서(JSON/WebVTT)는 버전(마지막 id)별로 한 번만 만들어 캐시한다.
+    id와 버전은 링마다 1부터 시작하므로, 같은 이름의 방이 다시 만들어져도
+    ETag와 SSE id가 겹치지 않도록 생성 시각 기반 epoch를 함께 사용한다.
+    """
+
+    def __init__(self, room: str, maxlen: int = 200):
+        self.room = room
+        self.created = time.time()
+        self.epoch = format(int(self.created * 1000), 'x')
+        self.last_activity = self.created
+        self.entries = deque(maxlen=maxlen)
+        self.next_id = 1
+        self.viewers = 0  # 연결 중인 SSE 시청자 수
+        self._condition = threading.Condition()
+        self._documents: Dict[Tuple[str, int], bytes] = {}
+
+    @property
+    def version(self) -> int:
+        """마지막 항목 id (항목이 없으면 0)"""
+        return self.next_id - 1
+
+    def etag(self, kind: str) -> str:
+        return f'"{self.room}-{self.epoch}-{kind}-{self.version}"'
+
+    def event_id(self, entry_id: int) -> str:
+        """SSE 이벤트 id (epoch-항목 id)"""
+        return f"{self.epoch}-{entry_id}"
+
+    def resume_from(self, last_event_id: str) -> Optional[int]:
+        """
+        SSE Last-Event-ID를 이 링의 항목 id로 변환
+
+        Returns:
+            int: 이 id 이후 항목부터 전송 (다른 epoch의 id면 0 = 링 전체)
+                 해석할 수 없으면 None
+        """
+        epoch, _, entry_id = last_event_id.rpartition('-')
+        try:
+            entry_id = int(entry_id)
+        except ValueError:
+            return None
+        if epoch and epoch != self.epoch:
+            return 0
+        return max(0, min(entry_id, self.version))
+
+    def subscribe(self):
+        with self._condition:
+            self.viewers += 1
+
+    def unsubscribe(self):
+        with self._condition:
+            self.viewers -= 1
+
+    def append(self, text: str, translation: str, source_language: Optional[str] = None,
+               target_language: Optional[str] = None) -> CaptionEntry:
+        """확정 문장 추가 후 대기 중인 SSE 시청자 깨움"""
+        with self._condition:
+            now = time.time()
+            entry_id = self.next_id
+            start = now - self.created
+            if self.entries:
+                start = max(start, self.entries[-1].end)
+            duration = min(CUE_MAX_SECONDS, max(CUE_MIN_SECONDS, len(translation or text) * CUE_SECONDS_PER_CHAR))
+            end = start + duration
+
+            payload = json.dumps({
+                'id': entry_id,
+                'start': round(start, 3),
+                'end': round(end, 3),
+                'text': text,
+                'translation': translation,
+                'source_language': source_language,
+                'target_language': target_language,
+                'time': round(now, 3),
+            }, ensure_ascii=False)
+
+            timing = f"{_vtt_timestamp(start)} --> {_vtt_timestamp(end)}"
+            original_line, translation_line = _vtt_escape(text), _vtt_escape(translation)
+            vtt = {
+                'translation': f"{entry_id}\n{timing}\n{translation_line}\n\n",
+                'original': f"{entry_id}\n{timing}\n{original_line}\n\n",
+                'both': f"{entry_id}\n{timing}\n{original_line}\n{translation_line}\n\n",
+            }
+
+            entry = CaptionEntry(
+                id=entry_id, start=start, end=end, text=text, translation=translation,
+                json=payload,
+                sse=f"id: {self.event_id(entry_id)}\nevent: caption\ndata: {payload}\n\n".encode('utf-8'),
+                vtt=vtt
+            )
+            self.entries.append(entry)
+            self.next_id += 1
+            self.last_activity = now
+            self._documents.clear()
+            self._condition.notify_all()
+            return entry
+
+    def since(self, last_id: int) -> List[CaptionEntry]:
+        """last_id 이후 항목 (링에서 밀려난 항목은 제외)"""
+        with self._condition:
+            return [entry for entry in self.entries if entry.id > last_id]
+
+    def wait_since(self, last_id: int, timeout: float) -> List[CaptionEntry]:
+        """새 항목이 생길 때까지 최대 timeout초 대기"""
+        with self._condition:
+            if self.version <= last_id:
+                self._condition.wait(timeout)
+            return [entry for entry in self.entries if entry.id > last_id]
+
+    def _document(self, kind: str, build) -> bytes:
+        with self._condition:
+            key = (kind, self.version)
+            document = self._documents.get(key)
+            if document is None:
+                document = build(list(self.entries))
+                self._documents[key] = document
+            return document
+
+    def render_json(self) -> bytes:
+        """최근 항목 JSON 문서 (버전별 캐시)"""
+        def build(entries):
+            body = ",".join(entry.json for entry in entries)
+            return (f'{{"room": {json.dumps(self.room)}, "epoch": "{self.epoch}", "version": {self.version}, '
+                    f'"captions": [{body}]}}').encode('utf-8')
+        return self._document('json', build)
+
+    def render_vtt(self, track: str = 'translation') -> bytes:
+        """최근 항목 WebVTT 문서 (트랙/버전별 캐시)"""
+        def build(entries):
+            return ("WEBVTT\n\n" + "".join(entry.vtt[track] for entry in entries)).encode('utf-8')
+        return self._document(f'vtt-{track}', build)
+
+
+class CaptionFeed:
+    """방 이름 -> 자막 링 버퍼 관리"""
+
+    def __init__(self, maxlen: int = 200, idle_timeout: float = 3600.0):
+        self.maxlen = maxlen
+        self.idle_timeout = idle_timeout
+        self.rooms: Dict[str, CaptionRing] = {}
+        self._lock = threading.Lock()
+
+    def get(self, room: str) -> Optional[CaptionRing]:
+        """방 조회 (없으면 None - 시청자 요청으로는 방을 만들지 않음)"""
+        return self.rooms.get(room)
+
+    def get_or_create(self, room: str) -> CaptionRing:
+        with self._lock:
+            ring = self.rooms.get(room)
+            if ring is None:
+                self._evict_idle()
+                ring = CaptionRing(room, maxlen=self.maxlen)
+                self.rooms[room] = ring
+            return ring
+
+    def publish(self, room: str, text: str, translation: str, source_language=None, target_language=None):
+        return self.get_or_create(room).append(text, translation, source_language, target_language)
+
+    def _evict_idle(self):
+        # 오랫동안 새 문장이 없는 방 정리 (lock 보유 상태에서 호출)
+        # SSE 시청자가 대기 중인 방은 남겨 둠 - 지우면 같은 이름의 새 방 자막을 받지 못함
+        now = time.time()
+        for room, ring in list(self.rooms.items()):
+            if now - ring.last_activity > self.idle_timeout and not ring.viewers:
+                del self.rooms[room]
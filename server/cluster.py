@@ -0,0 +1,675 @@
+# cluster.py - 여러 노드로 세션을 나누어 처리하는 클러스터 모드 (세션 소유 노드 관리, 이벤트 전달, 장애 시 재배정)
+
+import base64
+import json
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NodeInfo:
+    """노드 상태 (heartbeat마다 갱신)"""
+    node_id: str
+    capacity: int
+    load: int = 0
+    updated: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        return self.load / max(1, self.capacity)
+
+
+def encode_message(session_id: str, event: str, args) -> str:
+    """노드 간 전달 메시지 직렬화 - 바이너리 인자(오디오 프레임)는 base64로 변환"""
+    encoded = []
+    for arg in args:
+        if isinstance(arg, (bytes, bytearray, memoryview)):
+            encoded.append({'__b64__': base64.b64encode(bytes(arg)).decode('ascii')})
+        else:
+            encoded.append(arg)
+    return json.dumps({'session_id': session_id, 'event': event, 'args': encoded})
+
+
+def decode_message(raw) -> Dict:
+    message = json.loads(raw)
+    message['args'] = [
+        base64.b64decode(arg['__b64__']) if isinstance(arg, dict) and '__b64__' in arg else arg
+        for arg in message['args']
+    ]
+    return message
+
+
+class ClusterRegistry:
+    """
+    노드 목록, 세션 소유 노드, 세션 저널, 노드별 수신함을 보관하는 공유 저장소
+
+    claim()은 비교 후 교체(compare-and-set)로 동작하여 여러 노드가 같은 세션을
+    동시에 가져가려 해도 하나만 성공한다.
+    """
+
+    def heartbeat(self, node: NodeInfo, ttl: float):
+        raise NotImplementedError
+
+    def remove_node(self, node_id: str):
+        """노드와 수신함 삭제"""
+        raise NotImplementedError
+
+    def nodes(self) -> List[NodeInfo]:
+        """heartbeat가 만료되지 않은 노드 목록"""
+        raise NotImplementedError
+
+    def known_node_ids(self) -> List[str]:
+        """heartbeat가 만료된 노드를 포함한 전체 노드 ID (장애 노드 확인용)"""
+        raise NotImplementedError
+
+    def claim(self, session_id: str, node_id: str, expected: Optional[str] = None) -> bool:
+        """
+        세션 소유권 설정
+
+        Args:
+            expected: 현재 소유 노드가 이 값일 때만 변경 (None = 소유 노드가 없을 때만)
+
+        Returns:
+            bool: 설정했으면 True
+        """
+        raise NotImplementedError
+
+    def owner(self, session_id: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set_gateway(self, session_id: str, node_id: str):
+        """세션 클라이언트가 연결된 노드 기록"""
+        raise NotImplementedError
+
+    def release(self, session_id: str, node_id: str):
+        """node_id가 소유한 세션이면 소유권, 연결 노드, 저널 삭제"""
+        raise NotImplementedError
+
+    def drop(self, session_id: str):
+        """소유 노드와 관계없이 세션 기록 삭제 (클라이언트와 소유 노드가 모두 사라진 세션)"""
+        raise NotImplementedError
+
+    def sessions_of(self, node_id: str) -> List[str]:
+        raise NotImplementedError
+
+    def sessions_via(self, node_id: str) -> List[str]:
+        """클라이언트가 node_id에 연결된 세션"""
+        raise NotImplementedError
+
+    def save_journal(self, session_id: str, state: Dict):
+        raise NotImplementedError
+
+    def load_journal(self, session_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def lock_failover(self, node_id: str, holder: str, ttl: float) -> bool:
+        """장애 노드 정리 담당을 한 노드만 맡도록 잠금"""
+        raise NotImplementedError
+
+    def send(self, node_id: str, message: str):
+        """노드 수신함에 메시지 추가 (순서 유지)"""
+        raise NotImplementedError
+
+    def receive(self, node_id: str, timeout: float) -> List[str]:
+        """수신함 메시지를 도착 순서대로 가져옴 (없으면 timeout까지 대기)"""
+        raise NotImplementedError
+
+
+class RedisRegistry(ClusterRegistry):
+    """Redis 저장소 - CLUSTER_REGISTRY=redis://host:6379/0"""
+
+    _CLAIM = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if (ARGV[3] == '' and not current) or current == ARGV[3] then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+    _RELEASE = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('DEL', KEYS[3])
+    return 1
+end
+return 0
+"""
+
+    def __init__(self, url: str, prefix: str = "stt-cluster", journal_ttl: int = 3600):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.journal_ttl = journal_ttl
+        self._claim = self.redis.register_script(self._CLAIM)
+        self._release = self.redis.register_script(self._RELEASE)
+
+    def _key(self, *parts) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    def heartbeat(self, node, ttl):
+        pipe = self.redis.pipeline()
+        pipe.set(self._key('node', node.node_id), json.dumps(asdict(node)), ex=max(1, int(ttl)))
+        pipe.sadd(self._key('node_ids'), node.node_id)
+        pipe.execute()
+
+    def remove_node(self, node_id):
+        pipe = self.redis.pipeline()
+        pipe.delete(self._key('node', node_id), self._key('inbox', node_id))
+        pipe.srem(self._key('node_ids'), node_id)
+        pipe.execute()
+
+    def known_node_ids(self):
+        return [node_id.decode() for node_id in self.redis.smembers(self._key('node_ids'))]
+
+    def nodes(self):
+        node_ids = self.known_node_ids()
+        if not node_ids:
+            return []
+        values = self.redis.mget([self._key('node', node_id) for node_id in node_ids])
+        return [NodeInfo(**json.loads(value)) for value in values if value]
+
+    def claim(self, session_id, node_id, expected=None):
+        return bool(self._claim(keys=[self._key('owners')], args=[session_id, node_id, expected or '']))
+
+    def owner(self, session_id):
+        value = self.redis.hget(self._key('owners'), session_id)
+        return value.decode() if value else None
+
+    def set_gateway(self, session_id, node_id):
+        self.redis.hset(self._key('gateways'), session_id, node_id)
+
+    def release(self, session_id, node_id):
+        self._release(keys=[self._key('owners'), self._key('gateways'), self._key('journal', session_id)],
+                      args=[session_id, node_id])
+
+    def drop(self, session_id):
+        pipe = self.redis.pipeline()
+        pipe.hdel(self._key('owners'), session_id)
+        pipe.hdel(self._key('gateways'), session_id)
+        pipe.delete(self._key('journal', session_id))
+        pipe.execute()
+
+    def sessions_of(self, node_id):
+        return [session_id.decode() for session_id, owner in self.redis.hgetall(self._key('owners')).items()
+                if owner.decode() == node_id]
+
+    def sessions_via(self, node_id):
+        return [session_id.decode() for session_id, gateway in self.redis.hgetall(self._key('gateways')).items()
+                if gateway.decode() == node_id]
+
+    def save_journal(self, session_id, state):
+        self.redis.set(self._key('journal', session_id), json.dumps(state), ex=self.journal_ttl)
+
+    def load_journal(self, session_id):
+        value = self.redis.get(self._key('journal', session_id))
+        return json.loads(value) if value else None
+
+    def lock_failover(self, node_id, holder, ttl):
+        return bool(self.redis.set(self._key('failover', node_id), holder, nx=True, ex=max(1, int(ttl))))
+
+    def send(self, node_id, message):
+        self.redis.rpush(self._key('inbox', node_id), message)
+
+    def receive(self, node_id, timeout):
+        key = self._key('inbox', node_id)
+        messages = []
+        if timeout > 0:
+            item = self.redis.blpop([key], timeout=max(1, int(timeout)))
+            if item is None:
+                return []
+            messages.append(item[1])
+        while True:
+            value = self.redis.lpop(key)
+            if value is None:
+                return messages
+            messages.append(value)
+
+
+class FileRegistry(ClusterRegistry):
+    """
+    파일 기반 저장소 - 한 호스트에서 여러 노드 프로세스를 실행할 때 Redis 대신 사용
+
+    CLUSTER_REGISTRY=file:///tmp/stt-cluster
+    상태는 state.json 하나에 보관하며 flock으로 프로세스 간 접근을 조정한다 (조회는 공유
+    잠금으로 읽기만 하고, 상태가 바뀐 경우에만 임시 파일에 쓴 뒤 교체).
+    수신함은 노드별 디렉터리에 메시지마다 파일 하나로 쌓는다.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.02):
+        import fcntl
+
+        self._fcntl = fcntl
+        self.path = path
+        self.poll_interval = poll_interval
+        os.makedirs(os.path.join(path, 'journal'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'inbox'), exist_ok=True)
+        self._lock_path = os.path.join(path, 'lock')
+        self._state_path = os.path.join(path, 'state.json')
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+
+    def _load_state(self):
+        """state.json 읽기 (잠금 안에서 호출) - (원본 텍스트, 상태)"""
+        try:
+            with open(self._state_path, encoding='utf-8') as f:
+                raw = f.read()
+            state = json.loads(raw)
+        except (FileNotFoundError, json.JSONDecodeError):
+            raw, state = None, {}
+        for key in ('nodes', 'owners', 'gateways', 'failover'):
+            state.setdefault(key, {})
+        return raw, state
+
+    def _read(self, read: Callable[[Dict], object]):
+        """공유 잠금 상태에서 state.json을 읽고 read(state) 결과 반환 (저장하지 않음)"""
+        with open(self._lock_path, 'a') as lock_file:
+            self._fcntl.flock(lock_file, self._fcntl.LOCK_SH)
+            try:
+                return read(self._load_state()[1])
+            finally:
+                self._fcntl.flock(lock_file, self._fcntl.LOCK_UN)
+
+    def _locked(self, update: Callable[[Dict], object]):
+        """배타 잠금 상태에서 state.json을 읽고 update(state) 후 바뀌었으면 저장"""
+        with open(self._lock_path, 'a') as lock_file:
+            self._fcntl.flock(lock_file, self._fcntl.LOCK_EX)
+            try:
+                raw, state = self._load_state()
+                result = update(state)
+                data = json.dumps(state)
+                if data != raw:
+                    # 임시 파일에 쓴 뒤 교체 - 쓰는 도중 프로세스가 죽어도 state.json은 온전함
+                    tmp_path = f"{self._state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        f.write(data)
+                    os.replace(tmp_path, self._state_path)
+                return result
+            finally:
+                self._fcntl.flock(lock_file, self._fcntl.LOCK_UN)
+
+    def heartbeat(self, node, ttl):
+        def update(state):
+            state['nodes'][node.node_id] = dict(asdict(node), expires=time.time() + ttl)
+        self._locked(update)
+
+    def remove_node(self, node_id):
+        self._locked(lambda state: state['nodes'].pop(node_id, None))
+        shutil.rmtree(os.path.join(self.path, 'inbox', node_id), ignore_errors=True)
+
+    def known_node_ids(self):
+        return self._read(lambda state: list(state['nodes']))
+
+    def nodes(self):
+        now = time.time()
+
+        def read(state):
+            return [NodeInfo(**{k: v for k, v in info.items() if k != 'expires'})
+                    for info in state['nodes'].values() if info['expires'] > now]
+        return self._read(read)
+
+    def claim(self, session_id, node_id, expected=None):
+        def update(state):
+            if state['owners'].get(session_id) != expected:
+                return False
+            state['owners'][session_id] = node_id
+            return True
+        return self._locked(update)
+
+    def owner(self, session_id):
+        return self._read(lambda state: state['owners'].get(session_id))
+
+    def set_gateway(self, session_id, node_id):
+        self._locked(lambda state: state['gateways'].__setitem__(session_id, node_id))
+
+    def release(self, session_id, node_id):
+        def update(state):
+            if state['owners'].get(session_id) == node_id:
+                del state['owners'][session_id]
+                state['gateways'].pop(session_id, None)
+                return True
+            return False
+        if self._locked(update):
+            self._remove_journal(session_id)
+
+    def drop(self, session_id):
+        def update(state):
+            state['owners'].pop(session_id, None)
+            state['gateways'].pop(session_id, None)
+        self._locked(update)
+        self._remove_journal(session_id)
+
+    def sessions_of(self, node_id):
+        return self._read(lambda state: [sid for sid, owner in state['owners'].items() if owner == node_id])
+
+    def sessions_via(self, node_id):
+        return self._read(lambda state: [sid for sid, gateway in state['gateways'].items() if gateway == node_id])
+
+    def _remove_journal(self, session_id):
+        try:
+            os.remove(self._journal_path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def _journal_path(self, session_id):
+        return os.path.join(self.path, 'journal', f"{session_id}.json")
+
+    def save_journal(self, session_id, state):
+        path = self._journal_path(session_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def load_journal(self, session_id):
+        try:
+            with open(self._journal_path(session_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def lock_failover(self, node_id, holder, ttl):
+        now = time.time()
+
+        def update(state):
+            lock = state['failover'].get(node_id)
+            if lock and lock['expires'] > now:
+                return False
+            state['failover'][node_id] = {'holder': holder, 'expires': now + ttl}
+            return True
+        return self._locked(update)
+
+    def _inbox(self, node_id):
+        path = os.path.join(self.path, 'inbox', node_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def send(self, node_id, message):
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        # 파일 이름 순서 = 도착 순서 (같은 노드에서 보낸 메시지끼리는 순서 보장)
+        name = f"{time.time_ns():020d}-{os.getpid()}-{seq:010d}"
+        inbox = self._inbox(node_id)
+        tmp_path = os.path.join(inbox, f".{name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(message)
+        os.replace(tmp_path, os.path.join(inbox, f"{name}.msg"))
+
+    def receive(self, node_id, timeout):
+        inbox = self._inbox(node_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            names = sorted(name for name in os.listdir(inbox) if name.endswith('.msg'))
+            if names:
+                messages = []
+                for name in names:
+                    path = os.path.join(inbox, name)
+                    with open(path, encoding='utf-8') as f:
+                        messages.append(f.read())
+                    os.remove(path)
+                return messages
+            if time.monotonic() >= deadline:
+                return []
+            time.sleep(self.poll_interval)
+
+
+def create_registry(url: str) -> ClusterRegistry:
+    """
+    URL로 저장소 생성
+
+    Args:
+        url: 'redis://host:6379/0' 또는 'file:///경로'
+    """
+    parsed = urlparse(url)
+    if parsed.scheme in ('redis', 'rediss', 'unix'):
+        return RedisRegistry(url)
+    if parsed.scheme == 'file':
+        return FileRegistry(parsed.path)
+    raise ValueError(f"Unknown cluster registry: {url} (expected redis://... or file:///...)")
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ClusterNode:
+    """
+    클러스터에 참여한 현재 노드
+
+    - 새 세션은 사용률(세션 수 / 용량)이 가장 낮은 노드에 배정 (같으면 현재 노드)
+    - 다른 노드가 소유한 세션의 이벤트(오디오 프레임 등)는 그 노드 수신함으로 전달
+    - 소유 노드는 세션 상태 일부를 저널에 기록하고, heartbeat가 끊긴 노드의 세션은
+      살아 있는 노드에 다시 배정한 뒤 저널로 상태를 복원
+    - 클라이언트가 연결된 노드가 장애이면 소켓도 끊어졌으므로 소유 노드에 연결 종료를 전달
+    - heartbeat마다 저장소와 비교하여, 다른 노드로 넘어간 세션은 LOST_EVENT로 알림
+      (heartbeat가 늦어 장애로 처리된 노드가 같은 세션 상태를 계속 들고 있지 않도록)
+
+    Args:
+        registry: 공유 저장소
+        node_id: 노드 ID
+        capacity: 이 노드가 처리할 세션 수
+        dispatch: 수신한 이벤트 처리 함수 - dispatch(session_id, event, args)
+        load: 현재 소유 세션 수를 반환하는 함수
+        owned: 이 노드가 상태를 가진 세션 ID 목록을 반환하는 함수
+        heartbeat_interval: heartbeat 주기 (초)
+        node_ttl: 이 시간(초) 동안 heartbeat가 없으면 장애로 판단
+    """
+
+    RESTORE_EVENT = 'cluster_restore'
+    LOST_EVENT = 'cluster_lost'  # 이 노드가 더 이상 소유하지 않거나 연결을 받지 않는 세션
+
+    def __init__(self, registry: ClusterRegistry, node_id: str, capacity: int,
+                 dispatch: Callable[[str, str, list], None], load: Callable[[], int],
+                 owned: Callable[[], List[str]] = list,
+                 heartbeat_interval: float = 2.0, node_ttl: float = 10.0):
+        self.registry = registry
+        self.node_id = node_id
+        self.capacity = capacity
+        self.dispatch = dispatch
+        self.load = load
+        self.owned = owned
+        self.heartbeat_interval = heartbeat_interval
+        self.node_ttl = node_ttl
+        self.live_nodes: Dict[str, NodeInfo] = {}
+        self._routes: Dict[str, str] = {}  # 세션 ID -> 소유 노드 (이 노드가 연결을 받은 세션)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        # 통계
+        self.forwarded = 0
+        self.received = 0
+        self.adopted = 0
+        self.lost = 0
+        self.reaped = 0
+
+        self._heartbeat()
+        self._threads = [
+            threading.Thread(target=self._heartbeat_loop, name="cluster-heartbeat", daemon=True),
+            threading.Thread(target=self._inbox_loop, name="cluster-inbox", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # 세션 배정과 전달
+    def place(self, session_id: str) -> str:
+        """새 세션의 소유 노드 결정 - 반환값이 현재 노드가 아니면 그 노드로 이벤트 전달"""
+        nodes = sorted(self.live_nodes.values(), key=lambda node: (node.utilization, node.node_id != self.node_id))
+        for node in nodes or [NodeInfo(self.node_id, self.capacity)]:
+            if self.registry.claim(session_id, node.node_id):
+                break
+        owner = self.registry.owner(session_id) or self.node_id
+        self.registry.set_gateway(session_id, self.node_id)
+        with self._lock:
+            self._routes[session_id] = owner
+            if owner in self.live_nodes:
+                # 연결이 몰릴 때 다음 heartbeat 전까지 같은 노드에만 배정되지 않도록 예상 부하 반영
+                self.live_nodes[owner].load += 1
+        return owner
+
+    def owner_of(self, session_id: str) -> str:
+        """연결을 받은 세션의 소유 노드 (소유 노드가 장애로 바뀌었으면 저장소에서 다시 확인)"""
+        with self._lock:
+            owner = self._routes.get(session_id)
+            if owner is not None and (owner == self.node_id or owner in self.live_nodes):
+                return owner
+        owner = self.registry.owner(session_id) or self.node_id
+        with self._lock:
+            self._routes[session_id] = owner
+        return owner
+
+    def forward(self, owner: str, session_id: str, event: str, args=()):
+        self.registry.send(owner, encode_message(session_id, event, args))
+        self.forwarded += 1
+
+    def broadcast(self, event: str, args=()):
+        """살아 있는 다른 모든 노드에 세션과 무관한 이벤트 전달 (session_id는 빈 문자열)"""
+        for node_id in list(self.live_nodes):
+            if node_id != self.node_id:
+                self.forward(node_id, '', event, args)
+
+    def connected(self, session_id: str) -> bool:
+        """이 노드가 연결을 받은 세션인지 여부"""
+        with self._lock:
+            return session_id in self._routes
+
+    def forget(self, session_id: str):
+        """연결이 끊긴 세션의 경로 삭제"""
+        with self._lock:
+            self._routes.pop(session_id, None)
+
+    def release(self, session_id: str):
+        """소유 세션 종료 - 소유권과 저널 삭제"""
+        self.registry.release(session_id, self.node_id)
+
+    def save_journal(self, session_id: str, state: Dict):
+        try:
+            self.registry.save_journal(session_id, dict(state, saved_at=time.time(), node_id=self.node_id))
+        except Exception as e:
+            logger.warning("Failed to save session journal: %s", e, extra={'session_id': session_id})
+
+    # 백그라운드 작업
+    def _heartbeat(self):
+        self.registry.heartbeat(NodeInfo(self.node_id, self.capacity, self.load(), time.time()), self.node_ttl)
+        nodes = {node.node_id: node for node in self.registry.nodes()}
+        with self._lock:
+            self.live_nodes = nodes
+
+    def _heartbeat_loop(self):
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                self._heartbeat()
+                self._check_ownership()
+                self._recover_failed_nodes()
+            except Exception as e:
+                logger.exception("Cluster heartbeat error: %s", e)
+
+    def _inbox_loop(self):
+        while not self._stopped.is_set():
+            try:
+                raw_messages = self.registry.receive(self.node_id, timeout=1.0)
+            except Exception as e:
+                logger.exception("Cluster inbox error: %s", e)
+                time.sleep(1.0)
+                continue
+            for raw in raw_messages:
+                try:
+                    message = decode_message(raw)
+                    self.received += 1
+                    self.dispatch(message['session_id'], message['event'], message['args'])
+                except Exception as e:
+                    logger.exception("Error handling cluster message: %s", e)
+
+    def _check_ownership(self):
+        """
+        저장소 기록과 맞지 않는 세션 정리
+
+        - 상태를 가진 세션이 다른 노드로 넘어갔으면 (장애로 처리되었던 경우) 상태 삭제
+        - 연결을 받은 세션의 연결 노드 기록이 사라졌으면 (장애로 처리되어 정리된 경우) 연결 종료
+        저장소보다 로컬 목록을 먼저 읽어, 그 사이 새로 배정된 세션을 잃은 것으로 보지 않음
+        """
+        owned = list(self.owned())
+        with self._lock:
+            routed = list(self._routes)
+        lost = set(owned) - set(self.registry.sessions_of(self.node_id))
+        lost |= set(routed) - set(self.registry.sessions_via(self.node_id))
+        for session_id in lost:
+            self.lost += 1
+            logger.warning("Session no longer assigned to this node", extra={'session_id': session_id})
+            self.dispatch(session_id, self.LOST_EVENT, [])
+
+    def _recover_failed_nodes(self):
+        """
+        heartbeat가 끊긴 노드 정리 (한 노드만 정리 담당)
+
+        - 장애 노드에 연결된 클라이언트의 세션: 소켓이 끊어졌으므로 소유 노드에 연결 종료 전달
+          (소유 노드도 장애이면 기록만 삭제)
+        - 장애 노드가 소유하고 클라이언트는 살아 있는 노드에 연결된 세션: 다시 배정 후 저널로 복원
+        """
+        failed = [node_id for node_id in self.registry.known_node_ids()
+                  if node_id not in self.live_nodes and node_id != self.node_id]
+        for dead in failed:
+            if not self.registry.lock_failover(dead, self.node_id, self.node_ttl * 3):
+                continue
+            sessions = self.registry.sessions_of(dead)
+            disconnected = set(self.registry.sessions_via(dead))
+            for session_id in disconnected:
+                owner = self.registry.owner(session_id)
+                if owner is None or owner == dead:
+                    self.registry.drop(session_id)
+                else:
+                    self.forward(owner, session_id, 'disconnect')
+                self.reaped += 1
+            # 장애 노드 수신함에 남은 메시지는 새 소유 노드로 옮김
+            pending = [decode_message(raw) for raw in self.registry.receive(dead, timeout=0)]
+            for session_id in sessions:
+                if session_id in disconnected:
+                    continue
+                target = min(self.live_nodes.values(), key=lambda node: (node.utilization, node.node_id != self.node_id),
+                             default=NodeInfo(self.node_id, self.capacity))
+                if not self.registry.claim(session_id, target.node_id, expected=dead):
+                    continue
+                target.load += 1
+                self.adopted += 1
+                self.forward(target.node_id, session_id, self.RESTORE_EVENT,
+                             [self.registry.load_journal(session_id) or {}])
+                for message in pending:
+                    if message['session_id'] == session_id:
+                        self.forward(target.node_id, session_id, message['event'], message['args'])
+                logger.warning("Session reassigned from failed node", extra={
+                    'session_id': session_id, 'failed_node': dead, 'new_node': target.node_id
+                })
+            self.registry.remove_node(dead)
+            logger.warning("Cluster node failed", extra={
+                'node_id': dead, 'sessions': len(sessions), 'disconnected': len(disconnected)
+            })
+
+    def status(self) -> Dict:
+        with self._lock:
+            nodes = [dict(asdict(node), utilization=round(node.utilization, 3)) for node in self.live_nodes.values()]
+            routed = sum(1 for owner in self._routes.values() if owner != self.node_id)
+        return {
+            'node_id': self.node_id,
+            'capacity': self.capacity,
+            'nodes': sorted(nodes, key=lambda node: node['node_id']),
+            'routed_sessions': routed,
+            'forwarded': self.forwarded,
+            'received': self.received,
+            'adopted': self.adopted,
+            'lost': self.lost,
+            'reaped': self.reaped,
+        }
+
+    def stop(self):
+        """heartbeat 중지 - node_ttl이 지나면 다른 노드가 이 노드의 세션을 넘겨받음"""
+        self._stopped.set()
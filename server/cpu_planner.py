@@ -0,0 +1,480 @@
+# cpu_planner.py - CPU 배포용 코어 분할 및 스레드 수 설정 (ASR / MT)
+#
+# 사용법 (자동 튜닝):
+#   python server/cpu_planner.py autotune [--wav speech.wav] [--duration 20]
+#
+# 여러 코어 분할 후보를 각각 별도 프로세스에서 실제 모델로 측정하고
+# 가장 좋은 설정을 cpu_plan.json 에 저장한다. 서버는 시작할 때 이 파일을 읽는다.
+
+import argparse
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+DEFAULT_PLAN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cpu_plan.json")
+
+# 자동 튜닝 점수 계산용 스트림당 부하 (profiles.json balanced 기준)
+# - ASR: 윈도우가 1/3씩 겹치고(1.5배) 확정 문장을 한 번 더 디코딩(2단계 디코딩)하므로
+#        발화 1초당 약 2.5초 분량의 오디오를 디코딩한다
+# - MT: 문장 하나가 약 4초 분량의 발화
+DEFAULT_ASR_SECONDS_PER_SECOND = 2.5
+DEFAULT_SENTENCE_SECONDS = 4.0
+
+
+@dataclass(frozen=True)
+class CPUPlan:
+    """ASR/MT 단계별 코어 및 스레드 배정"""
+    asr_cores: Tuple[int, ...]
+    mt_cores: Tuple[int, ...]
+    asr_workers: int = 1            # CTranslate2 병렬 디코딩 워커 수 (num_workers)
+    asr_threads: int = 1            # 워커당 intra-op 스레드 수 (cpu_threads)
+    mt_threads: int = 1             # torch intra-op 스레드 수
+    mt_interop_threads: int = 1     # torch inter-op 스레드 수
+    affinity: bool = True           # 단계별 코어 고정 여부
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['asr_cores'] = list(self.asr_cores)
+        data['mt_cores'] = list(self.mt_cores)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CPUPlan":
+        return cls(
+            asr_cores=tuple(int(c) for c in data['asr_cores']),
+            mt_cores=tuple(int(c) for c in data['mt_cores']),
+            asr_workers=int(data.get('asr_workers', 1)),
+            asr_threads=int(data.get('asr_threads', 1)),
+            mt_threads=int(data.get('mt_threads', 1)),
+            mt_interop_threads=int(data.get('mt_interop_threads', 1)),
+            affinity=bool(data.get('affinity', True)),
+        )
+
+    def describe(self) -> str:
+        return (f"ASR cores {_format_cores(self.asr_cores)} ({self.asr_workers} worker(s) x {self.asr_threads} thread(s)), "
+                f"MT cores {_format_cores(self.mt_cores)} ({self.mt_threads} thread(s))")
+
+    def cores_for(self, stage: str) -> Tuple[int, ...]:
+        """단계('asr' 또는 'mt')에 고정할 코어 (affinity를 끄면 빈 튜플)"""
+        if not self.affinity:
+            return ()
+        return self.asr_cores if stage == 'asr' else self.mt_cores
+
+
+def _format_cores(cores: Sequence[int]) -> str:
+    # 연속 구간은 "0-3" 형식으로 표시
+    ranges = []
+    for core in sorted(cores):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def available_cores() -> List[int]:
+    """현재 프로세스가 사용할 수 있는 코어 목록 (컨테이너 cpuset 반영)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def core_groups(cores: Sequence[int]) -> List[Tuple[int, ...]]:
+    """
+    물리 코어 단위로 묶은 코어 목록 (하이퍼스레딩 형제 코어를 같은 묶음으로)
+
+    형제 코어가 서로 다른 단계에 배정되면 같은 실행 유닛을 두고 경쟁하므로
+    분할은 이 묶음 단위로 한다. 토폴로지 정보가 없으면 코어 하나가 한 묶음.
+    """
+    remaining = set(cores)
+    groups = []
+    for core in sorted(cores):
+        if core not in remaining:
+            continue
+        siblings = {core}
+        path = f"/sys/devices/system/cpu/cpu{core}/topology/thread_siblings_list"
+        try:
+            with open(path) as f:
+                siblings = _parse_cpu_list(f.read()) & remaining or {core}
+        except (OSError, ValueError):
+            pass
+        remaining -= siblings
+        groups.append(tuple(sorted(siblings)))
+    return groups
+
+
+def _parse_cpu_list(text: str) -> set:
+    cores = set()
+    for part in text.strip().split(','):
+        if '-' in part:
+            a, b = part.split('-')
+            cores.update(range(int(a), int(b) + 1))
+        elif part:
+            cores.add(int(part))
+    return cores
+
+
+def make_plan(cores: Optional[Sequence[int]] = None, asr_fraction: float = 0.5,
+              asr_workers: int = 1, affinity: bool = True) -> CPUPlan:
+    """
+    코어를 ASR/MT 단계로 나눈 실행 계획 생성
+
+    Args:
+        cores: 사용할 코어 (None = 사용 가능한 전체 코어)
+        asr_fraction: ASR에 배정할 물리 코어 비율
+        asr_workers: ASR 병렬 디코딩 워커 수 (ASR 코어를 워커끼리 나눠 씀)
+        affinity: 단계별 코어 고정 여부
+
+    Returns:
+        CPUPlan: 실행 계획 (코어가 하나뿐이면 두 단계가 같은 코어를 공유)
+    """
+    cores = list(cores) if cores is not None else available_cores()
+    groups = core_groups(cores)
+
+    if len(groups) < 2:
+        shared = tuple(cores)
+        return CPUPlan(asr_cores=shared, mt_cores=shared, asr_workers=1,
+                       asr_threads=len(shared), mt_threads=len(shared), affinity=False)
+
+    n_asr = min(len(groups) - 1, max(1, round(len(groups) * asr_fraction)))
+    asr_cores = tuple(c for group in groups[:n_asr] for c in group)
+    mt_cores = tuple(c for group in groups[n_asr:] for c in group)
+
+    # 스레드 수는 물리 코어 수 기준 (형제 코어까지 쓰면 행렬 연산은 오히려 느려짐)
+    asr_workers = max(1, min(asr_workers, n_asr))
+    return CPUPlan(
+        asr_cores=asr_cores,
+        mt_cores=mt_cores,
+        asr_workers=asr_workers,
+        asr_threads=max(1, n_asr // asr_workers),
+        mt_threads=len(groups) - n_asr,
+        mt_interop_threads=1,
+        affinity=affinity
+    )
+
+
+def load_plan(path: Optional[str] = None) -> Optional[CPUPlan]:
+    """
+    저장된 실행 계획 읽기
+
+    Returns:
+        CPUPlan: 파일이 없거나 현재 사용할 수 없는 코어를 가리키면 None
+    """
+    path = path or DEFAULT_PLAN_PATH
+    try:
+        with open(path, encoding='utf-8') as f:
+            plan = CPUPlan.from_dict(json.load(f)['plan'])
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning("Invalid CPU plan file %s, ignoring: %s", path, e)
+        return None
+
+    missing = (set(plan.asr_cores) | set(plan.mt_cores)) - set(available_cores())
+    if missing:
+        logger.warning("CPU plan %s uses unavailable cores %s, ignoring (re-run autotune)",
+                       path, _format_cores(missing))
+        return None
+    return plan
+
+
+def save_plan(plan: CPUPlan, path: Optional[str] = None, benchmark: Optional[Dict] = None):
+    """실행 계획과 측정 결과 저장"""
+    path = path or DEFAULT_PLAN_PATH
+    data = {'plan': plan.to_dict(), 'cores': available_cores(), 'created': time.time()}
+    if benchmark is not None:
+        data['benchmark'] = benchmark
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+@contextlib.contextmanager
+def pinned(cores: Sequence[int]):
+    """
+    현재 스레드를 지정한 코어에 고정 (블록을 벗어나면 원래대로)
+
+    Linux에서 sched_setaffinity(0)은 호출한 스레드에만 적용되며, 이 블록
+    안에서 생성된 스레드(CTranslate2 워커, OpenMP 스레드 풀)는 이 설정을 물려받는다.
+    코어가 비어 있거나 지원하지 않는 플랫폼이면 아무 일도 하지 않는다.
+    """
+    if not cores or not hasattr(os, 'sched_setaffinity'):
+        yield
+        return
+
+    previous = os.sched_getaffinity(0)
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError as e:
+        logger.warning("Could not set CPU affinity %s: %s", _format_cores(cores), e)
+        yield
+        return
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def mt_threads_per_worker(plan: CPUPlan, workers: int = 1) -> int:
+    """
+    번역 워커 하나의 torch intra-op 스레드 수
+
+    torch 스레드 풀 크기는 번역을 호출하는 스레드마다 적용되므로, 번역 단계 워커가
+    동시에 실행되면 MT 코어에 워커 수 x 스레드 수만큼의 스레드가 돈다.
+    MT 스레드 예산을 워커 수로 나누어 MT 코어를 넘지 않게 한다.
+    """
+    return max(1, plan.mt_threads // max(1, workers))
+
+
+def configure_torch(plan: CPUPlan, workers: int = 1):
+    """
+    torch intra/inter-op 스레드 수 설정 (병렬 연산을 실행하기 전에 호출해야 함)
+
+    Args:
+        plan: 실행 계획
+        workers: 동시에 번역을 실행하는 스레드 수 (번역 단계 워커 수)
+    """
+    import torch
+
+    torch.set_num_threads(mt_threads_per_worker(plan, workers))
+    try:
+        torch.set_num_interop_threads(plan.mt_interop_threads)
+    except RuntimeError as e:
+        # inter-op 스레드 풀이 이미 시작된 경우 - intra-op 설정만 적용
+        logger.warning("Could not set torch inter-op threads: %s", e)
+
+
+def candidate_plans(cores: Optional[Sequence[int]] = None) -> List[CPUPlan]:
+    """자동 튜닝 후보 (ASR 비율 및 워커 수 조합, 중복 제거)"""
+    cores = list(cores) if cores is not None else available_cores()
+    n_groups = len(core_groups(cores))
+
+    candidates = []
+    for asr_fraction in (0.25, 0.375, 0.5, 0.625, 0.75):
+        for asr_workers in (1, 2):
+            plan = make_plan(cores, asr_fraction=asr_fraction, asr_workers=asr_workers)
+            if asr_workers > 1 and plan.asr_workers == 1:
+                continue
+            if plan not in candidates:
+                candidates.append(plan)
+        if n_groups < 2:
+            break
+    return candidates
+
+
+# ---------------------------------------------------------------------------
+# 자동 튜닝
+# ---------------------------------------------------------------------------
+
+BENCH_SENTENCES = [
+    "Thank you all for coming to today's meeting about the new project.",
+    "We will start with a short overview and then discuss the schedule.",
+    "Please let me know if you have any questions during the presentation.",
+    "The results from last quarter were better than we expected.",
+]
+
+
+def _load_audio(wav_path: Optional[str], seconds: float):
+    import numpy as np
+
+    if wav_path:
+        from faster_whisper import decode_audio
+        audio = decode_audio(wav_path, sampling_rate=SAMPLE_RATE)
+    else:
+        # 음성 파일이 없으면 잡음 사용 (VAD를 끄고 디코딩하므로 계산량은 비슷함)
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(int(SAMPLE_RATE * seconds)) * 0.05).astype(np.float32)
+    return audio[:int(SAMPLE_RATE * seconds)]
+
+
+def run_benchmark(plan: CPUPlan, duration: float = 20.0, wav_path: Optional[str] = None,
+                  window_seconds: float = 5.0) -> Dict:
+    """
+    현재 프로세스에서 계획을 적용하고 ASR/MT를 동시에 실행하여 처리량 측정
+
+    서버와 같은 환경 변수(WHISPER_MODEL_SIZE, WHISPER_COMPUTE_TYPE, MT_MODEL)로 모델을 만든다.
+    torch 스레드 설정은 프로세스당 한 번만 가능하므로 후보마다 새 프로세스에서 호출해야 한다.
+
+    Returns:
+        dict: asr_audio_seconds_per_second, mt_sentences_per_second 등
+    """
+    from asr_engine import TranscribeOptions, create_asr_engine
+
+    configure_torch(plan)
+
+    with pinned(plan.cores_for('asr')):
+        engine = create_asr_engine(
+            'faster-whisper',
+            model_size=os.getenv('WHISPER_MODEL_SIZE', "large-v3-turbo"),
+            device='cpu',
+            compute_type=os.getenv('WHISPER_COMPUTE_TYPE', "int8"),
+            num_workers=plan.asr_workers,
+            cpu_threads=plan.asr_threads
+        )
+
+    from transformers import pipeline
+    with pinned(plan.cores_for('mt')):
+        translator = pipeline("translation", model=os.getenv('MT_MODEL', "facebook/nllb-200-distilled-1.3B"),
+                              device=-1)
+
+    audio = _load_audio(wav_path, window_seconds)
+    options = TranscribeOptions(beam_size=1, vad_filter=False, language="en")
+
+    # 모델 준비 (첫 호출의 메모리 할당 등은 측정에서 제외)
+    list(engine.iter_segments(audio, options))
+    with pinned(plan.cores_for('mt')):
+        translator(BENCH_SENTENCES[0], src_lang="eng_Latn", tgt_lang="kor_Hang")
+
+    stop = threading.Event()
+    counts = {'asr_seconds': 0.0, 'asr_calls': 0, 'mt_sentences': 0}
+
+    def asr_loop():
+        # 워커 수만큼 동시에 요청해야 CTranslate2 워커가 모두 사용됨
+        with pinned(plan.cores_for('asr')):
+            while not stop.is_set():
+                list(engine.iter_segments(audio, options))
+                counts['asr_seconds'] += len(audio) / SAMPLE_RATE
+                counts['asr_calls'] += 1
+
+    def mt_loop():
+        with pinned(plan.cores_for('mt')):
+            i = 0
+            while not stop.is_set():
+                translator(BENCH_SENTENCES[i % len(BENCH_SENTENCES)], src_lang="eng_Latn", tgt_lang="kor_Hang")
+                counts['mt_sentences'] += 1
+                i += 1
+
+    threads = [threading.Thread(target=asr_loop, daemon=True) for _ in range(plan.asr_workers)]
+    threads.append(threading.Thread(target=mt_loop, daemon=True))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'elapsed': round(elapsed, 3),
+        'asr_audio_seconds_per_second': round(counts['asr_seconds'] / elapsed, 3),
+        'asr_calls': counts['asr_calls'],
+        'mt_sentences_per_second': round(counts['mt_sentences'] / elapsed, 3),
+        'mt_sentences': counts['mt_sentences'],
+    }
+
+
+def score(result: Dict, asr_seconds_per_second: float = DEFAULT_ASR_SECONDS_PER_SECOND,
+          sentence_seconds: float = DEFAULT_SENTENCE_SECONDS) -> float:
+    """
+    측정 결과로 동시에 처리할 수 있는 실시간 스트림 수 추정
+
+    두 단계가 파이프라인으로 이어지므로 더 느린 단계가 전체 처리량을 결정한다.
+    """
+    asr_streams = result['asr_audio_seconds_per_second'] / asr_seconds_per_second
+    mt_streams = result['mt_sentences_per_second'] * sentence_seconds
+    return min(asr_streams, mt_streams)
+
+
+def autotune(duration: float = 20.0, wav_path: Optional[str] = None, path: Optional[str] = None,
+             candidates: Optional[List[CPUPlan]] = None, **score_kwargs) -> Tuple[Optional[CPUPlan], List[Dict]]:
+    """
+    후보 계획을 하나씩 별도 프로세스에서 측정하고 가장 좋은 계획 저장
+
+    Returns:
+        tuple: (선택된 계획 또는 None, 후보별 결과 목록)
+    """
+    candidates = candidates or candidate_plans()
+    results = []
+    for i, plan in enumerate(candidates, 1):
+        print(f"[{i}/{len(candidates)}] {plan.describe()}", flush=True)
+        command = [sys.executable, os.path.abspath(__file__), 'bench-worker',
+                   '--plan', json.dumps(plan.to_dict()), '--duration', str(duration)]
+        if wav_path:
+            command += ['--wav', wav_path]
+
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            print(f"    failed: {completed.stderr.strip().splitlines()[-1:] or completed.returncode}", flush=True)
+            results.append({'plan': plan.to_dict(), 'error': completed.stderr[-2000:]})
+            continue
+
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result['score'] = round(score(result, **score_kwargs), 3)
+        print(f"    ASR {result['asr_audio_seconds_per_second']:.2f} audio s/s, "
+              f"MT {result['mt_sentences_per_second']:.2f} sentences/s -> {result['score']:.2f} streams", flush=True)
+        results.append({'plan': plan.to_dict(), **result})
+
+    scored = [r for r in results if 'score' in r]
+    if not scored:
+        return None, results
+
+    best = max(scored, key=lambda r: r['score'])
+    best_plan = CPUPlan.from_dict(best['plan'])
+    save_plan(best_plan, path, benchmark={'duration': duration, 'wav': wav_path, 'results': results})
+    return best_plan, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CPU core partitioning planner for ASR/MT")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    show = sub.add_parser('show', help="print the plan the server would use")
+    show.add_argument('--plan-file', default=os.getenv('CPU_PLAN_FILE'))
+
+    tune = sub.add_parser('autotune', help="benchmark candidate splits and save the best one")
+    tune.add_argument('--wav', help="speech WAV file used for ASR (default: synthetic noise)")
+    tune.add_argument('--duration', type=float, default=20.0, help="seconds per candidate")
+    tune.add_argument('--plan-file', default=os.getenv('CPU_PLAN_FILE'))
+    tune.add_argument('--asr-load', type=float, default=DEFAULT_ASR_SECONDS_PER_SECOND,
+                      help="audio seconds decoded per second of speech for one stream")
+    tune.add_argument('--sentence-seconds', type=float, default=DEFAULT_SENTENCE_SECONDS,
+                      help="average seconds of speech per translated sentence")
+
+    worker = sub.add_parser('bench-worker', help=argparse.SUPPRESS)
+    worker.add_argument('--plan', required=True)
+    worker.add_argument('--duration', type=float, default=20.0)
+    worker.add_argument('--wav')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'show':
+        plan = load_plan(args.plan_file)
+        source = args.plan_file or DEFAULT_PLAN_PATH
+        if plan is None:
+            plan, source = make_plan(), "default (no saved plan)"
+        print(f"{source}: {plan.describe()}")
+        print(json.dumps(plan.to_dict(), indent=2))
+        return 0
+
+    if args.command == 'bench-worker':
+        plan = CPUPlan.from_dict(json.loads(args.plan))
+        result = run_benchmark(plan, duration=args.duration, wav_path=args.wav)
+        print(json.dumps(result))
+        return 0
+
+    print(f"Available cores: {_format_cores(available_cores())} "
+          f"({len(core_groups(available_cores()))} physical)", flush=True)
+    best, _ = autotune(duration=args.duration, wav_path=args.wav, path=args.plan_file,
+                       asr_seconds_per_second=args.asr_load, sentence_seconds=args.sentence_seconds)
+    if best is None:
+        print("All candidates failed, no plan saved")
+        return 1
+    print(f"Best: {best.describe()}")
+    print(f"Saved to {args.plan_file or DEFAULT_PLAN_PATH}")
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# final_pass.py - 2단계 디코딩: 확정 문장 오디오 보관 및 재인식 결과 정렬
+
+import difflib
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class SentenceAudioBuffer:
+    """
+    마지막 확정 문장 이후 수신한 오디오 보관
+
+    부분 인식(빠른 디코딩)과 달리 문장을 확정할 때는 이 오디오만 한 번
+    빔 서치로 다시 인식한다. max_seconds를 넘는 오래된 오디오는 버린다.
+    end는 clear() 이후 추가된 전체 샘플 수로, 보관 중인 오디오의 끝 위치이다.
+    """
+
+    def __init__(self, max_seconds: float = 30.0):
+        self.max_samples = int(SAMPLE_RATE * max_seconds)
+        self._chunks = deque()
+        self._samples = 0
+        self.end = 0
+
+    def __len__(self):
+        return self._samples
+
+    @property
+    def seconds(self) -> float:
+        return self._samples / SAMPLE_RATE
+
+    def append(self, samples: np.ndarray):
+        self._chunks.append(samples)
+        self._samples += len(samples)
+        self.end += len(samples)
+
+        # 가장 오래된 청크부터 제거
+        while self._samples - len(self._chunks[0]) >= self.max_samples:
+            self._samples -= len(self._chunks.popleft())
+
+    def audio(self) -> np.ndarray:
+        if not self._chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self._chunks).astype(np.float32, copy=False)
+
+    def consume(self, n_samples: int):
+        """앞에서부터 n_samples 제거 (확정된 문장의 오디오)"""
+        n_samples = max(0, min(n_samples, self._samples))
+        while n_samples > 0 and self._chunks:
+            head = self._chunks[0]
+            if len(head) <= n_samples:
+                self._chunks.popleft()
+                self._samples -= len(head)
+                n_samples -= len(head)
+            else:
+                self._chunks[0] = head[n_samples:]
+                self._samples -= n_samples
+                n_samples = 0
+
+    def discard_until(self, position: int):
+        """절대 위치 position(clear() 이후 샘플 수) 이전의 오디오 제거"""
+        self.consume(position - (self.end - self._samples))
+
+    def clear(self):
+        self._chunks.clear()
+        self._samples = 0
+        self.end = 0
+
+
+def align_segments(segment_texts: Sequence[str], segment_ends: Sequence[float],
+                   reference: str, min_similarity: float = 0.5) -> Optional[Tuple[str, float, float]]:
+    """
+    재인식 세그먼트 중 부분 인식 문장과 가장 잘 맞는 연속 구간 선택
+
+    보관된 오디오에는 확정할 문장 앞뒤의 다른 발화가 섞여 있을 수 있으므로
+    모든 연속 구간 [i, k]를 비교한다 (세그먼트 수가 적어 비용은 무시할 만함).
+
+    Args:
+        segment_texts: 재인식된 세그먼트 텍스트
+        segment_ends: 세그먼트 종료 시각 (초)
+        reference: 부분 인식으로 얻은 확정 문장
+        min_similarity: 채택할 최소 유사도
+
+    Returns:
+        tuple: (재인식 문장, 구간 종료 시각, 유사도) - 적절한 구간이 없으면 None
+    """
+    if not segment_texts or not reference:
+        return None
+
+    best: Optional[Tuple[str, float, float]] = None
+    for i in range(len(segment_texts)):
+        parts: List[str] = []
+        for k in range(i, len(segment_texts)):
+            parts.append(segment_texts[k])
+            candidate = " ".join(parts)
+            similarity = difflib.SequenceMatcher(None, candidate, reference).ratio()
+            if best is None or similarity > best[2]:
+                best = (candidate, segment_ends[k], similarity)
+
+    if best is None or best[2] < min_similarity:
+        return None
+    return best
@@ -0,0 +1,190 @@
+# hot_swap.py - 서비스 중단 없는 모델 교체 (백그라운드 로드, 워밍업, 시험 운영, 자동 되돌리기)
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+from model_cascade import ModelCascade, ModelHandle
+
+logger = logging.getLogger(__name__)
+
+MODEL_KINDS = ('asr', 'mt')
+
+
+@dataclass
+class SwapJob:
+    """모델 교체 요청 하나의 진행 상태"""
+    id: int
+    kind: str
+    tiers: List[int]
+    model: str
+    previous: Dict[int, str] = field(default_factory=dict)  # 교체한 단계 -> 이전 모델 이름
+    status: str = "queued"  # queued, loading, warming, probation, committed, rolled_back, failed
+    error: Optional[str] = None
+    uses: int = 0
+    failures: int = 0
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class ProbationPolicy:
+    """
+    교체 직후 시험 운영 기준
+
+    교체 후 min_failures회 이상 실패하고 실패 비율이 max_failure_ratio 이상이면
+    이전 모델로 되돌린다. probation_uses회 사용하거나 probation_seconds가 지나면
+    확정하고 이전 모델을 해제한다 (그때까지 이전 모델은 메모리에 남아 있음).
+    """
+    probation_uses: int = 20
+    probation_seconds: float = 60.0
+    min_failures: int = 3
+    max_failure_ratio: float = 0.3
+    check_interval: float = 0.5
+
+
+class ModelSwapper:
+    """
+    모델 교체 요청을 순서대로 처리하는 백그라운드 작업자
+
+    1. 새 모델을 백그라운드 스레드에서 로드 (기존 모델은 계속 서비스)
+    2. 워밍업 추론 - 실패하면 교체하지 않음
+    3. 캐스케이드의 모델을 교체 - 진행 중인 윈도우/문장은 빌린 이전 모델로 끝까지 처리하고
+       다음 요청부터 새 모델 사용
+    4. 시험 운영 - 실패가 많으면 이전 모델로 되돌리고, 문제가 없으면 이전 모델 해제
+    """
+
+    def __init__(self, cascade: ModelCascade, loaders: Dict[str, Callable[[str], object]],
+                 warmups: Dict[str, Callable[[object], None]], policy: Optional[ProbationPolicy] = None,
+                 history_size: int = 20):
+        self.cascade = cascade
+        self.loaders = loaders
+        self.warmups = warmups
+        self.policy = policy or ProbationPolicy()
+        self.current: Optional[SwapJob] = None
+        self.history = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="model-swapper", daemon=True)
+        self._thread.start()
+
+    def request(self, kind: str, tiers: Sequence[int], model: str) -> SwapJob:
+        """
+        교체 요청 추가
+
+        Args:
+            kind: 'asr' 또는 'mt'
+            tiers: 교체할 캐스케이드 단계 목록 (새 모델 하나를 함께 사용, 나머지 단계는 그대로)
+            model: 새 모델 이름 (Whisper 크기 또는 Hugging Face 모델 ID)
+
+        Returns:
+            SwapJob: 요청 상태 (처리는 백그라운드에서 진행)
+        """
+        if kind not in MODEL_KINDS:
+            raise ValueError(f"Unknown model kind: {kind} (expected one of {', '.join(MODEL_KINDS)})")
+        tiers = sorted(set(tiers))
+        if not tiers:
+            raise ValueError("At least one tier is required")
+        for tier in tiers:
+            if not 0 <= tier < len(self.cascade.tiers):
+                raise ValueError(f"Unknown tier: {tier} (cascade has {len(self.cascade.tiers)} tier(s))")
+        if not model:
+            raise ValueError("Model name is required")
+
+        job = SwapJob(id=next(self._ids), kind=kind, tiers=tiers, model=model)
+        with self._lock:
+            self.history.append(job)
+        self._queue.put(job)
+        logger.info("Model swap requested", extra={'swap_id': job.id, 'kind': kind, 'tiers': tiers, 'model': model})
+        return job
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'current': self.current.to_dict() if self.current else None,
+                'pending': self._queue.qsize(),
+                'history': [job.to_dict() for job in self.history],
+            }
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self.current = job
+            try:
+                self._swap(job)
+            except Exception as e:
+                job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+                logger.exception("Model swap failed: %s", e, extra={'swap_id': job.id})
+            finally:
+                job.finished = time.time()
+                with self._lock:
+                    self.current = None
+
+    def _swap(self, job: SwapJob):
+        # 이미 새 모델을 쓰는 단계는 제외
+        job.tiers = [tier for tier in job.tiers if self.cascade.handle(job.kind, tier).name != job.model]
+        if not job.tiers:
+            job.status, job.error = "failed", "Model is already in use"
+            return
+
+        # 1. 로드 (기존 모델은 계속 사용 중)
+        job.status = "loading"
+        started = time.monotonic()
+        new = ModelHandle(job.model, self.loaders[job.kind](job.model), self.cascade.on_close)
+        load_seconds = time.monotonic() - started
+
+        # 2. 워밍업 - 실패하면 새 모델만 해제
+        job.status = "warming"
+        try:
+            self.warmups[job.kind](new.model)
+        except Exception:
+            new.retire()
+            raise
+
+        # 3. 교체 - 이후 빌리는 요청부터 새 모델 사용
+        previous = self.cascade.replace(job.kind, job.tiers, new)
+        job.previous = {tier: handle.name for tier, handle in previous.items()}
+        job.status = "probation"
+        logger.info("Model swapped in", extra={
+            'swap_id': job.id, 'kind': job.kind, 'model': job.model, 'previous': job.previous,
+            'tiers': job.tiers, 'load_seconds': round(load_seconds, 1)
+        })
+
+        # 4. 시험 운영
+        policy = self.policy
+        started = time.monotonic()
+        while True:
+            time.sleep(policy.check_interval)
+            job.uses, job.failures = new.uses, new.failures
+            if new.failures >= policy.min_failures and new.failures / max(1, new.uses) >= policy.max_failure_ratio:
+                for tier, old in previous.items():
+                    self.cascade.replace(job.kind, [tier], old)
+                new.retire()
+                job.status = "rolled_back"
+                job.error = f"{new.failures} of {new.uses} requests failed"
+                logger.error("Model swap rolled back", extra={
+                    'swap_id': job.id, 'kind': job.kind, 'model': job.model, 'previous': job.previous,
+                    'uses': new.uses, 'failures': new.failures
+                })
+                return
+            if new.uses >= policy.probation_uses or time.monotonic() - started >= policy.probation_seconds:
+                break
+
+        # 5. 확정 - 다른 단계에서 쓰지 않는 이전 모델은 진행 중인 요청이 끝나면 해제
+        for old in {id(handle): handle for handle in previous.values()}.values():
+            if not self.cascade.in_use(job.kind, old):
+                old.retire()
+        job.status = "committed"
+        logger.info("Model swap committed", extra={
+            'swap_id': job.id, 'kind': job.kind, 'model': job.model, 'uses': new.uses, 'failures': new.failures
+        })
@@ -0,0 +1,286 @@
+# language_id.py - 언어 식별 (fastText LID 모델 + LRU 캐시)
+
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import urllib.request
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 지원 언어 매핑 정의
+LANGUAGE_MAPPING = {
+    # 파이썬 코드 내에서 사용하는 언어 매핑
+    # ISO 639-1 코드 (fastText/langdetect) -> NLLB 코드 매핑
+    "en": "eng_Latn",  # 영어
+    "ko": "kor_Hang",  # 한국어
+    "ja": "jpn_Jpan",  # 일본어
+    "zh": "cmn_Hans",  # 중국어 간체
+    "de": "deu_Latn",  # 독일어
+    "fr": "fra_Latn",  # 프랑스어
+    "es": "spa_Latn",  # 스페인어
+    "ru": "rus_Cyrl",  # 러시아어
+    "pt": "por_Latn",  # 포르투갈어
+    "it": "ita_Latn",  # 이탈리아어
+    "vi": "vie_Latn",  # 베트남어
+    "th": "tha_Thai",  # 태국어
+    "id": "ind_Latn",  # 인도네시아어
+    "nl": "nld_Latn",  # 네덜란드어
+    "tr": "tur_Latn",  # 터키어
+    "ar": "ara_Arab",  # 아랍어
+    "hi": "hin_Deva",  # 힌디어
+}
+
+# ISO 언어 코드 -> whisper 코드 매핑
+WHISPER_LANGUAGE_MAPPING = {
+    "en": "en",  # 영어
+    "ko": "ko",  # 한국어
+    "ja": "ja",  # 일본어
+    "zh": "zh",  # 중국어
+    "de": "de",  # 독일어
+    "fr": "fr",  # 프랑스어
+    "es": "es",  # 스페인어
+    "ru": "ru",  # 러시아어
+    "pt": "pt",  # 포르투갈어
+    "it": "it",  # 이탈리아어
+    "vi": "vi",  # 베트남어
+    "th": "th",  # 태국어
+    "id": "id",  # 인도네시아어
+    "nl": "nl",  # 네덜란드어
+    "tr": "tr",  # 터키어
+    "ar": "ar",  # 아랍어
+    "hi": "hi",  # 힌디어
+}
+
+# fastText 언어 식별 모델 (압축 버전, 약 900KB)
+FASTTEXT_LID_URL = "https://dl.fbaipublicfiles.com/fasttext/supported-models/lid.176.ftz"
+DEFAULT_FASTTEXT_LID_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "lid.176.ftz")
+
+FASTTEXT_DOWNLOAD_TIMEOUT = 30
+
+# 예측 입력 정규화: 공백 연속을 공백 하나로 (fastText는 줄바꿈을 입력 끝으로 처리)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+# 캐시 키 정규화: 숫자/기호/공백 연속을 공백 하나로
+# (\W는 태국어/힌디어의 결합 문자도 포함하므로 예측 입력에는 사용하지 않음)
+_CACHE_KEY_PATTERN = re.compile(r'[\d\W_]+')
+
+# 감지 실패 시 기본값
+DEFAULT_LANGUAGE = "eng_Latn"
+
+
+def normalize_text(text: str) -> str:
+    """모델에 전달할 정규화 텍스트 (소문자화, 공백 정리)"""
+    return _WHITESPACE_PATTERN.sub(' ', text.lower()).strip()
+
+
+def cache_key(text: str) -> str:
+    """캐시 키 - 숫자/기호만 다른 부분 인식 결과가 같은 항목을 쓰도록 정규화"""
+    return _CACHE_KEY_PATTERN.sub(' ', text.lower()).strip()
+
+
+def whisper_language_for(nllb_code: Optional[str], default: str = 'en') -> str:
+    """NLLB 언어 코드 -> Whisper 언어 코드"""
+    lang_code = next((k for k, v in LANGUAGE_MAPPING.items() if v == nllb_code), default)
+    return WHISPER_LANGUAGE_MAPPING.get(lang_code, default)
+
+
+class LanguageIdentifier:
+    """
+    텍스트 언어 식별기
+
+    fastText LID 모델을 한 번만 로드해 사용하고, 모델이 없으면 langdetect로
+    대체한다. 결과는 지원 언어(LANGUAGE_MAPPING) 중에서만 고르며, 숫자/기호를
+    제거한 텍스트(cache_key) 기준 LRU 캐시를 사용한다.
+    """
+
+    def __init__(self, model_path: Optional[str] = None, cache_size: int = 1024,
+                 min_chars: int = 10, top_k: int = 5, download: bool = True):
+        self.model_path = model_path or DEFAULT_FASTTEXT_LID_PATH
+        self.min_chars = min_chars
+        self.top_k = top_k
+        self.backend = None
+        self._model = None
+        self._lock = threading.Lock()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self._load(download)
+
+    def _load(self, download: bool):
+        try:
+            import fasttext
+
+            if not os.path.exists(self.model_path) and download:
+                os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+                self._download()
+
+            self._model = fasttext.load_model(self.model_path)
+            self.backend = "fasttext"
+            return
+        except Exception as e:
+            logger.warning("fastText LID 모델을 사용할 수 없습니다 (%s), langdetect로 대체합니다.", e)
+
+        try:
+            from langdetect import DetectorFactory
+
+            # 언어 감지 결과의 일관성을 위해 시드 설정
+            DetectorFactory.seed = 0
+            self.backend = "langdetect"
+        except ImportError:
+            logger.warning("langdetect 라이브러리를 찾을 수 없습니다.")
+
+    def _download(self):
+        """임시 파일로 받은 뒤 이름을 바꿔, 중단된 다운로드가 모델 파일로 남지 않도록 함"""
+        logger.info("Downloading fastText LID model to %s", self.model_path)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.model_path), suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f, \
+                    urllib.request.urlopen(FASTTEXT_LID_URL, timeout=FASTTEXT_DOWNLOAD_TIMEOUT) as response:
+                shutil.copyfileobj(response, f)
+            os.replace(tmp_path, self.model_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _fasttext_predict(self, texts: List[str]) -> List[List[Tuple[str, float]]]:
+        """fastText 예측 - [(ISO 코드, 확률), ...] 목록"""
+        try:
+            labels, probs = self._model.predict(texts, k=self.top_k)
+            return [
+                [(label.replace('__label__', ''), float(prob)) for label, prob in zip(item_labels, item_probs)]
+                for item_labels, item_probs in zip(labels, probs)
+            ]
+        except ValueError:
+            # numpy 2.x 와 fasttext 0.9.x 조합의 copy=False 오류 회피 - 저수준 API 사용
+            return [
+                [(label.replace('__label__', ''), float(prob))
+                 for prob, label in self._model.f.predict(text, self.top_k, 0.0, 'strict')]
+                for text in texts
+            ]
+
+    def _langdetect_predict(self, text: str) -> List[Tuple[str, float]]:
+        from langdetect import detect_langs
+        from langdetect.lang_detect_exception import LangDetectException
+
+        try:
+            # langdetect는 'zh-cn' 형식을 사용하므로 앞부분만 사용
+            return [(d.lang.split('-')[0], float(d.prob)) for d in detect_langs(text)]
+        except LangDetectException:
+            return []
+
+    def _pick_supported(self, candidates: Sequence[Tuple[str, float]]) -> Tuple[str, float]:
+        """후보 중 지원 언어에 속하는 가장 확률 높은 언어 선택"""
+        for lang, prob in candidates:
+            if lang in LANGUAGE_MAPPING:
+                return LANGUAGE_MAPPING[lang], prob
+        return DEFAULT_LANGUAGE, 0.0
+
+    def _cache_get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._cache.move_to_end(key)
+            return result
+
+    def _cache_put(self, key: str, result: Tuple[str, float]):
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _predict(self, normalized: str) -> Tuple[str, float]:
+        """캐시를 거치지 않는 예측"""
+        if self.backend == "fasttext":
+            return self._pick_supported(self._fasttext_predict([normalized])[0])
+        if self.backend == "langdetect":
+            # langdetect는 전역 상태를 사용하므로 직렬화
+            with self._lock:
+                return self._pick_supported(self._langdetect_predict(normalized))
+        return DEFAULT_LANGUAGE, 0.0
+
+    def detect(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        텍스트 언어 감지
+
+        Args:
+            text: 언어를 감지할 텍스트
+
+        Returns:
+            tuple: (NLLB 언어 코드, 신뢰도) - 텍스트가 너무 짧으면 (None, 0.0)
+        """
+        if not text or len(text.strip()) < self.min_chars:
+            return None, 0.0
+
+        key = cache_key(text)
+        if not key:
+            return None, 0.0
+
+        result = self._cache_get(key)
+        if result is None:
+            result = self._predict(normalize_text(text))
+            self._cache_put(key, result)
+        return result
+
+    def detect_batch(self, texts: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        """
+        여러 텍스트 언어 감지 - 캐시에 없는 텍스트만 한 번에 예측
+
+        Args:
+            texts: 텍스트 목록
+
+        Returns:
+            list: 텍스트별 (NLLB 언어 코드, 신뢰도)
+        """
+        results: List[Tuple[Optional[str], float]] = [(None, 0.0)] * len(texts)
+        if self.backend != "fasttext":
+            return [self.detect(text) for text in texts]
+
+        # 캐시 키별 (예측 입력, 결과를 채울 위치)
+        pending = {}
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) < self.min_chars:
+                continue
+            key = cache_key(text)
+            if not key:
+                continue
+            if key in pending:
+                pending[key][1].append(i)
+                continue
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending[key] = (normalize_text(text), [i])
+
+        if not pending:
+            return results
+
+        keys = list(pending)
+        for key, candidates in zip(keys, self._fasttext_predict([pending[key][0] for key in keys])):
+            result = self._pick_supported(candidates)
+            self._cache_put(key, result)
+            for i in pending[key][1]:
+                results[i] = result
+        return results
+
+    def cache_clear(self):
+        with self._cache_lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
+
+    def cache_info(self) -> dict:
+        """LRU 캐시 통계"""
+        with self._cache_lock:
+            return {'hits': self._hits, 'misses': self._misses,
+                    'size': len(self._cache), 'maxsize': self.cache_size}
@@ -0,0 +1,116 @@
+# log_config.py - 비동기(큐 기반) 구조화 로깅 설정
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import time
+
+# LogRecord 기본 속성 - 이 외의 속성은 extra로 전달된 구조화 필드로 간주
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None)).keys()) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 JSON 레코드 하나를 출력하는 포매터"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(record.created)),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+
+        # logger.info(..., extra={'session_id': sid}) 로 전달된 필드
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 레코드를 버리고 호출 스레드를 막지 않는 핸들러"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # 인자는 이후 호출 스레드에서 바뀔 수 있으므로 메시지 문자열은 여기(호출 스레드)서 확정하고,
+        # JSON 직렬화와 파일 쓰기만 리스너 스레드에서 수행 (기본 구현과 달리 Formatter.format은 호출하지 않음)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    """실행 여부를 직접 기록하여 stop()을 여러 번 호출해도 안전한 리스너"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running = False
+
+    def start(self):
+        super().start()
+        self.running = True
+
+    def stop(self):
+        if self.running:
+            self.running = False
+            super().stop()
+
+
+def setup_logging(filename='server.log', level=logging.INFO, max_bytes=10 * 1024 * 1024,
+                  backup_count=5, queue_size=10000):
+    """
+    루트 로거를 큐 기반 비동기 로깅으로 설정
+
+    호출 스레드는 레코드를 큐에 넣기만 하고, 파일 쓰기와 JSON 직렬화는
+    QueueListener 스레드가 담당한다. 파일은 max_bytes마다 회전한다.
+
+    Args:
+        filename: 로그 파일 경로
+        level: 로그 레벨
+        max_bytes: 회전 기준 파일 크기
+        backup_count: 보관할 이전 파일 수
+        queue_size: 큐 최대 길이 (초과 시 레코드 버림)
+
+    Returns:
+        QueueListener: 시작된 리스너 (종료 시 stop() 호출)
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = _NonBlockingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = _QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
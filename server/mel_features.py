@@ -0,0 +1,149 @@
+# mel_features.py - 겹치는 윈도우의 log-mel 특징을 한 번만 계산하는 세션별 캐시
+
+import threading
+from typing import Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+
+_HALF = N_FFT // 2
+_HANN = np.hanning(N_FFT + 1)[:-1]
+# 앞쪽 프레임 중 반사 패딩의 영향을 받는 프레임 수
+_HEAD_FRAMES = -(-_HALF // HOP_LENGTH)
+
+
+def raw_log_mel(signal: np.ndarray, mel_filters: np.ndarray) -> np.ndarray:
+    """
+    signal[i * HOP_LENGTH : i * HOP_LENGTH + N_FFT] 프레임의 log10 mel 값 (정규화 전)
+
+    Returns:
+        np.ndarray: (n_mels, 프레임 수) float32
+    """
+    if len(signal) < N_FFT:
+        return np.zeros((mel_filters.shape[0], 0), dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(signal, N_FFT)[::HOP_LENGTH]
+    power = np.abs(np.fft.rfft(frames * _HANN, axis=-1)) ** 2
+    mel = mel_filters @ power.T
+    return np.log10(np.clip(mel, 1e-10, None)).astype(np.float32)
+
+
+def normalize_log_mel(raw: np.ndarray) -> np.ndarray:
+    """Whisper 정규화 - 최댓값 기준 80dB 아래 값은 자르고 [-1, 1] 근처로 조정"""
+    log_spec = np.maximum(raw, raw.max() - 8.0)
+    return (log_spec + 4.0) / 4.0
+
+
+def log_mel_spectrogram(audio: np.ndarray, mel_filters: np.ndarray, padding: int = HOP_LENGTH) -> np.ndarray:
+    """
+    윈도우 전체의 Whisper log-mel 특징 (faster-whisper FeatureExtractor와 같은 계산)
+
+    오디오 끝에 padding만큼 0을 붙이고 양쪽을 반사 패딩한 STFT에서 마지막 프레임을 버린다.
+
+    Returns:
+        np.ndarray: (n_mels, len(audio) // HOP_LENGTH + 1) float32
+    """
+    x = np.pad(np.asarray(audio, dtype=np.float32), (0, padding))
+    raw = raw_log_mel(np.pad(x, _HALF, mode='reflect'), mel_filters)[:, :-1]
+    return normalize_log_mel(raw)
+
+
+class MelFeatureCache:
+    """
+    세션 오디오의 log-mel 프레임 캐시
+
+    프레임은 세션 오디오의 절대 위치(녹음 시작 후 샘플 수) 기준 HOP_LENGTH 간격 격자에
+    놓이며, 윈도우가 격자에 맞춰 시작하면 앞 윈도우와 겹치는 구간의 프레임을 다시 쓴다.
+    윈도우 양 끝의 몇 프레임은 패딩에 따라 값이 달라지므로 매번 계산하고, 정규화는
+    윈도우 최댓값 기준이므로 윈도우마다 적용한다. 윈도우 시작보다 앞선 프레임은 버린다.
+    """
+
+    def __init__(self):
+        self.mel_filters: Optional[np.ndarray] = None
+        self.origin = 0  # frames[:, 0]의 중심 위치 (절대 샘플)
+        self.frames: Optional[np.ndarray] = None
+        self.frames_computed = 0
+        self.frames_reused = 0
+        self.resets = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.frames = None
+
+    def features_for(self, audio: np.ndarray, start: int, mel_filters: np.ndarray) -> np.ndarray:
+        """
+        윈도우의 log-mel 특징 (log_mel_spectrogram(audio, mel_filters)과 같은 값)
+
+        Args:
+            audio: 윈도우 오디오 (16kHz float32)
+            start: audio[0]의 절대 위치 (녹음 시작 후 샘플 수)
+            mel_filters: 엔진의 mel 필터 (모델마다 80 또는 128개)
+
+        Returns:
+            np.ndarray: (n_mels, len(audio) // HOP_LENGTH + 1) float32
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        length = len(audio)
+        count = length // HOP_LENGTH + 1
+        # 끝쪽 프레임 중 0 패딩/반사 패딩의 영향을 받는 첫 프레임
+        tail_from = (length - _HALF) // HOP_LENGTH + 1
+        if tail_from - _HEAD_FRAMES < 4:
+            # 너무 짧은 윈도우는 캐시할 프레임이 거의 없음
+            return log_mel_spectrogram(audio, mel_filters)
+
+        x = np.pad(audio, (0, HOP_LENGTH))
+        head = raw_log_mel(np.pad(x[:HOP_LENGTH * _HEAD_FRAMES + _HALF], (_HALF, 0), mode='reflect'),
+                           mel_filters)[:, :_HEAD_FRAMES]
+        tail = raw_log_mel(np.pad(x[tail_from * HOP_LENGTH - _HALF:], (0, _HALF), mode='reflect'),
+                           mel_filters)[:, :count - tail_from]
+
+        with self._lock:
+            interior = self._interior(audio, start, tail_from, mel_filters)
+
+        return normalize_log_mel(np.concatenate([head, interior, tail], axis=1))
+
+    def _interior(self, audio, start, tail_from, mel_filters):
+        first = start + _HEAD_FRAMES * HOP_LENGTH     # 필요한 첫 프레임 중심
+        last = start + (tail_from - 1) * HOP_LENGTH   # 필요한 마지막 프레임 중심
+
+        if self.frames is not None:
+            cached_end = self.origin + self.frames.shape[1] * HOP_LENGTH  # 다음에 계산할 프레임 중심
+            if (mel_filters is not self.mel_filters or (first - self.origin) % HOP_LENGTH
+                    or first < self.origin or cached_end - _HALF < start):
+                # 모델 변경, 격자 불일치, 버퍼 리셋으로 생긴 공백 - 이 윈도우부터 다시 쌓음
+                self.frames = None
+                self.resets += 1
+        if self.frames is None:
+            self.mel_filters = mel_filters
+            self.origin = first
+            self.frames = np.zeros((mel_filters.shape[0], 0), dtype=np.float32)
+
+        # 이미 지난 프레임 버리기 (윈도우는 앞으로만 이동)
+        drop = (first - self.origin) // HOP_LENGTH
+        if drop:
+            self.frames = self.frames[:, drop:]
+            self.origin = first
+
+        # 새로 들어온 오디오 구간의 프레임만 계산
+        next_center = self.origin + self.frames.shape[1] * HOP_LENGTH
+        reused = min(self.frames.shape[1], tail_from - _HEAD_FRAMES)
+        if next_center <= last:
+            new = raw_log_mel(audio[next_center - _HALF - start:last + _HALF - start], mel_filters)
+            self.frames = np.concatenate([self.frames, new], axis=1)
+            self.frames_computed += new.shape[1]
+        self.frames_reused += reused
+
+        return self.frames[:, :tail_from - _HEAD_FRAMES]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.frames_computed + self.frames_reused
+            return {
+                'frames_computed': self.frames_computed,
+                'frames_reused': self.frames_reused,
+                'reuse_ratio': round(self.frames_reused / total, 3) if total else 0.0,
+                'resets': self.resets,
+            }
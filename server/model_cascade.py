@@ -0,0 +1,333 @@
+# model_cascade.py - 부하에 따라 세션을 작은 모델 단계(tier)로 옮기는 모델 캐스케이드
+
+import contextlib
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class ModelHandle:
+    """
+    참조 횟수를 세는 모델 래퍼
+
+    요청 처리 중에는 acquire()/release()로 모델을 빌려 쓰며, 교체된 모델은
+    retire() 후 마지막 요청이 끝나야 해제된다. 사용/실패 횟수는 교체 직후
+    새 모델의 이상 여부 판단에 사용한다.
+    """
+
+    def __init__(self, name: str, model, on_close: Optional[Callable[["ModelHandle"], None]] = None):
+        self.name = name
+        self.model = model
+        self.on_close = on_close
+        self.refs = 0
+        self.uses = 0
+        self.failures = 0
+        self.retired = False
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> "ModelHandle":
+        with self._lock:
+            if self.closed:
+                raise RuntimeError(f"Model {self.name} has been released")
+            self.refs += 1
+            return self
+
+    def release(self, failed: bool = False):
+        with self._lock:
+            self.refs -= 1
+            self.uses += 1
+            if failed:
+                self.failures += 1
+            close = self.retired and self.refs == 0 and not self.closed
+            if close:
+                self.closed = True
+        if close:
+            self._close()
+
+    def retire(self):
+        """더 이상 새 요청에 쓰지 않음 - 진행 중인 요청이 없으면 바로 해제"""
+        with self._lock:
+            self.retired = True
+            close = self.refs == 0 and not self.closed
+            if close:
+                self.closed = True
+        if close:
+            self._close()
+
+    def _close(self):
+        model, self.model = self.model, None
+        try:
+            if hasattr(model, 'close'):
+                model.close()
+        except Exception as e:
+            logger.warning("Error closing model %s: %s", self.name, e)
+        del model
+        if self.on_close:
+            self.on_close(self)
+        logger.info("Model released: %s", self.name)
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """캐스케이드 단계 - 0이 가장 큰(정확한) 모델"""
+    index: int
+    name: str
+    asr_model: str
+    mt_model: str
+
+    def to_dict(self) -> Dict:
+        return {'tier': self.index, 'name': self.name, 'asr_model': self.asr_model, 'mt_model': self.mt_model}
+
+
+@dataclass(frozen=True)
+class CascadePolicy:
+    """
+    단계 변경 기준
+
+    RTF는 윈도우 ASR 디코딩 시간 / 윈도우 오디오 길이, 지연(lag)은 처리 시작 시점에
+    아직 처리하지 못하고 쌓여 있는 오디오 길이(초)이다.
+    """
+    downgrade_rtf: float = 0.8       # 이 값을 넘으면 작은 모델로
+    downgrade_lag: float = 3.0       # 밀린 오디오가 이 값(초)을 넘으면 작은 모델로
+    downgrade_after: int = 2         # 연속으로 기준을 넘은 윈도우 수
+    upgrade_rtf: float = 0.35        # 이 값보다 낮고
+    upgrade_lag: float = 0.5         # 밀린 오디오가 이 값보다 적은 상태가
+    upgrade_after: float = 30.0      # 이 시간(초) 동안 유지되면 큰 모델로
+    min_dwell: float = 10.0          # 단계 변경 후 최소 유지 시간 (진동 방지)
+    ewma_alpha: float = 0.3          # RTF 지수 이동 평균 가중치
+
+
+@dataclass(frozen=True)
+class TierChange:
+    """세션의 단계 변경 내역"""
+    session_id: str
+    old: ModelTier
+    new: ModelTier
+    reason: str
+    rtf: float
+    lag: float
+
+    @property
+    def direction(self) -> str:
+        return 'down' if self.new.index > self.old.index else 'up'
+
+
+class _SessionLoad:
+    __slots__ = ('tier', 'rtf', 'lag', 'over_count', 'under_since', 'last_change')
+
+    def __init__(self, tier: int, now: float):
+        self.tier = tier
+        self.rtf = None
+        self.lag = 0.0
+        self.over_count = 0
+        self.under_since = None
+        self.last_change = now
+
+
+class ModelCascade:
+    """
+    ASR/MT 모델 단계 목록과 세션별 단계 선택 정책
+
+    단계 i는 ASR 모델 목록과 MT 모델 목록의 i번째(목록이 짧으면 마지막) 모델을 사용한다.
+    모든 모델은 시작 시 미리 올려 두며 (부하가 높을 때 모델을 읽으면 지연이 더 커짐),
+    같은 이름의 모델은 한 번만 만든다. 모델은 ModelHandle로 보관하여 실행 중에
+    replace()로 교체할 수 있다.
+    """
+
+    def __init__(self, asr_models: Sequence[str], mt_models: Sequence[str],
+                 make_asr: Callable[[str], object], make_mt: Callable[[str], object],
+                 policy: Optional[CascadePolicy] = None,
+                 on_close: Optional[Callable[[ModelHandle], None]] = None):
+        if not asr_models or not mt_models:
+            raise ValueError("Model cascade needs at least one ASR and one MT model")
+
+        self.policy = policy or CascadePolicy()
+        self.on_close = on_close
+        caches = {'asr': {}, 'mt': {}}
+        factories = {'asr': make_asr, 'mt': make_mt}
+        self._handles: Dict[str, List[ModelHandle]] = {'asr': [], 'mt': []}
+        for i in range(max(len(asr_models), len(mt_models))):
+            for kind, names in (('asr', asr_models), ('mt', mt_models)):
+                name = names[min(i, len(names) - 1)]
+                if name not in caches[kind]:
+                    caches[kind][name] = ModelHandle(name, factories[kind](name), on_close)
+                self._handles[kind].append(caches[kind][name])
+        self.tiers: List[ModelTier] = self._build_tiers()
+
+        self._sessions: Dict[str, _SessionLoad] = {}
+        self._tier_rtf: List[Optional[float]] = [None] * len(self.tiers)
+        self._changes = Counter()
+        self._lock = threading.Lock()
+
+    def _build_tiers(self) -> List[ModelTier]:
+        return [
+            ModelTier(i, f"{asr.name} + {mt.name.rsplit('/', 1)[-1]}", asr.name, mt.name)
+            for i, (asr, mt) in enumerate(zip(self._handles['asr'], self._handles['mt']))
+        ]
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.tiers) > 1
+
+    def asr_engine(self, tier: int):
+        return self._handles['asr'][tier].model
+
+    def translator(self, tier: int):
+        return self._handles['mt'][tier].model
+
+    def handle(self, kind: str, tier: int) -> ModelHandle:
+        """단계의 현재 모델 핸들 (kind: 'asr' 또는 'mt')"""
+        with self._lock:
+            return self._handles[kind][tier]
+
+    def acquire(self, kind: str, tier: int) -> ModelHandle:
+        """
+        단계의 현재 모델 빌리기 - 사용 후 반드시 release() 호출
+
+        교체와 같은 lock 안에서 참조를 늘리므로, 빌린 모델은 교체되더라도
+        release() 전까지 해제되지 않는다.
+        """
+        with self._lock:
+            return self._handles[kind][tier].acquire()
+
+    @contextlib.contextmanager
+    def lease(self, kind: str, tier: int):
+        """with 문으로 모델 빌리기 - 예외가 발생하면 실패로 기록"""
+        handle = self.acquire(kind, tier)
+        failed = False
+        try:
+            yield handle.model
+        except Exception:
+            failed = True
+            raise
+        finally:
+            handle.release(failed)
+
+    def replace(self, kind: str, tiers: Sequence[int], new: ModelHandle) -> Dict[int, ModelHandle]:
+        """
+        지정한 단계의 모델을 new로 교체 (이후 요청부터 new 사용)
+
+        같은 모델을 쓰는 다른 단계는 그대로 둔다. 이전 모델은 해제하지 않으며,
+        호출 측이 확인 후 in_use()가 아니면 retire()한다 (실패 시 되돌리기 위해).
+
+        Returns:
+            dict: 단계 번호 -> 교체 전 모델 핸들
+        """
+        with self._lock:
+            handles = self._handles[kind]
+            previous = {}
+            for i in tiers:
+                previous[i] = handles[i]
+                handles[i] = new
+            self.tiers = self._build_tiers()
+            return previous
+
+    def in_use(self, kind: str, handle: ModelHandle) -> bool:
+        """handle을 쓰는 단계가 남아 있는지 여부"""
+        with self._lock:
+            return any(current is handle for current in self._handles[kind])
+
+    def register(self, session_id: str) -> ModelTier:
+        """
+        새 세션 등록 - 현재 사용 중인 가장 큰 모델 단계에서 시작
+
+        부하가 높아 모든 세션이 작은 모델로 내려가 있으면 새 세션도 그 단계에서
+        시작하여, 큰 모델로 시작했다가 곧바로 내려가는 일을 피한다.
+        """
+        with self._lock:
+            tier = min((load.tier for load in self._sessions.values()), default=0)
+            self._sessions[session_id] = _SessionLoad(tier, time.monotonic())
+            return self.tiers[tier]
+
+    def unregister(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def tier_of(self, session_id: str) -> ModelTier:
+        with self._lock:
+            load = self._sessions.get(session_id)
+            return self.tiers[load.tier if load else 0]
+
+    def observe(self, session_id: str, rtf: float, lag: float, now: Optional[float] = None) -> Optional[TierChange]:
+        """
+        윈도우 처리 결과 기록 후 단계 변경 여부 판단
+
+        Args:
+            session_id: 세션 ID
+            rtf: 윈도우 ASR 디코딩 시간 / 윈도우 오디오 길이
+            lag: 처리 시작 시 밀려 있던 오디오 길이 (초)
+            now: 현재 시각 (monotonic, 테스트용)
+
+        Returns:
+            TierChange: 단계가 바뀌었으면 변경 내역, 아니면 None
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic() if now is None else now
+        policy = self.policy
+
+        with self._lock:
+            load = self._sessions.get(session_id)
+            if load is None:
+                # unregister() 뒤에 늦게 끝난 윈도우 - 상태를 다시 만들지 않음
+                return None
+
+            alpha = policy.ewma_alpha
+            load.rtf = rtf if load.rtf is None else alpha * rtf + (1 - alpha) * load.rtf
+            load.lag = lag
+            tier_rtf = self._tier_rtf[load.tier]
+            self._tier_rtf[load.tier] = rtf if tier_rtf is None else alpha * rtf + (1 - alpha) * tier_rtf
+
+            overloaded = load.rtf > policy.downgrade_rtf or lag > policy.downgrade_lag
+            underloaded = load.rtf < policy.upgrade_rtf and lag < policy.upgrade_lag
+            load.over_count = load.over_count + 1 if overloaded else 0
+            if not underloaded:
+                load.under_since = None
+            elif load.under_since is None:
+                load.under_since = now
+
+            if now - load.last_change < policy.min_dwell:
+                return None
+
+            new_tier, reason = load.tier, None
+            if load.over_count >= policy.downgrade_after and load.tier < len(self.tiers) - 1:
+                new_tier = load.tier + 1
+                reason = 'lag' if lag > policy.downgrade_lag else 'rtf'
+            elif load.under_since is not None and now - load.under_since >= policy.upgrade_after and load.tier > 0:
+                new_tier, reason = load.tier - 1, 'recovered'
+            if reason is None:
+                return None
+
+            change = TierChange(session_id, self.tiers[load.tier], self.tiers[new_tier], reason,
+                                round(load.rtf, 3), round(lag, 3))
+            load.tier = new_tier
+            load.rtf = None  # 새 모델의 RTF로 다시 측정
+            load.over_count = 0
+            load.under_since = None
+            load.last_change = now
+            self._changes[(change.direction, reason)] += 1
+            return change
+
+    def metrics(self) -> Dict:
+        """단계별 세션 수, 단계별 RTF, 단계 변경 횟수"""
+        with self._lock:
+            sessions_per_tier = Counter(load.tier for load in self._sessions.values())
+            return {
+                'tiers': [
+                    dict(tier.to_dict(),
+                         sessions=sessions_per_tier.get(tier.index, 0),
+                         rtf=None if self._tier_rtf[tier.index] is None else round(self._tier_rtf[tier.index], 3))
+                    for tier in self.tiers
+                ],
+                'changes': [
+                    {'direction': direction, 'reason': reason, 'count': count}
+                    for (direction, reason), count in sorted(self._changes.items())
+                ],
+                'policy': asdict(self.policy),
+            }
@@ -0,0 +1,350 @@
+# pipeline.py - 세션별 순서를 보장하는 처리 단계 (ASR / 번역 단계 분리용)
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 작업 우선순위 (숫자가 작을수록 먼저 실행)
+FINAL = 0        # 확정 문장, 번역, 녹음 종료 처리 - 사용자가 결과를 기다리는 작업
+PARTIAL = 1      # 부분 인식 윈도우 - 늦어지면 다음 윈도우가 대신 처리하므로 버려도 되는 작업
+BACKGROUND = 2   # 타이머 확인 등 지연에 덜 민감한 작업
+PRIORITY_NAMES = {FINAL: 'final', PARTIAL: 'partial', BACKGROUND: 'background'}
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'key', 'priority', 'deadline', 'submitted')
+
+    def __init__(self, fn, args, key, priority, deadline, submitted):
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.priority = priority
+        self.deadline = deadline
+        self.submitted = submitted
+
+
+class _Strand:
+    """한 세션의 대기 작업 (한 번에 하나씩 실행)"""
+    __slots__ = ('jobs', 'scheduled', 'deficit')
+
+    def __init__(self, quantum):
+        self.jobs = deque()
+        self.scheduled = False  # 실행 대기열에 있거나 실행 중
+        self.deficit = quantum  # 실행할 수 있는 남은 시간 (초, 실행 후 실제 처리 시간만큼 차감)
+
+
+class _ClassStats:
+    """우선순위별 대기 시간 통계"""
+    __slots__ = ('submitted', 'completed', 'failed', 'expired', 'promoted', 'total_wait', 'max_wait', 'waits')
+
+    def __init__(self, window):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+        self.promoted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.waits = deque(maxlen=window)
+
+    def to_dict(self) -> Dict:
+        done = self.completed + self.failed
+        waits = sorted(self.waits)
+
+        def percentile(p):
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 1) if waits else 0.0
+
+        return {
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'expired': self.expired,
+            'promoted': self.promoted,
+            'avg_wait_ms': round(self.total_wait / done * 1000, 1) if done else 0.0,
+            'p50_wait_ms': percentile(0.5),
+            'p95_wait_ms': percentile(0.95),
+            'p99_wait_ms': percentile(0.99),
+            'max_wait_ms': round(self.max_wait * 1000, 1),
+        }
+
+
+class SessionStage:
+    """
+    크기가 제한된 대기열과 워커 스레드로 구성된 처리 단계
+
+    같은 세션의 작업은 제출한 순서대로 하나씩 실행되고, 다른 세션의 작업은
+    워커 수만큼 병렬로 실행된다. 워커가 비면 다음 세션을 아래 순서로 고른다.
+
+    1. 우선순위 - 맨 앞 작업의 우선순위가 높은 세션 먼저 (FINAL > PARTIAL > BACKGROUND).
+       기한이 없는 작업이 aging초 이상 기다리면 FINAL로 올려 굶지 않게 한다.
+    2. 공정성 - 같은 우선순위 안에서는 deficit round robin. 세션마다 차례가 올 때
+       quantum초씩 실행 시간을 받고 실제 처리 시간만큼 차감하므로, 긴 작업을 많이
+       보내는 세션은 그만큼 차례가 줄어든다.
+
+    기한(deadline)이 지난 작업은 실행하지 않고 버린다 (부분 인식처럼 늦으면 의미가 없는 작업).
+
+    대기 작업이 max_pending개에 도달하면 submit()은 기한이 지난 작업을 먼저 버리고,
+    그래도 가득 차 있으면 자리가 날 때까지 기다린다 (block=False이면 바로 False 반환).
+    앞 단계가 기다리는 동안 처리 속도가 자연스럽게 뒤 단계에 맞춰진다.
+
+    FINAL 작업은 max_pending을 넘어 final_reserve개까지 더 추가할 수 있다. 대기열이
+    부분 인식 윈도우로 가득 차도 녹음 종료 같은 확정 작업은 기다리지 않고 바로 들어가므로,
+    block=False로 추가해도 같은 세션의 작업 순서가 유지된다.
+    """
+
+    def __init__(self, name: str, workers: int = 1, max_pending: int = 64,
+                 quantum: float = 0.1, aging: float = 2.0, stats_window: int = 2048,
+                 final_reserve: int = 0):
+        self.name = name
+        self.max_pending = max_pending
+        self.final_reserve = final_reserve
+        self.quantum = quantum
+        self.aging = aging
+        self._strands: Dict[str, _Strand] = {}
+        self._ready = {priority: deque() for priority in PRIORITY_NAMES}
+        self._pending = 0
+        self._pending_keys = set()
+        self._running = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # 통계
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self.max_wait = 0.0
+        self._class_stats = {priority: _ClassStats(stats_window) for priority in PRIORITY_NAMES}
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{name}-stage-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session_id: str, fn: Callable, *args, key: Optional[str] = None,
+               priority: int = PARTIAL, deadline: Optional[float] = None,
+               block: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        세션 작업 추가
+
+        Args:
+            session_id: 세션 ID (같은 세션 작업끼리 순서 보장)
+            fn: 실행할 함수 - fn(*args)
+            key: 같은 세션에 같은 key의 작업이 아직 시작 전이면 추가하지 않음
+                 (세션 상태를 읽어 처리하는 작업은 하나만 대기하면 충분)
+            priority: FINAL, PARTIAL, BACKGROUND
+            deadline: 이 시각(time.monotonic())까지 시작하지 못하면 버림 (None = 버리지 않음)
+            block: 대기열이 가득 찼을 때 기다릴지 여부
+            timeout: 최대 대기 시간 (None = 무한)
+
+        Returns:
+            bool: 추가했으면 True
+        """
+        with self._cond:
+            if key is not None and (session_id, key) in self._pending_keys:
+                self.coalesced += 1
+                return False
+
+            capacity = self.max_pending + (self.final_reserve if priority == FINAL else 0)
+            wait_until = None if timeout is None else time.monotonic() + timeout
+            while self._pending >= capacity and not self._closed:
+                if self._drop_expired(time.monotonic()):
+                    continue
+                remaining = None if wait_until is None else wait_until - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    self.rejected += 1
+                    return False
+                self._cond.wait(remaining)
+            if self._closed:
+                return False
+
+            strand = self._strands.get(session_id)
+            if strand is None:
+                strand = self._strands[session_id] = _Strand(self.quantum)
+            job = _Job(fn, args, key, priority, deadline, time.monotonic())
+            strand.jobs.append(job)
+            self._pending += 1
+            self._class_stats[priority].submitted += 1
+            if key is not None:
+                self._pending_keys.add((session_id, key))
+            if not strand.scheduled:
+                strand.scheduled = True
+                self._ready[priority].append(session_id)
+            self._cond.notify_all()
+            return True
+
+    def drop_session(self, session_id: str) -> int:
+        """세션의 시작 전 작업 버림 (실행 중인 작업은 끝까지 실행) - 버린 작업 수 반환"""
+        with self._cond:
+            strand = self._strands.get(session_id)
+            if strand is None:
+                return 0
+            dropped = len(strand.jobs)
+            for job in strand.jobs:
+                self._forget(session_id, job)
+            strand.jobs.clear()
+            self._cond.notify_all()
+            return dropped
+
+    def _forget(self, session_id, job):
+        """대기 작업 하나를 대기열 집계에서 제거 (lock 안에서 호출)"""
+        self._pending -= 1
+        if job.key is not None:
+            self._pending_keys.discard((session_id, job.key))
+
+    def _drop_expired(self, now) -> int:
+        """기한이 지난 대기 작업 모두 버림 (lock 안에서 호출) - 버린 작업 수 반환"""
+        dropped = 0
+        for session_id, strand in self._strands.items():
+            expired = [job for job in strand.jobs if job.deadline is not None and job.deadline < now]
+            for job in expired:
+                strand.jobs.remove(job)
+                self._forget(session_id, job)
+                self._class_stats[job.priority].expired += 1
+            dropped += len(expired)
+        if dropped:
+            self._cond.notify_all()
+        return dropped
+
+    def _promote_waiting(self, now):
+        """기한 없이 aging초 이상 기다린 세션을 FINAL 대기열로 이동 (lock 안에서 호출)"""
+        for priority, queue in self._ready.items():
+            if priority == FINAL or not queue:
+                continue
+            for session_id in list(queue):
+                jobs = self._strands[session_id].jobs
+                if jobs and jobs[0].deadline is None and now - jobs[0].submitted >= self.aging:
+                    queue.remove(session_id)
+                    self._ready[FINAL].append(session_id)
+                    self._class_stats[jobs[0].priority].promoted += 1
+
+    def _pick(self, queue: deque) -> str:
+        """deficit round robin - 남은 실행 시간이 있는 첫 세션 (lock 안에서 호출)"""
+        while True:
+            for i, session_id in enumerate(queue):
+                if self._strands[session_id].deficit > 0:
+                    del queue[i]
+                    return session_id
+            # 모두 실행 시간을 다 썼으면 한 세션이라도 실행할 수 있을 만큼 차례를 돌림
+            rounds = min(math.floor(-self._strands[session_id].deficit / self.quantum) + 1 for session_id in queue)
+            for session_id in queue:
+                self._strands[session_id].deficit += rounds * self.quantum
+
+    def _next_job(self):
+        """다음에 실행할 (세션 ID, 세션, 작업) - 없으면 None (lock 안에서 호출)"""
+        now = time.monotonic()
+        self._promote_waiting(now)
+        priority = FINAL
+        while priority in self._ready:
+            queue = self._ready[priority]
+            if not queue:
+                priority += 1
+                continue
+            session_id = self._pick(queue)
+            strand = self._strands[session_id]
+            while strand.jobs and strand.jobs[0].deadline is not None and strand.jobs[0].deadline < now:
+                job = strand.jobs.popleft()
+                self._forget(session_id, job)
+                self._class_stats[job.priority].expired += 1
+                self._cond.notify_all()
+            if not strand.jobs:
+                # drop_session()으로 비워졌거나 남은 작업이 모두 기한을 넘긴 세션
+                strand.scheduled = False
+                del self._strands[session_id]
+                continue
+            if strand.jobs[0].priority != priority and priority != FINAL:
+                # 앞 작업을 버려 우선순위가 바뀐 세션은 해당 대기열로 옮기고 처음부터 다시 선택
+                self._ready[strand.jobs[0].priority].append(session_id)
+                priority = FINAL
+                continue
+            return session_id, strand, strand.jobs.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    picked = self._next_job()
+                    if picked is not None or self._closed:
+                        break
+                    self._cond.wait()
+                if picked is None:
+                    return
+                session_id, strand, job = picked
+                self._forget(session_id, job)
+                self._running += 1
+                self._cond.notify_all()
+
+            started = time.monotonic()
+            failed = False
+            try:
+                job.fn(*job.args)
+            except Exception as e:
+                failed = True
+                logger.exception("Error in %s stage job: %s", self.name, e, extra={'session_id': session_id})
+            finished = time.monotonic()
+
+            with self._cond:
+                self._running -= 1
+                wait = started - job.submitted
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.total_run += finished - started
+                stats = self._class_stats[job.priority]
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+                stats.waits.append(wait)
+                if failed:
+                    self.failed += 1
+                    stats.failed += 1
+                else:
+                    self.completed += 1
+                    stats.completed += 1
+
+                # 실제 처리 시간만큼 세션의 실행 시간 차감
+                strand.deficit -= finished - started
+                if strand.jobs:
+                    self._ready[strand.jobs[0].priority].append(session_id)
+                    self._cond.notify_all()
+                else:
+                    strand.scheduled = False
+                    if self._strands.get(session_id) is strand:
+                        del self._strands[session_id]
+
+    def stats(self) -> Dict:
+        with self._cond:
+            done = self.completed + self.failed
+            return {
+                'name': self.name,
+                'workers': len(self._threads),
+                'running': self._running,
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'final_reserve': self.final_reserve,
+                'active_sessions': len(self._strands),
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'coalesced': self.coalesced,
+                'avg_wait_ms': round(self.total_wait / done * 1000, 1) if done else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 1),
+                'avg_run_ms': round(self.total_run / done * 1000, 1) if done else 0.0,
+                'classes': {name: self._class_stats[priority].to_dict() for priority, name in PRIORITY_NAMES.items()},
+            }
+
+    def close(self, timeout: float = 5.0):
+        """새 작업을 받지 않고, 남은 작업을 처리한 뒤 워커 종료"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
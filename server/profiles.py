@@ -0,0 +1,262 @@
+# profiles.py - 세션별 지연/정확도 프로파일
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from typing import Dict, Optional
+
+from asr_engine import TranscribeOptions
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+HOP_LENGTH = 160  # Whisper log-mel 프레임 간격
+
+DEFAULT_PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.json")
+DEFAULT_PROFILE_NAME = "balanced"
+
+
+@dataclass(frozen=True)
+class ASRSettings:
+    """Whisper 디코딩 설정"""
+    beam_size: int = 5                  # 확정 문장 디코딩 빔 크기
+    two_pass: bool = True               # 부분 인식은 빠르게, 확정 문장만 빔 서치로 재인식
+    partial_beam_size: int = 1          # 2단계 디코딩 시 부분 인식 빔 크기 (1 = greedy)
+    stream_segments: bool = True        # 윈도우 전체를 기다리지 않고 세그먼트마다 문장 처리에 전달
+    no_speech_threshold: float = 0.6
+    compression_ratio_threshold: float = 2.4
+    vad_filter: bool = True
+    vad_min_silence_duration_ms: int = 500
+    vad_speech_pad_ms: int = 300
+    vad_threshold: float = 0.5
+
+    def transcribe_options(self, language=None, vad_filter=None, partial=False) -> TranscribeOptions:
+        """
+        프로파일 값으로 디코딩 옵션 생성
+
+        Args:
+            language: Whisper 언어 코드 (None = 자동 감지)
+            vad_filter: VAD 사용 여부 (None = 프로파일 값)
+            partial: 부분 인식용 옵션 여부 (2단계 디코딩이면 partial_beam_size 사용)
+        """
+        return TranscribeOptions(
+            beam_size=self.partial_beam_size if partial and self.two_pass else self.beam_size,
+            no_speech_threshold=self.no_speech_threshold,
+            compression_ratio_threshold=self.compression_ratio_threshold,
+            condition_on_previous_text=False,  # 이전 텍스트 참조하지 않음
+            initial_prompt=None,  # 초기 프롬프트 없음
+            language=language,
+            task="transcribe",
+            vad_filter=self.vad_filter if vad_filter is None else vad_filter,
+            vad_parameters={
+                "min_silence_duration_ms": self.vad_min_silence_duration_ms,
+                "speech_pad_ms": self.vad_speech_pad_ms,
+                "threshold": self.vad_threshold
+            }
+        )
+
+
+@dataclass(frozen=True)
+class WindowSettings:
+    """오디오 윈도우 설정"""
+    window_seconds: float = 5.0         # 한 번에 인식할 오디오 길이
+    consume_ratio: float = 2 / 3        # 처리 후 버퍼에서 제거할 비율 (나머지는 다음 윈도우와 겹침)
+    min_interval: float = 2.0           # 최소 처리 간격 (초)
+    min_buffer_seconds: float = 2.0     # 처리에 필요한 최소 오디오 길이
+    max_buffer_age: float = 10.0        # 최대 버퍼 유지 시간 (초)
+    partial_deadline: float = 3.0       # 이 시간(초) 안에 시작하지 못한 부분 인식 작업은 버림
+
+    @property
+    def window_samples(self) -> int:
+        return int(SAMPLE_RATE * self.window_seconds)
+
+    @property
+    def consume_samples(self) -> int:
+        # 특징 프레임 간격(160 샘플)의 배수로 맞춰 다음 윈도우가 같은 프레임 격자에서 시작하도록 함
+        return int(self.window_samples * self.consume_ratio) // HOP_LENGTH * HOP_LENGTH
+
+    @property
+    def min_buffer_samples(self) -> int:
+        return int(SAMPLE_RATE * self.min_buffer_seconds)
+
+
+@dataclass(frozen=True)
+class SegmentationSettings:
+    """문장 분리 및 무음 타임아웃 설정"""
+    min_sentence_tokens: int = 5         # 종결 부호로 끝낼 최소 단어 수
+    clause_tokens: int = 12              # 쉼표/콜론으로 끝낼 최소 단어 수
+    max_tokens: int = 20                 # 부호 없이 끝낼 단어 수
+    min_silence_for_processing: float = 2.5  # 이 시간 이상 무음이면 문장 처리
+    timer_interval: float = 2.0          # 세션 타이머 확인 주기
+    timer_min_silence: float = 4.0       # 타이머가 문장을 처리하기 위한 최소 무음 시간
+    timer_idle_timeout: float = 5.0      # 문장이 갱신되지 않은 시간
+    partial_update_throttle: float = 0.2  # 부분 인식 결과 전송 최소 간격
+
+
+@dataclass(frozen=True)
+class MTSettings:
+    """번역 설정 (None이면 모델 기본값 사용)"""
+    num_beams: Optional[int] = None
+    max_length: Optional[int] = None
+
+    def generate_kwargs(self) -> Dict:
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+
+@dataclass(frozen=True)
+class Profile:
+    """ASR, 윈도우, 문장 분리, 번역 설정 묶음"""
+    name: str
+    description: str = ""
+    asr: ASRSettings = field(default_factory=ASRSettings)
+    window: WindowSettings = field(default_factory=WindowSettings)
+    segmentation: SegmentationSettings = field(default_factory=SegmentationSettings)
+    mt: MTSettings = field(default_factory=MTSettings)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+_SECTIONS = {
+    'asr': ASRSettings,
+    'window': WindowSettings,
+    'segmentation': SegmentationSettings,
+    'mt': MTSettings,
+}
+
+
+def _build_section(section_cls, values: Dict, profile_name: str, section: str):
+    known = {f.name for f in fields(section_cls)}
+    unknown = set(values) - known
+    if unknown:
+        raise ValueError(f"Unknown {section} setting(s) in profile '{profile_name}': {', '.join(sorted(unknown))}")
+    return section_cls(**values)
+
+
+def build_profile(name: str, data: Dict) -> Profile:
+    """
+    딕셔너리로부터 프로파일 생성 (지정하지 않은 값은 기본값)
+
+    Args:
+        name: 프로파일 이름
+        data: {'description': ..., 'asr': {...}, 'window': {...}, ...}
+
+    Returns:
+        Profile: 생성된 프로파일
+    """
+    unknown = set(data) - set(_SECTIONS) - {'description', 'extends'}
+    if unknown:
+        raise ValueError(f"Unknown section(s) in profile '{name}': {', '.join(sorted(unknown))}")
+
+    sections = {
+        section: _build_section(section_cls, data.get(section, {}), name, section)
+        for section, section_cls in _SECTIONS.items()
+    }
+    return Profile(name=name, description=data.get('description', ""), **sections)
+
+
+def _resolve_extends(raw: Dict[str, Dict]) -> Dict[str, Dict]:
+    """'extends'로 지정한 상위 프로파일 값을 병합"""
+    resolved = {}
+
+    def resolve(name, chain=()):
+        if name in resolved:
+            return resolved[name]
+        if name in chain:
+            raise ValueError(f"Circular profile inheritance: {' -> '.join(chain + (name,))}")
+        if name not in raw:
+            raise ValueError(f"Unknown base profile '{name}'")
+
+        data = copy.deepcopy(raw[name])
+        base_name = data.pop('extends', None)
+        if base_name:
+            merged = copy.deepcopy(resolve(base_name, chain + (name,)))
+            merged.pop('description', None)
+            for key, value in data.items():
+                if isinstance(value, dict):
+                    merged.setdefault(key, {}).update(value)
+                else:
+                    merged[key] = value
+            data = merged
+        resolved[name] = data
+        return data
+
+    for name in raw:
+        resolve(name)
+    return resolved
+
+
+class ProfileStore:
+    """
+    프로파일 설정 파일 관리
+
+    파일 수정 시각을 check_interval마다 확인하여 바뀌었으면 다시 읽는다.
+    잘못된 파일은 무시하고 이전 프로파일을 계속 사용한다.
+    """
+
+    def __init__(self, path: Optional[str] = None, default_name: str = DEFAULT_PROFILE_NAME,
+                 check_interval: float = 1.0):
+        self.path = path or DEFAULT_PROFILES_PATH
+        self.default_name = default_name
+        self.check_interval = check_interval
+        self.profiles: Dict[str, Profile] = {default_name: Profile(name=default_name)}
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> bool:
+        """설정 파일 다시 읽기 - 성공 여부 반환"""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                with open(self.path, encoding='utf-8') as f:
+                    raw = json.load(f)
+
+                resolved = _resolve_extends(raw.get('profiles', raw))
+                profiles = {name: build_profile(name, data) for name, data in resolved.items()}
+                if self.default_name not in profiles:
+                    profiles[self.default_name] = Profile(name=self.default_name)
+            except FileNotFoundError:
+                logger.warning("Profile file not found: %s, using built-in defaults", self.path)
+                self._mtime = None
+                return False
+            except (OSError, ValueError, TypeError) as e:
+                logger.error("Invalid profile file %s, keeping previous profiles: %s", self.path, e)
+                self._mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+                return False
+
+            self.profiles = profiles
+            self._mtime = mtime
+            logger.info("Profiles loaded: %s", ", ".join(sorted(profiles)))
+            return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def get(self, name: Optional[str] = None) -> Profile:
+        """이름으로 프로파일 조회 (없으면 기본 프로파일)"""
+        self._maybe_reload()
+        profiles = self.profiles
+        return profiles.get(name or self.default_name) or profiles[self.default_name]
+
+    def exists(self, name: str) -> bool:
+        self._maybe_reload()
+        return name in self.profiles
+
+    def names(self):
+        self._maybe_reload()
+        return sorted(self.profiles)
@@ -0,0 +1,257 @@
+# segmenter.py - 증분식 문장 분리기 (문자 체계 인식)
+
+from typing import List, Optional, Tuple
+
+# 문장 종결 부호 (라틴, CJK 전각, 아랍어, 데바나가리 등)
+TERMINAL_PUNCTUATION = frozenset('.!?…‼⁇⁈⁉。！？｡؟۔।॥')
+# 절 구분 부호 - 긴 문장에서만 경계로 사용
+CLAUSE_PUNCTUATION = frozenset(',:;，、：；،؛')
+# 종결 부호 뒤에 붙을 수 있는 닫는 문자
+CLOSING_CHARACTERS = frozenset('"\'”’»」』）)]】》〉')
+
+# 문장 끝에 오면 문장이 이어질 가능성이 높은 접속사 (한국어, 영어)
+CONJUNCTIONS = frozenset({
+    '그리고', '또한', '하지만', '그러나', '또는', '혹은', '왜냐하면', '때문에', '만약', '비록',
+    'and', 'or', 'but', 'because', 'while', 'if', 'unless', 'although', 'since', 'when', 'as',
+})
+
+# 공백 없이 쓰는 문자 체계 - 문자 수를 단어 수로 환산하는 비율
+CHARS_PER_WORD = {
+    'han': 1.5,   # 중국어 한자 (일본어 한자 포함)
+    'kana': 2.5,  # 일본어 가나
+    'thai': 4.0,  # 태국어
+}
+
+
+def char_script(ch: str) -> Optional[str]:
+    """공백 없는 문자 체계에 속하면 그 이름을, 아니면 None 반환"""
+    code = ord(ch)
+    if code < 0x0E00:
+        return None
+    if code <= 0x0E7F:
+        return 'thai'
+    if 0x3040 <= code <= 0x30FF or 0x31F0 <= code <= 0x31FF or 0xFF66 <= code <= 0xFF9F:
+        return 'kana'
+    if (0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF
+            or 0xF900 <= code <= 0xFAFF or 0x20000 <= code <= 0x2FA1F):
+        return 'han'
+    return None
+
+
+def count_tokens(text: str) -> float:
+    """
+    문자 체계를 고려한 단어 수 계산
+
+    공백으로 구분되는 언어는 단어 수, 한자/가나/태국어는 문자 수를
+    CHARS_PER_WORD 비율로 환산한 값을 더한다.
+
+    Args:
+        text: 계산할 텍스트
+
+    Returns:
+        float: 단어 수 환산 값
+    """
+    tokens = 0.0
+    in_word = False
+    for ch in text:
+        if ch.isspace():
+            in_word = False
+            continue
+        script = char_script(ch)
+        if script is not None:
+            tokens += 1.0 / CHARS_PER_WORD[script]
+            in_word = False
+        elif ch in TERMINAL_PUNCTUATION or ch in CLAUSE_PUNCTUATION or ch in CLOSING_CHARACTERS:
+            continue
+        elif not in_word:
+            tokens += 1.0
+            in_word = True
+    return tokens
+
+
+class SentenceSegmenter:
+    """
+    세션별 증분식 문장 분리기
+
+    feed()에 현재 문장 텍스트 전체를 넘기면 이전 호출 이후 새로 추가된
+    부분만 검사한다. 앞부분이 바뀐 경우(병합 등)에는 바뀐 위치가 속한
+    문장의 시작점부터 다시 검사한다. 확정된 문장은 (시작, 끝) 구간으로
+    반환되며 consume()으로 제거한다.
+    """
+
+    def __init__(self, min_sentence_tokens=5, clause_tokens=12, max_tokens=20):
+        self.min_sentence_tokens = min_sentence_tokens  # 종결 부호로 끝낼 최소 단어 수
+        self.clause_tokens = clause_tokens              # 쉼표/콜론으로 끝낼 최소 단어 수
+        self.max_tokens = max_tokens                    # 부호 없이 끝낼 단어 수
+        self.reset()
+
+    def reset(self):
+        self.text = ""
+        self.closed_spans: List[Tuple[int, int]] = []
+        self._reset_sentence(0)
+
+    def _reset_sentence(self, start: int):
+        """start 위치에서 새 문장 검사 시작"""
+        self._pos = start
+        self._sentence_start = start
+        self._tokens = 0.0
+        self._in_word = False
+        self._last_word_start = start
+        self._terminal_end = None  # 종결 부호가 끝난 위치 (다음 문자를 봐야 확정)
+        self._clause_end = None    # 마지막 절 구분 위치
+        self._clause_tokens = 0.0  # 마지막 절 구분까지의 단어 수
+
+    def _close(self, end: int):
+        """문장 확정 후 다음 문장 시작점으로 이동"""
+        self.closed_spans.append((self._sentence_start, end))
+        while end < len(self.text) and self.text[end].isspace():
+            end += 1
+        self._reset_sentence(end)
+
+    def _rewind(self, position: int):
+        """position 이전에 확정된 문장까지만 남기고 되감기"""
+        while self.closed_spans and self.closed_spans[-1][1] > position:
+            self.closed_spans.pop()
+        start = self.closed_spans[-1][1] if self.closed_spans else 0
+        while start < position and self.text[start].isspace():
+            start += 1
+        self._reset_sentence(min(start, position))
+
+    def _divergence(self, text: str) -> int:
+        """기존 텍스트와 새 텍스트의 공통 접두사 길이 (이진 탐색)"""
+        low, high = 0, min(len(self.text), len(text))
+        while low < high:
+            mid = (low + high + 1) // 2
+            if text.startswith(self.text[:mid]):
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    def feed(self, text: str) -> List[Tuple[int, int]]:
+        """
+        현재 텍스트로 상태 갱신
+
+        Args:
+            text: 현재 문장 텍스트 전체 (소비된 문장 제외)
+
+        Returns:
+            list: 확정된 문장의 (시작, 끝) 구간 목록
+        """
+        if not text.startswith(self.text):
+            divergence = self._divergence(text)
+            self.text = text
+            self._rewind(divergence)
+        else:
+            self.text = text
+
+        self._scan()
+        return list(self.closed_spans)
+
+    def _scan(self):
+        text = self.text
+        while self._pos < len(text):
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if self._terminal_end is not None:
+                if ch in TERMINAL_PUNCTUATION or ch in CLOSING_CHARACTERS:
+                    # "?!", "...", '."' 처럼 이어지는 부호
+                    self._terminal_end = i + 1
+                    continue
+                if ch.isspace() or char_script(ch) is not None or ch.isupper():
+                    self._close(self._terminal_end)
+                    continue
+                # "3.5" 같은 소수점이나 약어 - 종결로 보지 않음
+                self._terminal_end = None
+
+            if ch.isspace():
+                if i > 0 and char_script(text[i - 1]) == 'thai':
+                    # 태국어는 공백이 절 구분 역할
+                    self._clause_end = i
+                    self._clause_tokens = self._tokens
+                self._in_word = False
+                continue
+
+            if ch in TERMINAL_PUNCTUATION:
+                if self._tokens >= self.min_sentence_tokens:
+                    self._terminal_end = i + 1
+                continue
+
+            if ch in CLAUSE_PUNCTUATION:
+                self._clause_end = i + 1
+                self._clause_tokens = self._tokens
+                self._in_word = False
+                continue
+
+            script = char_script(ch)
+            if script is not None:
+                self._tokens += 1.0 / CHARS_PER_WORD[script]
+                self._in_word = False
+            elif ch in CLOSING_CHARACTERS:
+                continue
+            elif not self._in_word:
+                self._tokens += 1.0
+                self._in_word = True
+                self._last_word_start = i
+
+            # 부호 없이 매우 길어진 문장은 마지막 절 구분에서 자름
+            if (self._tokens > self.max_tokens * 2 and self._clause_end is not None
+                    and self._clause_tokens >= self.clause_tokens):
+                self._close(self._clause_end)
+
+    def consume(self, end: int) -> str:
+        """
+        end 위치까지의 확정 문장을 제거하고 남은 텍스트 반환
+
+        Args:
+            end: 제거할 위치 (보통 마지막 확정 구간의 끝)
+
+        Returns:
+            str: 남은 (미확정) 텍스트
+        """
+        while end < len(self.text) and self.text[end].isspace():
+            end += 1
+
+        shift = end
+        self.text = self.text[shift:]
+        self.closed_spans = [(s - shift, e - shift) for s, e in self.closed_spans if e > shift]
+        self._pos = max(0, self._pos - shift)
+        self._sentence_start = max(0, self._sentence_start - shift)
+        self._last_word_start = max(0, self._last_word_start - shift)
+        if self._terminal_end is not None:
+            self._terminal_end -= shift
+        if self._clause_end is not None:
+            self._clause_end = self._clause_end - shift if self._clause_end > shift else None
+        return self.text
+
+    @property
+    def open_tokens(self) -> float:
+        """확정되지 않은 마지막 문장의 단어 수"""
+        return self._tokens
+
+    def is_sentence_end(self) -> bool:
+        """
+        미확정 문장이 문장의 끝으로 볼 수 있는 상태인지 판단
+
+        1. 충분히 긴 문장이 종결 부호로 끝남
+        2. 쉼표나 콜론으로 끝나고 단어 수가 clause_tokens 초과
+        3. 단어 수가 max_tokens 초과이고 접속사로 끝나지 않음
+        """
+        tail = self.text[self._sentence_start:].rstrip()
+        if not tail:
+            return False
+
+        if self._terminal_end is not None and self._terminal_end >= len(tail) + self._sentence_start:
+            return True
+
+        if tail[-1] in CLAUSE_PUNCTUATION and self._tokens > self.clause_tokens:
+            return True
+
+        if self._tokens > self.max_tokens:
+            last_word = self.text[self._last_word_start:].split()
+            if not last_word or last_word[0].lower() not in CONJUNCTIONS:
+                return True
+
+        return False
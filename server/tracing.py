@@ -0,0 +1,209 @@
+# tracing.py - 세션별 단계 타임라인 추적 (Chrome/Perfetto trace 형식)
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional
+
+
+class _NullSpan:
+    """추적이 꺼져 있을 때 사용하는 빈 span"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """
+    추적 비활성화 시 사용 - 모든 메서드가 아무 일도 하지 않는다
+
+    호출 측은 enabled를 확인하지 않고 그대로 호출해도 비용이 거의 없다.
+    """
+    enabled = False
+
+    def now(self) -> int:
+        return 0
+
+    def span(self, name, **args):
+        return NULL_SPAN
+
+    def complete(self, name, start, **args):
+        pass
+
+    def instant(self, name, **args):
+        pass
+
+    def async_begin(self, name, async_id, **args):
+        pass
+
+    def async_end(self, name, async_id, **args):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.complete(self.name, self.start, **self.args)
+        return False
+
+    def set(self, **args):
+        """span 종료 전 인자 추가 (결과 크기 등)"""
+        self.args.update(args)
+
+
+class SessionTracer:
+    """
+    세션 하나의 단계별 span 기록
+
+    이벤트는 Chrome trace event 형식(ph: X/i/b/e)으로 보관하며, 최대
+    max_events개를 넘으면 오래된 이벤트부터 버린다.
+    """
+    enabled = True
+
+    def __init__(self, session_id: str, max_events: int = 50000):
+        self.session_id = session_id
+        self.origin_ns = time.perf_counter_ns()
+        self.origin_wall = time.time()
+        self.events = deque(maxlen=max_events)
+        self.thread_names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _tid(self) -> int:
+        thread = threading.current_thread()
+        tid = thread.ident or 0
+        if tid not in self.thread_names:
+            self.thread_names[tid] = thread.name
+        return tid
+
+    def _us(self, ns: int) -> float:
+        return (ns - self.origin_ns) / 1000.0
+
+    def now(self) -> int:
+        """complete()에 넘길 시작 시각"""
+        return time.perf_counter_ns()
+
+    def span(self, name, **args):
+        """with 문으로 사용하는 span"""
+        return _Span(self, name, args)
+
+    def complete(self, name, start, **args):
+        """now()로 얻은 시작 시각부터 현재까지의 span 기록"""
+        end = time.perf_counter_ns()
+        event = {'name': name, 'ph': 'X', 'ts': self._us(start), 'dur': (end - start) / 1000.0,
+                 'pid': 1, 'tid': self._tid(), 'args': args}
+        with self._lock:
+            self.events.append(event)
+
+    def instant(self, name, **args):
+        event = {'name': name, 'ph': 'i', 's': 't', 'ts': self._us(time.perf_counter_ns()),
+                 'pid': 1, 'tid': self._tid(), 'args': args}
+        with self._lock:
+            self.events.append(event)
+
+    def async_begin(self, name, async_id, **args):
+        """스레드를 넘나드는 흐름(문장 등)의 시작"""
+        event = {'name': name, 'cat': name, 'ph': 'b', 'id': str(async_id),
+                 'ts': self._us(time.perf_counter_ns()), 'pid': 1, 'tid': self._tid(), 'args': args}
+        with self._lock:
+            self.events.append(event)
+
+    def async_end(self, name, async_id, **args):
+        event = {'name': name, 'cat': name, 'ph': 'e', 'id': str(async_id),
+                 'ts': self._us(time.perf_counter_ns()), 'pid': 1, 'tid': self._tid(), 'args': args}
+        with self._lock:
+            self.events.append(event)
+
+    def export(self) -> dict:
+        """Chrome/Perfetto에서 열 수 있는 trace JSON 객체"""
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': 1, 'args': {'name': f'session {self.session_id}'}}]
+        metadata.extend(
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+            for tid, name in thread_names.items()
+        )
+        return {
+            'traceEvents': metadata + events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'session_id': self.session_id,
+                'started_at': self.origin_wall,
+                'pid': os.getpid(),
+            }
+        }
+
+
+class TraceRegistry:
+    """세션 ID -> 추적기 관리 (종료된 세션의 추적도 일정 개수 보관)"""
+
+    def __init__(self, default_enabled: bool = False, keep_finished: int = 50, max_events: int = 50000):
+        self.default_enabled = default_enabled
+        self.keep_finished = keep_finished
+        self.max_events = max_events
+        self.active: Dict[str, SessionTracer] = {}
+        self.finished = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tracer_for_new_session(self, session_id: str):
+        """새 세션의 추적기 - 기본 설정이 꺼져 있으면 NULL_TRACER"""
+        return self.enable(session_id) if self.default_enabled else NULL_TRACER
+
+    def enable(self, session_id: str) -> SessionTracer:
+        with self._lock:
+            tracer = self.active.get(session_id)
+            if tracer is None:
+                tracer = SessionTracer(session_id, max_events=self.max_events)
+                self.active[session_id] = tracer
+            return tracer
+
+    def disable(self, session_id: str):
+        self.finish(session_id)
+        return NULL_TRACER
+
+    def finish(self, session_id: str):
+        """세션 종료 - 추적 내용은 조회할 수 있도록 보관"""
+        with self._lock:
+            tracer = self.active.pop(session_id, None)
+            if tracer is None:
+                return
+            self.finished[session_id] = tracer
+            while len(self.finished) > self.keep_finished:
+                self.finished.popitem(last=False)
+
+    def export(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            tracer = self.active.get(session_id) or self.finished.get(session_id)
+        return tracer.export() if tracer else None
+
+    def session_ids(self):
+        with self._lock:
+            return {'active': list(self.active), 'finished': list(self.finished)}
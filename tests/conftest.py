@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 서버 모듈은 server/ 안에서 최상위 모듈로 import됨 (python server/app.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'server'))
@@ -0,0 +1,66 @@
+import os
+import threading
+
+import pytest
+
+for module in ('numpy', 'torch', 'transformers', 'dotenv', 'flask_socketio'):
+    pytest.importorskip(module)
+
+# 모델 가중치 없이 서버 모듈을 불러옴 (대본 기반 가짜 ASR, 원문을 그대로 돌려주는 번역)
+os.environ['ASR_ENGINE'] = 'fake'
+os.environ['MT_ENGINE'] = 'echo'
+os.environ['MT_DEVICE'] = 'cpu'
+os.environ.setdefault('LOG_FILE', os.devnull)
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def closed_session():
+    """열었다가 바로 닫은 세션 ID - 닫히기 전에 대기열에 있던 작업이 늦게 실행되는 상황"""
+    session_id = 'closed-session'
+    app.session_manager.create_session(session_id)
+    app.close_session(session_id)
+    yield session_id
+    app.close_session(session_id)
+
+
+def assert_not_revived(session_id):
+    assert session_id not in app.session_manager.sessions
+    assert session_id not in app.session_manager.timers
+    assert session_id not in app.model_cascade._sessions
+
+
+def test_late_stage_jobs_do_not_revive_closed_session(closed_session):
+    assert app.handle_text_segmentation(closed_session, "this sentence arrived after the client left") is False
+    assert app.append_segment_text(closed_session, "and so did this one") is False
+    app.finish_window_segmentation(closed_session, "this sentence arrived after the client left")
+    app.commit_sentence(closed_session, "this sentence arrived after the client left.")
+    app.process_audio_buffer(closed_session)
+    assert app.stream_segments(closed_session, iter(()), 1, 0) == ("", 0.0)
+    assert_not_revived(closed_session)
+
+
+def test_queued_commit_after_close_is_ignored(closed_session):
+    done = threading.Event()
+    assert app.asr_stage.submit(closed_session, app.commit_sentence, closed_session, "queued before the disconnect.",
+                                priority=app.FINAL)
+    assert app.asr_stage.submit(closed_session, done.set, priority=app.FINAL)
+    assert done.wait(5.0)
+    assert_not_revived(closed_session)
+
+
+def test_traced_stage_jobs_record_queue_wait():
+    session_id = 'traced-session'
+    session = app.session_manager.create_session(session_id)
+    session['tracer'] = tracer = app.trace_registry.enable(session_id)
+    try:
+        done = threading.Event()
+        assert app.submit_job(app.mt_stage, session_id, done.set, priority=app.FINAL)
+        assert done.wait(5.0)
+        waits = [event for event in tracer.events if event['name'] == 'queue_wait']
+        assert len(waits) == 1
+        assert waits[0]['args'] == {'stage': 'mt', 'job': 'set', 'priority': 'final'}
+        assert waits[0]['dur'] >= 0
+    finally:
+        app.close_session(session_id)
@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+
+import pytest
+
+from cluster import ClusterNode, FileRegistry, NodeInfo
+
+
+class Recorder:
+    """dispatch로 받은 이벤트 기록"""
+
+    def __init__(self):
+        self.events = []
+        self._cond = threading.Condition()
+
+    def __call__(self, session_id, event, args):
+        with self._cond:
+            self.events.append((session_id, event, args))
+            self._cond.notify_all()
+
+    def wait_for(self, predicate, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not any(predicate(*event) for event in self.events):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return FileRegistry(str(tmp_path), poll_interval=0.01)
+
+
+@pytest.fixture
+def make_node(registry):
+    nodes = []
+
+    def make(node_id, owned=list, capacity=4):
+        recorder = Recorder()
+        # heartbeat는 테스트에서 직접 호출 (백그라운드 주기는 길게)
+        node = ClusterNode(registry, node_id, capacity, dispatch=recorder, load=lambda: 0, owned=owned,
+                           heartbeat_interval=3600, node_ttl=0.3)
+        nodes.append(node)
+        return node, recorder
+
+    yield make
+    for node in nodes:
+        node.stop()
+
+
+def kill(registry, node_id):
+    """heartbeat가 곧 만료되는 노드 등록 (장애 노드 흉내)"""
+    registry.heartbeat(NodeInfo(node_id, 4), ttl=0.05)
+
+
+def expire(*nodes):
+    time.sleep(0.1)
+    for node in nodes:
+        node._heartbeat()
+
+
+def test_claim_is_compare_and_set(registry):
+    assert registry.claim('s1', 'a')
+    assert not registry.claim('s1', 'b')
+    assert not registry.claim('s1', 'b', expected='c')
+    assert registry.claim('s1', 'b', expected='a')
+    assert registry.owner('s1') == 'b'
+
+    registry.release('s1', 'a')
+    assert registry.owner('s1') == 'b'
+    registry.release('s1', 'b')
+    assert registry.owner('s1') is None
+
+
+def test_reads_do_not_rewrite_state(registry):
+    assert registry.claim('s1', 'a')
+    before = os.stat(registry._state_path)
+
+    assert registry.owner('s1') == 'a'
+    assert registry.sessions_of('a') == ['s1']
+    assert registry.nodes() == []
+    # 바뀐 것이 없는 갱신도 파일을 다시 쓰지 않음
+    assert not registry.claim('s1', 'b')
+    registry.release('s1', 'b')
+    assert os.stat(registry._state_path).st_ino == before.st_ino
+
+    assert registry.claim('s1', 'b', expected='a')
+    assert os.stat(registry._state_path).st_ino != before.st_ino
+    assert not [name for name in os.listdir(registry.path) if name.endswith('.tmp')]
+
+
+def test_place_records_owner_and_gateway(registry, make_node):
+    node, _ = make_node('a')
+    owner = node.place('s1')
+
+    assert owner == 'a'
+    assert registry.owner('s1') == 'a'
+    assert registry.sessions_via('a') == ['s1']
+    assert node.connected('s1')
+
+
+def test_failover_restores_session_on_live_node(registry, make_node):
+    node, recorder = make_node('a')
+    kill(registry, 'dead')
+    registry.claim('s1', 'dead')
+    registry.set_gateway('s1', 'a')
+    registry.save_journal('s1', {'profile': 'realtime'})
+    registry.send('dead', '{"session_id": "s1", "event": "audio_chunk", "args": []}')
+
+    expire(node)
+    node._recover_failed_nodes()
+
+    assert registry.owner('s1') == 'a'
+    assert recorder.wait_for(lambda sid, event, args: event == ClusterNode.RESTORE_EVENT and args[0]['profile'] == 'realtime')
+    # 장애 노드 수신함에 남아 있던 이벤트는 복원 뒤에 전달
+    assert recorder.wait_for(lambda sid, event, args: event == 'audio_chunk')
+    events = [event for _, event, _ in recorder.events]
+    assert events.index(ClusterNode.RESTORE_EVENT) < events.index('audio_chunk')
+    assert 'dead' not in registry.known_node_ids()
+
+
+def test_failover_disconnects_sessions_whose_gateway_died(registry, make_node):
+    node, recorder = make_node('a', owned=lambda: ['s1'])
+    kill(registry, 'dead')
+    registry.claim('s1', 'a')
+    registry.set_gateway('s1', 'dead')
+
+    expire(node)
+    node._recover_failed_nodes()
+
+    assert recorder.wait_for(lambda sid, event, args: sid == 's1' and event == 'disconnect')
+    assert node.reaped == 1
+
+
+def test_failover_drops_sessions_when_owner_and_gateway_died(registry, make_node):
+    node, recorder = make_node('a')
+    kill(registry, 'dead')
+    registry.claim('s1', 'dead')
+    registry.set_gateway('s1', 'dead')
+    registry.save_journal('s1', {})
+
+    expire(node)
+    node._recover_failed_nodes()
+
+    assert registry.owner('s1') is None
+    assert registry.load_journal('s1') is None
+    assert node.adopted == 0
+    time.sleep(0.1)
+    assert not recorder.events
+
+
+def test_slow_owner_drops_reassigned_session(registry, make_node):
+    node, recorder = make_node('a', owned=lambda: ['s1', 's2'])
+    registry.claim('s1', 'a')
+    registry.claim('s2', 'b')  # heartbeat가 늦어 다른 노드로 넘어간 세션
+
+    node._check_ownership()
+
+    assert [(sid, event) for sid, event, _ in recorder.events] == [('s2', ClusterNode.LOST_EVENT)]
+
+
+def test_gateway_closes_connections_of_dropped_sessions(registry, make_node):
+    node, recorder = make_node('a')
+    node.place('s1')
+    node.place('s2')
+    registry.drop('s2')  # 이 노드가 장애로 처리되어 정리된 세션
+
+    node._check_ownership()
+
+    assert [(sid, event) for sid, event, _ in recorder.events] == [('s2', ClusterNode.LOST_EVENT)]
+
+
+def test_only_one_node_handles_a_failure(registry, make_node):
+    a, recorder_a = make_node('a')
+    b, recorder_b = make_node('b')
+    kill(registry, 'dead')
+    registry.claim('s1', 'dead')
+    registry.set_gateway('s1', 'a')
+
+    expire(a, b)
+    a._recover_failed_nodes()
+    b._recover_failed_nodes()
+
+    assert a.adopted + b.adopted == 1
+    assert registry.owner('s1') in ('a', 'b')
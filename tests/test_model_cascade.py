@@ -0,0 +1,28 @@
+import time
+
+from model_cascade import CascadePolicy, ModelCascade
+
+
+def make_cascade():
+    policy = CascadePolicy(downgrade_after=1, min_dwell=0.0)
+    return ModelCascade(['large', 'small'], ['mt'], make_asr=lambda name: name, make_mt=lambda name: name,
+                        policy=policy)
+
+
+def test_overloaded_session_moves_down():
+    cascade = make_cascade()
+    cascade.register('s1')
+    change = cascade.observe('s1', rtf=2.0, lag=0.0, now=time.monotonic() + 1)
+    assert change is not None and change.new.index == 1
+    assert cascade.tier_of('s1').index == 1
+
+
+def test_late_observation_does_not_revive_unregistered_session():
+    cascade = make_cascade()
+    cascade.register('s1')
+    cascade.unregister('s1')
+
+    assert cascade.observe('s1', rtf=2.0, lag=0.0, now=time.monotonic() + 1) is None
+    metrics = cascade.metrics()
+    assert [tier['sessions'] for tier in metrics['tiers']] == [0, 0]
+    assert all(tier['rtf'] is None for tier in metrics['tiers'])
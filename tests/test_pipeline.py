@@ -0,0 +1,212 @@
+import threading
+import time
+
+import pytest
+
+from pipeline import BACKGROUND, FINAL, PARTIAL, SessionStage
+
+
+class Gate:
+    """워커 하나를 붙잡아 두는 작업 - 그동안 대기열을 원하는 상태로 만든 뒤 release()"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self._release = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        self._release.wait(5.0)
+
+    def release(self):
+        self._release.set()
+
+
+class Log:
+    """작업 실행 순서 기록 (동시에 실행된 같은 세션 작업도 감지)"""
+
+    def __init__(self):
+        self.order = []
+        self.overlaps = 0
+        self._running = set()
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+
+    def job(self, session_id, label, duration=0.0):
+        def run():
+            with self._lock:
+                if session_id in self._running:
+                    self.overlaps += 1
+                self._running.add(session_id)
+            if duration:
+                time.sleep(duration)
+            with self._lock:
+                self._running.discard(session_id)
+                self.order.append(label)
+                self._done.notify_all()
+        return run
+
+    def wait_for(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while len(self.order) < count:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._done.wait(remaining)
+            return True
+
+
+@pytest.fixture
+def make_stage():
+    stages = []
+
+    def make(**kwargs):
+        stage = SessionStage('test', **kwargs)
+        stages.append(stage)
+        return stage
+
+    yield make
+    for stage in stages:
+        stage.close()
+
+
+def hold(stage, session_id='gate'):
+    gate = Gate()
+    assert stage.submit(session_id, gate, priority=FINAL)
+    assert gate.started.wait(5.0)
+    return gate
+
+
+def test_final_preempts_partial_across_sessions(make_stage):
+    stage = make_stage(workers=1)
+    log = Log()
+    gate = hold(stage)
+
+    stage.submit('a', log.job('a', 'a-partial'), priority=PARTIAL)
+    stage.submit('b', log.job('b', 'b-background'), priority=BACKGROUND)
+    stage.submit('c', log.job('c', 'c-final'), priority=FINAL)
+    gate.release()
+
+    assert log.wait_for(3)
+    assert log.order == ['c-final', 'a-partial', 'b-background']
+
+
+def test_jobs_of_one_session_run_in_order(make_stage):
+    stage = make_stage(workers=4, quantum=0.001)
+    log = Log()
+
+    # 우선순위가 섞여 있어도 같은 세션 안에서는 추가한 순서대로, 한 번에 하나씩 실행
+    priorities = [PARTIAL, FINAL, BACKGROUND]
+    for i in range(30):
+        for session_id in ('a', 'b'):
+            stage.submit(session_id, log.job(session_id, (session_id, i), duration=0.001),
+                         priority=priorities[i % 3])
+
+    assert log.wait_for(60)
+    assert log.overlaps == 0
+    for session_id in ('a', 'b'):
+        assert [i for s, i in log.order if s == session_id] == list(range(30))
+
+
+def test_expired_jobs_free_queue_slots(make_stage):
+    stage = make_stage(workers=1, max_pending=2)
+    log = Log()
+    gate = hold(stage)
+
+    deadline = time.monotonic() + 0.05
+    assert stage.submit('a', log.job('a', 'stale-1'), deadline=deadline)
+    assert stage.submit('b', log.job('b', 'stale-2'), deadline=deadline)
+    assert not stage.submit('c', log.job('c', 'rejected'), block=False)
+
+    time.sleep(0.1)
+    # 가득 찬 대기열이라도 기한이 지난 작업을 버리고 바로 추가됨
+    assert stage.submit('c', log.job('c', 'fresh'), block=False)
+    gate.release()
+
+    assert log.wait_for(1)
+    time.sleep(0.05)
+    assert log.order == ['fresh']
+    stats = stage.stats()
+    assert stats['rejected'] == 1
+    assert stats['classes']['partial']['expired'] == 2
+    assert stats['pending'] == 0
+
+
+def test_final_jobs_use_reserved_slots_when_full(make_stage):
+    stage = make_stage(workers=1, max_pending=2, final_reserve=2)
+    log = Log()
+    gate = hold(stage)
+
+    assert stage.submit('a', log.job('a', 'a-partial'), priority=PARTIAL)
+    assert stage.submit('b', log.job('b', 'b-partial'), priority=PARTIAL)
+    assert not stage.submit('c', log.job('c', 'c-partial'), priority=PARTIAL, block=False)
+    # 가득 찬 대기열에도 FINAL 작업은 기다리지 않고 예비 자리에 추가됨
+    assert stage.submit('c', log.job('c', 'c-final'), priority=FINAL, block=False)
+    assert stage.submit('a', log.job('a', 'a-final'), priority=FINAL, block=False)
+    assert not stage.submit('d', log.job('d', 'd-final'), priority=FINAL, block=False)
+    gate.release()
+
+    assert log.wait_for(4)
+    # 다른 세션의 부분 인식보다 먼저, 같은 세션에서는 먼저 추가된 작업 뒤에 실행
+    assert log.order == ['c-final', 'a-partial', 'a-final', 'b-partial']
+    assert stage.stats()['rejected'] == 2
+
+
+def test_background_promoted_after_aging(make_stage):
+    stage = make_stage(workers=1, aging=0.1)
+    log = Log()
+    gate = hold(stage)
+
+    stage.submit('a', log.job('a', 'a-background'), priority=BACKGROUND)
+    time.sleep(0.15)
+    # 방금 추가된 PARTIAL보다 aging초 이상 기다린 BACKGROUND 작업이 먼저 실행
+    stage.submit('b', log.job('b', 'b-partial'), priority=PARTIAL)
+    gate.release()
+
+    assert log.wait_for(2)
+    assert log.order == ['a-background', 'b-partial']
+    assert stage.stats()['classes']['background']['promoted'] == 1
+
+
+def test_background_waits_before_aging(make_stage):
+    stage = make_stage(workers=1, aging=10.0)
+    log = Log()
+    gate = hold(stage)
+
+    stage.submit('a', log.job('a', 'a-background'), priority=BACKGROUND)
+    stage.submit('b', log.job('b', 'b-partial'), priority=PARTIAL)
+    gate.release()
+
+    assert log.wait_for(2)
+    assert log.order == ['b-partial', 'a-background']
+    assert stage.stats()['classes']['background']['promoted'] == 0
+
+
+def test_drop_session_while_running(make_stage):
+    stage = make_stage(workers=2)
+    log = Log()
+    gate = hold(stage, 'a')
+
+    for i in range(3):
+        stage.submit('a', log.job('a', f'a-{i}'), key=f'k{i}')
+    stage.submit('b', log.job('b', 'b-0'))
+    assert log.wait_for(1)
+
+    assert stage.drop_session('a') == 3
+    assert stage.stats()['pending'] == 0
+    # 버린 작업의 key는 다시 추가할 수 있고, 실행 중인 작업이 끝난 뒤에 실행됨
+    assert stage.submit('a', log.job('a', 'a-after'), key='k0')
+    time.sleep(0.05)
+    assert 'a-after' not in log.order
+    gate.release()
+
+    assert log.wait_for(2)
+    time.sleep(0.05)
+    assert log.order == ['b-0', 'a-after']
+    stats = stage.stats()
+    assert stats['pending'] == 0
+    assert stats['active_sessions'] == 0
+
+    # 비워진 세션도 이후 작업은 정상 처리
+    assert stage.submit('a', log.job('a', 'a-later'))
+    assert log.wait_for(3)
@@ -0,0 +1,116 @@
+# bench_language_id.py - 언어 감지 호출당 지연 시간 비교 (langdetect vs LanguageIdentifier)
+#
+# 사용법:
+#   python tools/bench_language_id.py [--repeat 20] [--model server/models/lid.176.ftz]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server'))
+
+from language_id import LANGUAGE_MAPPING, LanguageIdentifier, normalize_text  # noqa: E402
+
+# 지원 언어별 예문 (Whisper 부분 인식 결과와 비슷한 길이)
+SAMPLES = {
+    "en": "I think we should start the meeting now because everyone is here.",
+    "ko": "오늘 회의는 여기까지 하고 다음 주에 다시 이야기하겠습니다.",
+    "ja": "今日はとても良い天気なので公園を散歩したいと思います。",
+    "zh": "我们今天要讨论的是实时语音翻译系统的性能问题。",
+    "de": "Ich denke, wir sollten jetzt mit der Besprechung anfangen.",
+    "fr": "Je pense que nous devrions commencer la réunion maintenant.",
+    "es": "Creo que deberíamos empezar la reunión ahora mismo.",
+    "ru": "Я думаю, что нам нужно начать встречу прямо сейчас.",
+    "pt": "Acho que devemos começar a reunião agora mesmo.",
+    "it": "Penso che dovremmo iniziare la riunione adesso.",
+    "vi": "Tôi nghĩ chúng ta nên bắt đầu cuộc họp ngay bây giờ.",
+    "th": "ผมคิดว่าเราควรเริ่มการประชุมตอนนี้เลยครับ",
+    "id": "Saya pikir kita harus memulai rapat sekarang juga.",
+    "nl": "Ik denk dat we nu met de vergadering moeten beginnen.",
+    "tr": "Bence toplantıya şimdi başlamalıyız çünkü herkes burada.",
+    "ar": "أعتقد أنه يجب علينا بدء الاجتماع الآن لأن الجميع هنا.",
+    "hi": "मुझे लगता है कि हमें अब बैठक शुरू कर देनी चाहिए।",
+}
+
+
+def legacy_detect(text):
+    """기존 app.py detect_language 와 같은 방식 (langdetect, 시드 고정)"""
+    from langdetect import DetectorFactory, detect_langs
+
+    DetectorFactory.seed = 0
+    detection = detect_langs(text)
+    top = detection[0]
+    return LANGUAGE_MAPPING.get(top.lang, "eng_Latn"), float(top.prob)
+
+
+def measure(fn, texts, repeat):
+    """호출당 지연 시간 목록 (마이크로초)"""
+    timings = []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            fn(text)
+            timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def report(name, timings, correct=None, total=None):
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2]
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    accuracy = f"{correct}/{total}" if total else "-"
+    print(f"{name:<28} {statistics.mean(timings):>10.1f} {p50:>10.1f} {p95:>10.1f} {accuracy:>10}")
+
+
+def accuracy_of(fn):
+    correct = 0
+    for lang, text in SAMPLES.items():
+        if fn(text)[0] == LANGUAGE_MAPPING[lang]:
+            correct += 1
+    return correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description="언어 감지 마이크로 벤치마크")
+    parser.add_argument('--repeat', type=int, default=20, help="예문 세트 반복 횟수")
+    parser.add_argument('--model', default=None, help="fastText LID 모델 경로")
+    args = parser.parse_args()
+
+    texts = list(SAMPLES.values())
+    print(f"{'implementation':<28} {'mean(us)':>10} {'p50(us)':>10} {'p95(us)':>10} {'accuracy':>10}")
+
+    try:
+        report("langdetect (current)", measure(legacy_detect, texts, args.repeat),
+               accuracy_of(legacy_detect), len(SAMPLES))
+    except ImportError:
+        print("langdetect not installed, skipping baseline")
+
+    identifier = LanguageIdentifier(model_path=args.model)
+    if identifier.backend is None:
+        print("LanguageIdentifier has no backend available")
+        return
+
+    # 캐시를 우회한 순수 모델 비용
+    uncached = lambda text: identifier._predict(normalize_text(text))  # noqa: E731
+    report(f"{identifier.backend} (uncached)", measure(uncached, texts, args.repeat),
+           accuracy_of(identifier.detect), len(SAMPLES))
+
+    # 같은 문장 반복 (부분 인식 결과가 반복되는 상황) - LRU 캐시 적중
+    report(f"{identifier.backend} (LRU cached)", measure(identifier.detect, texts, args.repeat))
+
+    # 배치 호출 (캐시를 비운 상태) - 문장당 비용으로 환산
+    batch_timings = []
+    for _ in range(args.repeat):
+        identifier.cache_clear()
+        start = time.perf_counter()
+        identifier.detect_batch(texts)
+        batch_timings.append((time.perf_counter() - start) * 1e6 / len(texts))
+    report(f"{identifier.backend} (batch, per text)", batch_timings)
+
+    print(f"cache: {identifier.cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
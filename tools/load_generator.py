@@ -0,0 +1,390 @@
+# load_generator.py - Socket.IO 엔드포인트 다중 세션 부하 테스트
+#
+# client/public/src/index.js 와 같은 프로토콜(start_recording, chunk_number,
+# audio_chunk, stop_recording)로 N개의 가상 클라이언트를 실행하고, 동시 세션
+# 수를 단계적으로 늘려 포화 지점을 찾는다.
+#
+# 사용법:
+#   python tools/load_generator.py --wav speech.wav --start 1 --step 2 --max 16 \
+#       --duration 30 --server-pid $(pgrep -f server/app.py) --report load_report.json
+#
+# 모델 가중치 없이 서버만 시험하려면 서버를 ASR_ENGINE=fake MT_ENGINE=echo 로 실행한다.
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+import wave
+
+import numpy as np
+import socketio
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 4096  # 브라우저 ScriptProcessor 버퍼 크기와 동일
+MEASURED_EVENTS = ('partial_transcription', 'translation')
+
+
+def load_wav(path):
+    """WAV 파일을 16kHz 모노 float32 배열로 읽기"""
+    with wave.open(path, 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    if width == 2:
+        audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    elif width == 4:
+        audio = np.frombuffer(frames, dtype=np.int32).astype(np.float32) / 2147483648.0
+    elif width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+
+    if rate != SAMPLE_RATE:
+        # 선형 보간 리샘플링 (부하 테스트용으로 충분)
+        duration = len(audio) / rate
+        target = np.linspace(0, len(audio) - 1, int(duration * SAMPLE_RATE))
+        audio = np.interp(target, np.arange(len(audio)), audio)
+
+    return audio.astype(np.float32)
+
+
+class SimulatedClient:
+    """실시간 속도로 오디오를 전송하고 이벤트 지연을 기록하는 가상 클라이언트"""
+
+    def __init__(self, index, url, audio, duration, language_config, late_threshold):
+        self.index = index
+        self.url = url
+        self.audio = audio
+        self.duration = duration
+        self.language_config = language_config
+        self.late_threshold = late_threshold
+
+        self.sio = socketio.Client(reconnection=False)
+        self.chunk_sent_at = {}
+        self.latencies = {name: [] for name in MEASURED_EVENTS}
+        self.event_counts = {name: 0 for name in MEASURED_EVENTS}
+        self.late_events = 0
+        self.out_of_order = 0
+        self.errors = []
+        self.disconnected = False
+        self.connect_failed = False
+        self._last_chunk = {name: -1 for name in MEASURED_EVENTS}
+        self._lock = threading.Lock()
+
+        for name in MEASURED_EVENTS:
+            self.sio.on(name, self._make_handler(name))
+        self.sio.on('error', self._on_error)
+        self.sio.on('disconnect', self._on_disconnect)
+
+    def _make_handler(self, name):
+        def handler(data):
+            received_at = time.time()
+            with self._lock:
+                self.event_counts[name] += 1
+                chunk = data.get('chunk') if isinstance(data, dict) else None
+                if chunk is None or chunk not in self.chunk_sent_at:
+                    return
+                if chunk < self._last_chunk[name]:
+                    self.out_of_order += 1
+                self._last_chunk[name] = chunk
+
+                latency = received_at - self.chunk_sent_at[chunk]
+                self.latencies[name].append(latency)
+                if latency > self.late_threshold:
+                    self.late_events += 1
+        return handler
+
+    def _on_error(self, message):
+        with self._lock:
+            self.errors.append(str(message))
+
+    def _on_disconnect(self, *args):
+        self.disconnected = True
+
+    def run(self, start_barrier):
+        try:
+            self.sio.connect(self.url, transports=['websocket'])
+        except Exception as e:
+            self.connect_failed = True
+            self.errors.append(f"connect: {e}")
+            start_barrier.wait()
+            return
+
+        start_barrier.wait()
+        try:
+            self.sio.emit('update_language_config', self.language_config)
+            self.sio.emit('start_recording')
+
+            chunk_duration = CHUNK_SAMPLES / SAMPLE_RATE
+            total_chunks = int(self.duration / chunk_duration)
+            offset = (self.index * CHUNK_SAMPLES * 7) % max(1, len(self.audio))  # 세션마다 다른 위치에서 시작
+            started = time.time()
+
+            for chunk_number in range(total_chunks):
+                # 실시간 속도 유지 - 절대 시각 기준으로 대기하여 누적 오차 방지
+                scheduled = started + chunk_number * chunk_duration
+                delay = scheduled - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                if self.disconnected:
+                    break
+
+                start = (offset + chunk_number * CHUNK_SAMPLES) % len(self.audio)
+                chunk = np.take(self.audio, range(start, start + CHUNK_SAMPLES), mode='wrap')
+
+                with self._lock:
+                    self.chunk_sent_at[chunk_number] = time.time()
+                self.sio.emit('chunk_number', chunk_number)
+                self.sio.emit('audio_chunk', chunk.astype(np.float32).tobytes())
+
+            self.sio.emit('stop_recording')
+        except Exception as e:
+            self.errors.append(f"stream: {e}")
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+
+class ServerSampler(threading.Thread):
+    """서버 프로세스 CPU/RSS 주기적 샘플링"""
+
+    def __init__(self, pid, interval=1.0):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.cpu = []
+        self.rss_mb = []
+        self._stop_event = threading.Event()
+
+    def _proc_times(self):
+        with open(f'/proc/{self.pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        ticks = os.sysconf('SC_CLK_TCK')
+        return (int(fields[11]) + int(fields[12])) / ticks
+
+    def _proc_rss_mb(self):
+        with open(f'/proc/{self.pid}/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+    def run(self):
+        if PSUTIL_AVAILABLE:
+            process = psutil.Process(self.pid)
+            process.cpu_percent(None)
+            while not self._stop_event.wait(self.interval):
+                self.cpu.append(process.cpu_percent(None))
+                self.rss_mb.append(process.memory_info().rss / (1024 * 1024))
+            return
+
+        # psutil이 없으면 /proc 직접 읽기 (Linux)
+        last_time, last_cpu = time.time(), self._proc_times()
+        while not self._stop_event.wait(self.interval):
+            now, cpu = time.time(), self._proc_times()
+            self.cpu.append(100.0 * (cpu - last_cpu) / (now - last_time))
+            self.rss_mb.append(self._proc_rss_mb())
+            last_time, last_cpu = now, cpu
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=self.interval * 2)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize_level(clients, sampler, wall_time):
+    """한 단계(동시 세션 수) 결과 요약"""
+    summary = {'sessions': len(clients), 'wall_time_s': round(wall_time, 2), 'events': {}}
+
+    for name in MEASURED_EVENTS:
+        latencies = [lat for c in clients for lat in c.latencies[name]]
+        summary['events'][name] = {
+            'count': sum(c.event_counts[name] for c in clients),
+            'measured': len(latencies),
+            'mean_s': round(statistics.mean(latencies), 3) if latencies else None,
+            'p50_s': percentile(latencies, 50),
+            'p95_s': percentile(latencies, 95),
+            'p99_s': percentile(latencies, 99),
+            'max_s': max(latencies) if latencies else None,
+        }
+
+    summary['late_events'] = sum(c.late_events for c in clients)
+    summary['out_of_order_events'] = sum(c.out_of_order for c in clients)
+    summary['error_events'] = sum(len(c.errors) for c in clients)
+    summary['connect_failures'] = sum(1 for c in clients if c.connect_failed)
+    summary['disconnects'] = sum(1 for c in clients if c.disconnected)
+    # 번역을 하나도 받지 못한 세션 - 결과가 유실된 것으로 간주
+    summary['sessions_without_translation'] = sum(1 for c in clients if c.event_counts['translation'] == 0)
+
+    if sampler is not None and sampler.cpu:
+        summary['server_cpu_percent'] = {
+            'mean': round(statistics.mean(sampler.cpu), 1),
+            'max': round(max(sampler.cpu), 1)
+        }
+        summary['server_rss_mb'] = {
+            'mean': round(statistics.mean(sampler.rss_mb), 1),
+            'max': round(max(sampler.rss_mb), 1)
+        }
+    return summary
+
+
+def is_saturated(summary, slo_p95, max_late_ratio):
+    """SLO 위반 여부 - 포화 판정"""
+    translation = summary['events']['translation']
+    partial = summary['events']['partial_transcription']
+    total_events = translation['measured'] + partial['measured']
+
+    if summary['connect_failures'] or summary['disconnects'] or summary['error_events']:
+        return True, "errors or disconnects"
+    if total_events == 0:
+        return True, "no events received"
+    p95 = max(v for v in (translation['p95_s'], partial['p95_s']) if v is not None)
+    if p95 > slo_p95:
+        return True, f"p95 latency {p95:.2f}s > {slo_p95}s"
+    if summary['late_events'] / total_events > max_late_ratio:
+        return True, f"late events {summary['late_events']}/{total_events}"
+    return False, None
+
+
+def run_level(args, audio, sessions):
+    """동시 세션 sessions개로 한 단계 실행"""
+    language_config = {
+        'sourceLanguage': args.source_language,
+        'targetLanguage': args.target_language,
+        'autoDetect': args.source_language == 'auto'
+    }
+    if args.profile:
+        language_config['profile'] = args.profile
+
+    clients = [SimulatedClient(i, args.url, audio, args.duration, language_config, args.late_threshold)
+               for i in range(sessions)]
+    barrier = threading.Barrier(sessions)
+    threads = [threading.Thread(target=c.run, args=(barrier,), daemon=True) for c in clients]
+
+    sampler = ServerSampler(args.server_pid) if args.server_pid else None
+    if sampler:
+        sampler.start()
+
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 남은 번역 결과 수신 대기
+    time.sleep(args.drain)
+    wall_time = time.time() - started
+
+    if sampler:
+        sampler.stop()
+    for client in clients:
+        client.close()
+
+    return summarize_level(clients, sampler, wall_time)
+
+
+def format_table(levels):
+    lines = [f"{'sessions':>8} {'partial p50':>12} {'partial p95':>12} {'transl p50':>11} {'transl p95':>11} "
+             f"{'transl p99':>11} {'late':>6} {'errors':>7} {'cpu%':>7} {'rss MB':>8}"]
+
+    def fmt(value):
+        return f"{value:.2f}" if value is not None else "-"
+
+    for level in levels:
+        partial = level['events']['partial_transcription']
+        translation = level['events']['translation']
+        cpu = level.get('server_cpu_percent', {}).get('mean')
+        rss = level.get('server_rss_mb', {}).get('max')
+        lines.append(
+            f"{level['sessions']:>8} {fmt(partial['p50_s']):>12} {fmt(partial['p95_s']):>12} "
+            f"{fmt(translation['p50_s']):>11} {fmt(translation['p95_s']):>11} {fmt(translation['p99_s']):>11} "
+            f"{level['late_events']:>6} {level['error_events'] + level['connect_failures']:>7} "
+            f"{fmt(cpu):>7} {fmt(rss):>8}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO 다중 세션 부하 테스트")
+    parser.add_argument('--url', default='http://localhost:7880', help="서버 주소")
+    parser.add_argument('--wav', required=True, help="전송할 음성 WAV 파일 (반복 재생)")
+    parser.add_argument('--start', type=int, default=1, help="시작 동시 세션 수")
+    parser.add_argument('--step', type=int, default=1, help="단계별 증가 세션 수")
+    parser.add_argument('--max', type=int, default=16, help="최대 동시 세션 수")
+    parser.add_argument('--duration', type=float, default=30.0, help="단계별 발화 시간(초)")
+    parser.add_argument('--drain', type=float, default=8.0, help="stop_recording 후 결과 대기 시간(초)")
+    parser.add_argument('--source-language', default='auto', help="소스 언어 (NLLB 코드 또는 auto)")
+    parser.add_argument('--target-language', default='kor_Hang', help="타겟 언어 (NLLB 코드)")
+    parser.add_argument('--profile', default=None, help="세션 프로파일 이름 (서버가 지원하는 경우)")
+    parser.add_argument('--late-threshold', type=float, default=3.0, help="늦은 이벤트 기준 지연(초)")
+    parser.add_argument('--slo-p95', type=float, default=4.0, help="포화 판정 p95 지연(초)")
+    parser.add_argument('--max-late-ratio', type=float, default=0.05, help="포화 판정 늦은 이벤트 비율")
+    parser.add_argument('--server-pid', type=int, default=None, help="CPU/RSS를 측정할 서버 프로세스 PID")
+    parser.add_argument('--no-stop', action='store_true', help="포화 후에도 최대 세션 수까지 계속 실행")
+    parser.add_argument('--report', default='load_report.json', help="결과 보고서 경로 (JSON)")
+    args = parser.parse_args()
+
+    audio = load_wav(args.wav)
+    print(f"Loaded {args.wav}: {len(audio) / SAMPLE_RATE:.1f}s of audio")
+
+    levels = []
+    saturation = None
+    sessions = args.start
+    while sessions <= args.max:
+        print(f"\n== {sessions} concurrent sessions ==")
+        summary = run_level(args, audio, sessions)
+        saturated, reason = is_saturated(summary, args.slo_p95, args.max_late_ratio)
+        summary['saturated'] = saturated
+        summary['saturation_reason'] = reason
+        levels.append(summary)
+        print(format_table([summary]))
+
+        if saturated and saturation is None:
+            saturation = {'sessions': sessions, 'reason': reason}
+            print(f"Saturated at {sessions} sessions: {reason}")
+            if not args.no_stop:
+                break
+        sessions += args.step
+
+    supported = max((level['sessions'] for level in levels if not level['saturated']), default=0)
+    report = {
+        'url': args.url,
+        'wav': args.wav,
+        'duration_s': args.duration,
+        'slo_p95_s': args.slo_p95,
+        'late_threshold_s': args.late_threshold,
+        'max_sessions_within_slo': supported,
+        'saturation': saturation,
+        'levels': levels,
+    }
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print("\n" + format_table(levels))
+    print(f"\nMax sessions within SLO: {supported}")
+    print(f"Report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()